@@ -0,0 +1,100 @@
+"""Throughput benchmark for the HTML-to-text cleaner.
+
+Extracts every article body from the synthetic fixture feeds in
+``benchmarks/fixtures`` the way the bot does during a refresh, checks that
+``clean_html`` returns exactly what the former multi-pass regex cleaner
+returned, and reports the throughput of both in MB/s. Exits non-zero if any
+body is cleaned differently. The fixtures are generated filler text, not
+captured feeds, so the check and the MB/s only cover their markup; the
+edge cases (interleaved ``<script>``/``<style>`` blocks and the like) are
+covered by ``tests/test_html_cleaner.py``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_clean_html [--repeat 20] [--scale 1]
+"""
+import argparse
+import glob
+import html
+import os
+import re
+import sys
+import time
+from typing import Callable, List
+
+from models.feed_stream_parser import StreamingFeedParser
+from models.html_cleaner import clean_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def reference_clean_html(raw_html: str) -> str:
+    """The cleaner as it was before the scanning rewrite, kept as the oracle."""
+    raw_html = re.sub(r'<script.*?</script>', '', raw_html, flags=re.DOTALL)
+    raw_html = re.sub(r'<style.*?</style>', '', raw_html, flags=re.DOTALL)
+    cleanr = re.compile(r'<br\s*/?>', re.IGNORECASE)
+    raw_html = cleanr.sub('\n', raw_html)
+    cleanr = re.compile('<.*?>')
+    text = cleanr.sub('', raw_html)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    return html.unescape(text.strip())
+
+
+def load_bodies(fixtures_dir: str = FIXTURES_DIR) -> List[str]:
+    """Article bodies from every fixture feed: full content if present, else the description."""
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.xml"))):
+        parser = StreamingFeedParser(max_entries=sys.maxsize)
+        with open(path, "rb") as f:
+            parser.feed(f.read())
+        parser.close()
+        for entry in parser.result().entries:
+            if entry.get('content'):
+                bodies.append(entry.content[0]['value'])
+            else:
+                bodies.append(entry.get('description', entry.get('summary', '')))
+    return bodies
+
+
+def throughput(cleaner: Callable[[str], str], bodies: List[str], repeat: int) -> float:
+    """Best-of-``repeat`` throughput in MB/s over all bodies."""
+    size = sum(len(body.encode("utf-8")) for body in bodies)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            cleaner(body)
+        best = min(best, time.perf_counter() - start)
+    return size / best / 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="timing rounds; the best one is reported")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="concatenate each body this many times to simulate long articles")
+    args = parser.parse_args()
+
+    bodies = [body * args.scale for body in load_bodies()]
+    if not bodies:
+        print(f"No fixture feeds found in {FIXTURES_DIR}", file=sys.stderr)
+        return 1
+
+    mismatches = [i for i, body in enumerate(bodies) if clean_html(body) != reference_clean_html(body)]
+    if mismatches:
+        print(f"Output differs from the reference cleaner for {len(mismatches)} of {len(bodies)} bodies "
+              f"(first: #{mismatches[0]})", file=sys.stderr)
+        return 1
+
+    size = sum(len(body.encode("utf-8")) for body in bodies)
+    print(f"{len(bodies)} bodies, {size / 1e6:.2f} MB, identical output")
+    reference = throughput(reference_clean_html, bodies, args.repeat)
+    scanning = throughput(clean_html, bodies, args.repeat)
+    print(f"reference (multi-pass regex): {reference:8.1f} MB/s")
+    print(f"clean_html (tag scanner):     {scanning:8.1f} MB/s  ({scanning / reference:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
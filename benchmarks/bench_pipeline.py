@@ -0,0 +1,214 @@
+"""End-to-end offline benchmark of the news pipeline.
+
+Serves copies of the synthetic feeds in ``benchmarks/fixtures`` from a local
+HTTP server and swaps the Gemini backend for ``FakeGemini``, then reports
+throughput and p50/p95/p99 latency for:
+
+- clean:   ``clean_html`` per article body
+- ingest:  a cold ``fetch_news`` into an empty store, and a warm one (all 304)
+- summaries: the background summary backfill (with ``--summaries``)
+- context: ``build_query_context`` per query
+- query:   ``process_query`` end to end, time to first chunk and total,
+           at each concurrency level
+
+The corpus is built by copying the four 20-entry fixtures, which are
+generated filler text, so the numbers reflect that markup and those payload
+sizes, not the live feeds (see ``benchmarks/fixtures/README.md``).
+
+Run from the repository root (needs the app's dependencies, no network or API key):
+
+    python -m benchmarks.bench_pipeline --articles 800 --concurrency 1,4,16
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from benchmarks.harness import (FakeGemini, FixtureFeedServer, format_summary, install_fake_llm,
+                                load_fixtures, replicate_feed, summarize)
+
+QUERIES = [
+    "What is the latest LoRaWAN sensor news?",
+    "What did NXP announce recently?",
+    "Tell me about edge AI accelerators in smart factories",
+    "Any news on Matter and Thread for the connected home?",
+    "Summarize today's IoT security news",
+    "Who is Priya Nair?",
+    "Wi-Fi 6 battery life for industrial sensors",
+    "What are Nordic Semiconductor and Silicon Labs working on?",
+]
+
+
+def build_feeds(articles: int) -> Dict[str, bytes]:
+    """Enough distinct copies of the fixtures to yield about ``articles`` new articles."""
+    fixtures = load_fixtures()
+    # Each copy yields a fixture's entries, up to the 20 per feed that new_bot ingests
+    per_round = sum(min(20, payload.count(b"<item") + payload.count(b"<entry")) for payload in fixtures.values())
+    feeds = {}
+    for copy in range(max(1, math.ceil(articles / per_round))):
+        for name, payload in fixtures.items():
+            feeds[f"c{copy}/{name}"] = replicate_feed(payload, copy)
+    return feeds
+
+
+def new_bot(bot_module, feed_urls: List[str], llm: FakeGemini, response_cache: bool):
+    """A bot with an empty store in a fresh working directory, wired to the fakes."""
+    os.chdir(tempfile.mkdtemp(prefix="news-bench-"))
+    bot = bot_module.IoTNewsBot()
+    bot.feed_urls = feed_urls
+    bot.max_entries_per_feed = 20
+    install_fake_llm(bot, llm)
+    if not response_cache:
+        bot.response_cache = bot_module.ResponseCache(maxsize=0)
+    return bot
+
+
+def bench_clean(rounds: int) -> Dict[str, float]:
+    from benchmarks.bench_clean_html import load_bodies
+    from models.html_cleaner import clean_html
+
+    samples = []
+    size = 0
+    for _ in range(rounds):
+        for body in load_bodies():
+            start = time.perf_counter()
+            clean_html(body)
+            samples.append(time.perf_counter() - start)
+            size += len(body.encode("utf-8"))
+    summary = summarize(samples)
+    summary["mb_per_s"] = size / sum(samples) / 1e6
+    return summary
+
+
+def bench_ingest(bot_module, server: FixtureFeedServer, llm: FakeGemini, rounds: int,
+                 response_cache: bool) -> Tuple[Dict, Dict, object]:
+    cold, warm = [], []
+    articles = 0
+    bot = None
+    for _ in range(rounds):
+        bot = new_bot(bot_module, server.urls, llm, response_cache)
+        start = time.perf_counter()
+        bot.fetch_news()
+        cold.append(time.perf_counter() - start)
+        articles = bot.article_store.count()
+        start = time.perf_counter()
+        bot.fetch_news() # Every feed answers 304 Not Modified
+        warm.append(time.perf_counter() - start)
+    return (summarize(cold, units=articles * rounds), summarize(warm), bot)
+
+
+def bench_context(bot, rounds: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            start = time.perf_counter()
+            bot.build_query_context(query)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_queries(bot_module, bot, concurrency: int, total: int) -> Tuple[Dict, Dict]:
+    """Run ``total`` queries, ``concurrency`` at a time, each driven like a Streamlit session."""
+    def one(i: int) -> Tuple[float, float]:
+        start = time.perf_counter()
+        first = None
+        session_id = f"session-{i % concurrency}"
+        for _ in bot_module.stream_bot_response(bot, QUERIES[i % len(QUERIES)], session_id):
+            if first is None:
+                first = time.perf_counter() - start
+        total_time = time.perf_counter() - start
+        return (first if first is not None else total_time), total_time
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    first_chunk = summarize([r[0] for r in results], elapsed=elapsed)
+    end_to_end = summarize([r[1] for r in results], elapsed=elapsed)
+    return first_chunk, end_to_end
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=240, help="approximate corpus size to ingest")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrent query levels")
+    parser.add_argument("--queries", type=int, default=32, help="queries per concurrency level")
+    parser.add_argument("--rounds", type=int, default=3, help="repetitions of the clean/ingest/context stages")
+    parser.add_argument("--feed-latency", type=float, default=0.0, help="simulated server latency per feed (s)")
+    parser.add_argument("--ttft", type=float, default=0.3, help="fake LLM time to first token (s)")
+    parser.add_argument("--chunk-latency", type=float, default=0.02, help="fake LLM delay between chunks (s)")
+    parser.add_argument("--chunks", type=int, default=40, help="fake LLM chunks per response")
+    parser.add_argument("--llm-max-in-flight", type=int, default=64, help="admission: concurrent LLM requests")
+    parser.add_argument("--llm-rpm", type=float, default=1e6,
+                        help="admission: LLM requests per minute (default: effectively unlimited)")
+    parser.add_argument("--response-cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--context-cache", choices=["off", "local"], default="off",
+                        help="send the instructions + news snapshot as a cached prompt prefix (local stand-in)")
+    parser.add_argument("--summaries", action="store_true",
+                        help="generate ingest-time summaries before the context and query stages")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.environ["LLM_MAX_IN_FLIGHT"] = str(args.llm_max_in_flight)
+    os.environ["LLM_REQUESTS_PER_MINUTE"] = str(args.llm_rpm)
+    # Summaries are generated explicitly below, never in the background of a timed stage
+    os.environ["NEWS_SUMMARIES"] = "0"
+    os.environ["PROMPT_CONTEXT_CACHE"] = args.context_cache
+    import models.news_bot as bot_module
+
+    cwd = os.getcwd()
+    server = FixtureFeedServer(build_feeds(args.articles), latency=args.feed_latency).start()
+    llm = FakeGemini(args.ttft, args.chunk_latency, args.chunks)
+    results = {"config": vars(args)}
+    try:
+        results["clean"] = bench_clean(args.rounds)
+        print(format_summary("clean_html (per body)", results["clean"], "bodies")
+              + f"  {results['clean']['mb_per_s']:.1f} MB/s")
+
+        cold, warm, bot = bench_ingest(bot_module, server, llm, args.rounds, args.response_cache)
+        results["ingest_cold"], results["ingest_not_modified"] = cold, warm
+        print(format_summary(f"ingest, cold ({len(server.feeds)} feeds)", cold, "articles"))
+        print(format_summary("ingest, not modified", warm, "refreshes"))
+
+        if args.summaries:
+            start = time.perf_counter()
+            added = bot.event_loop.run(bot.news_pipeline.summarize_pending(bot.article_store))
+            results["summaries"] = summarize([time.perf_counter() - start], units=added)
+            print(format_summary("summary backfill", results["summaries"], "articles"))
+
+        results["context"] = bench_context(bot, args.rounds)
+        print(format_summary(f"build_query_context ({bot.article_store.count()} stored)",
+                             results["context"], "queries"))
+
+        for level in [int(value) for value in args.concurrency.split(",")]:
+            first_chunk, end_to_end = bench_queries(bot_module, bot, level, args.queries)
+            results[f"query_c{level}_first_chunk"] = first_chunk
+            results[f"query_c{level}"] = end_to_end
+            print(format_summary(f"process_query c={level}, first chunk", first_chunk, "queries"))
+            print(format_summary(f"process_query c={level}, total", end_to_end, "queries"))
+        results["llm_calls"] = llm.calls
+        # Tokens sent per query; with a context cache the cached prefix is not resent
+        prompt_tokens = bot.metrics.snapshot().summaries.get(("prompt_tokens", ()))
+        if prompt_tokens:
+            results["prompt_tokens"] = prompt_tokens
+            print(f"{'prompt tokens sent per query':<34} mean={prompt_tokens['sum'] / prompt_tokens['count']:.0f} "
+                  f"p95={prompt_tokens['p95']:.0f}")
+    finally:
+        server.stop()
+        os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Cold-start benchmark: import time, bot construction and time to the first answer.
+
+Each run is a fresh interpreter, as after a container start or scale-out:
+
+- import:    ``import models.news_bot``, and which heavy dependencies it loaded
+             (google_adk, google.generativeai, feedparser and streamlit should
+             only load when first needed)
+- construct: ``IoTNewsBot()`` on an empty store, and again on the stored corpus
+- index ready: until the background re-indexing of the stored corpus is done
+- refresh:   the first ``fetch_news`` (builds the feed fetcher)
+- first answer: the first ``process_query``, time to first chunk and total,
+             including building the agent on first use (``FakeGemini`` backend)
+
+Run from the repository root (no network or API key needed). It exits
+non-zero on a regression: a heavy dependency loaded at import, or a median
+above one of the ``--max-*`` limits:
+
+    python -m benchmarks.bench_startup --runs 5 --max-import-ms 500 --max-first-chunk-ms 800
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ("google_adk", "google.generativeai", "feedparser", "streamlit")
+QUERY = "What did NXP announce recently?"
+
+
+def child(ttft: float) -> dict:
+    """One cold start, measured in this (fresh) process."""
+    start = time.perf_counter()
+    from models.news_bot import IoTNewsBot, stream_bot_response
+    result = {"import_ms": (time.perf_counter() - start) * 1000,
+              "heavy_modules_at_import": [name for name in HEAVY_MODULES if name in sys.modules]}
+
+    from benchmarks.harness import FakeGemini, FixtureFeedServer, install_fake_llm, load_fixtures
+    server = FixtureFeedServer(load_fixtures()).start()
+    llm = FakeGemini(first_token_latency=ttft, chunk_latency=0.0, chunks=10)
+    os.chdir(tempfile.mkdtemp(prefix="news-startup-"))
+    try:
+        start = time.perf_counter()
+        bot = IoTNewsBot()
+        result["construct_empty_ms"] = (time.perf_counter() - start) * 1000
+        bot.feed_urls = server.urls
+        install_fake_llm(bot, llm)
+        start = time.perf_counter()
+        bot.fetch_news()
+        result["first_refresh_ms"] = (time.perf_counter() - start) * 1000
+        bot.event_loop.stop()
+
+        constructed = time.perf_counter()
+        bot = IoTNewsBot()
+        result["construct_stored_ms"] = (time.perf_counter() - constructed) * 1000
+        install_fake_llm(bot, llm)
+        start = time.perf_counter()
+        first_chunk = None
+        for _ in stream_bot_response(bot, QUERY):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+        result["first_answer_ms"] = (time.perf_counter() - start) * 1000
+        result["first_chunk_ms"] = (first_chunk or 0.0) * 1000
+        result["heavy_modules_after_answer"] = [name for name in HEAVY_MODULES if name in sys.modules]
+        bot.indexes_ready.wait()
+        result["index_ready_ms"] = (time.perf_counter() - constructed) * 1000
+    finally:
+        server.stop()
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to measure")
+    parser.add_argument("--ttft", type=float, default=0.05, help="fake LLM time to first token (s)")
+    parser.add_argument("--max-import-ms", type=float, help="fail if the median import time exceeds this")
+    parser.add_argument("--max-first-chunk-ms", type=float,
+                        help="fail if the median time to the first answer chunk exceeds this")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Summaries and the context cache would build their own clients; keep the first answer comparable
+        os.environ["NEWS_SUMMARIES"] = "0"
+        os.environ["PROMPT_CONTEXT_CACHE"] = "off"
+        print(json.dumps(child(args.ttft)))
+        return 0
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", "--ttft", str(args.ttft)],
+                                capture_output=True, text=True, check=True)
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    results = {"config": vars(args), "runs": runs}
+    for key in ("import_ms", "construct_empty_ms", "first_refresh_ms", "construct_stored_ms", "index_ready_ms",
+                "first_chunk_ms", "first_answer_ms"):
+        values = [run[key] for run in runs]
+        results[key] = {"median": statistics.median(values), "max": max(values)}
+        print(f"{key:<22} median={results[key]['median']:8.1f}ms  max={results[key]['max']:8.1f}ms")
+    eager = sorted({name for run in runs for name in run["heavy_modules_at_import"]})
+    print(f"{'loaded at import':<22} {', '.join(eager) or 'none'}")
+    print(f"{'loaded by first answer':<22} {', '.join(runs[-1]['heavy_modules_after_answer']) or 'none'}")
+
+    failures = [f"{name} is imported eagerly" for name in eager]
+    if args.max_import_ms is not None and results["import_ms"]["median"] > args.max_import_ms:
+        failures.append(f"import took {results['import_ms']['median']:.0f}ms (limit {args.max_import_ms:.0f}ms)")
+    if args.max_first_chunk_ms is not None and results["first_chunk_ms"]["median"] > args.max_first_chunk_ms:
+        failures.append(f"first chunk took {results['first_chunk_ms']['median']:.0f}ms "
+                        f"(limit {args.max_first_chunk_ms:.0f}ms)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
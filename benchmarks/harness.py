@@ -0,0 +1,232 @@
+"""Shared pieces of the offline benchmarks.
+
+``FixtureFeedServer`` serves the synthetic feeds in ``benchmarks/fixtures``
+(generated filler text, not captured payloads) over local HTTP, so refreshes
+run the real fetch, parse and ingest path without touching the network. ``FakeGemini`` stands in for the Gemini model
+with a configurable time to first token and streaming pace, so query latency
+can be measured without an API key. ``summarize`` turns latency samples into
+throughput and p50/p95/p99.
+"""
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+RSS_LINK_RE = re.compile(rb"<link>([^<]+)</link>")
+ATOM_LINK_RE = re.compile(rb'(<link\b[^>]*\bhref=")([^"]+)(")')
+# Lowercase prose words; attribute names and tag names are never followed by a space
+PROSE_WORD_RE = re.compile(rb"(?<=[ >])([a-z]{3,})(?= )")
+PROMPT_ARTICLE_RE = re.compile(r"^Title: (.*)$(?:.|\n)*?^Source URL: (.*)$", re.MULTILINE)
+SUMMARY_ARTICLE_RE = re.compile(r"^\[(\d+)\] Title: (.*)$", re.MULTILINE)
+
+
+def load_fixtures(fixtures_dir: str = FIXTURES_DIR) -> Dict[str, bytes]:
+    """Fixture feed payloads by file name."""
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.xml"))):
+        with open(path, "rb") as f:
+            fixtures[os.path.basename(path)] = f.read()
+    return fixtures
+
+
+def replicate_feed(payload: bytes, copy: int) -> bytes:
+    """A copy of a fixture feed whose articles are unique to ``copy``.
+
+    Lets a handful of fixtures stand in for a corpus of any size: every copy
+    parses and cleans like the original but is stored as new articles. Links
+    get a copy parameter, and every other prose word a copy suffix, so that
+    copies are not collapsed as near-duplicates of each other while half of
+    the words still match the benchmark queries.
+    """
+    if copy == 0:
+        return payload
+    suffix = f"copy={copy}".encode()
+    word_suffix = f"x{copy}".encode()
+    words = 0
+
+    def tag(url: bytes) -> bytes:
+        return url + (b"&amp;" if b"?" in url else b"?") + suffix
+
+    def vary(match: "re.Match[bytes]") -> bytes:
+        nonlocal words
+        words += 1
+        return match.group(1) + word_suffix if words % 2 else match.group(1)
+
+    payload = RSS_LINK_RE.sub(lambda m: b"<link>" + tag(m.group(1)) + b"</link>", payload)
+    payload = ATOM_LINK_RE.sub(lambda m: m.group(1) + tag(m.group(2)) + m.group(3), payload)
+    return PROSE_WORD_RE.sub(vary, payload)
+
+
+class FixtureFeedServer:
+    """Serves fixture feeds over local HTTP with ETag support and optional latency."""
+
+    def __init__(self, feeds: Dict[str, bytes], latency: float = 0.0):
+        self.feeds = feeds
+        self.latency = latency
+        self.requests = 0
+        self.request_log: List[Tuple[str, Optional[str]]] = [] # (path, If-None-Match) of every request
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def urls(self) -> List[str]:
+        host, port = self._server.server_address[:2]
+        return [f"http://{host}:{port}/{name}" for name in self.feeds]
+
+    def start(self) -> "FixtureFeedServer":
+        feeds, server = self.feeds, self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                server.request_log.append((self.path.lstrip("/"), self.headers.get("If-None-Match")))
+                if server.latency:
+                    time.sleep(server.latency)
+                payload = feeds.get(self.path.lstrip("/"))
+                if payload is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml")
+                self.send_header("Content-Length", str(len(payload)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fixture-feeds", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class _FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeStream:
+    def __init__(self, chunks: List[str], first_token_latency: float, chunk_latency: float):
+        self.chunks = chunks
+        self.first_token_latency = first_token_latency
+        self.chunk_latency = chunk_latency
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.first_token_latency)
+        for i, chunk in enumerate(self.chunks):
+            if i:
+                await asyncio.sleep(self.chunk_latency)
+            yield _FakeChunk(chunk)
+
+
+class FakeGemini:
+    """Local stand-in for both the ADK ``Gemini`` wrapper and the Gemini SDK model.
+
+    Answers after ``first_token_latency`` seconds, then streams ``chunks``
+    pieces ``chunk_latency`` seconds apart. The answer cites the articles
+    found in the prompt in the format the real prompt asks for, so response
+    cleaning does realistic work; article summary requests get the JSON the
+    summary prompt asks for.
+    """
+
+    def __init__(self, first_token_latency: float = 0.3, chunk_latency: float = 0.02, chunks: int = 40):
+        self.first_token_latency = first_token_latency
+        self.chunk_latency = chunk_latency
+        self.chunks = chunks
+        self.calls = 0
+
+    def answer(self, prompt: str) -> str:
+        summary_requests = SUMMARY_ARTICLE_RE.findall(prompt)
+        if summary_requests:
+            return json.dumps([{"id": int(index), "summary": f"{title} reports new IoT developments.",
+                                "entities": title.split()[:3]} for index, title in summary_requests])
+        lines = ["Key Point: here is what the recent coverage says."]
+        for title, url in PROMPT_ARTICLE_RE.findall(prompt)[:3]:
+            lines.append(f"* **{title}** reports new IoT developments worth following.")
+            lines.append(f"Source: {title} ({url})")
+        return "\n".join(lines) + "\n"
+
+    def _split(self, text: str) -> List[str]:
+        size = max(1, -(-len(text) // self.chunks))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    async def generate_text(self, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.first_token_latency + self.chunk_latency * (self.chunks - 1))
+        return self.answer(prompt)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        self.calls += 1
+        return _FakeStream(self._split(self.answer(prompt)), self.first_token_latency, self.chunk_latency)
+
+
+def install_fake_llm(bot, llm: FakeGemini) -> None:
+    """Route the bot's agents to the fake backend, for complete, streamed and summary responses.
+
+    Agents the bot has not built yet are switched over when it builds them, so construction stays lazy.
+    """
+    def fake_news_agent(agent) -> None:
+        agent.llm = llm
+        agent.stream_model = llm
+
+    def fake_pipeline(pipeline) -> None:
+        pipeline.summary_agent.llm = llm
+
+    for attribute, builder, fake in (("_news_agent", "_build_news_agent", fake_news_agent),
+                                     ("_news_pipeline", "_build_news_pipeline", fake_pipeline)):
+        built = getattr(bot, attribute)
+        if built is not None:
+            fake(built)
+            continue
+
+        def build_fake(build=getattr(bot, builder), fake=fake):
+            agent = build()
+            fake(agent)
+            return agent
+        setattr(bot, builder, build_fake)
+
+
+def summarize(samples: List[float], elapsed: Optional[float] = None, units: Optional[int] = None) -> Dict[str, float]:
+    """Latency percentiles in milliseconds plus throughput in units per second."""
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0] if ordered else 0.0
+    elapsed = sum(ordered) if elapsed is None else elapsed
+    units = len(ordered) if units is None else units
+    return {
+        "n": len(ordered),
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+        "throughput": units / elapsed if elapsed else 0.0,
+    }
+
+
+def format_summary(name: str, summary: Dict[str, float], unit: str) -> str:
+    return (f"{name:<34} n={summary['n']:<5} p50={summary['p50_ms']:9.2f}ms "
+            f"p95={summary['p95_ms']:9.2f}ms p99={summary['p99_ms']:9.2f}ms "
+            f"{summary['throughput']:10.1f} {unit}/s")
@@ -1,20 +1,20 @@
 import streamlit as st
 import streamlit as st # Ensure streamlit is imported if used in async context
-import google.generativeai as genai
-import feedparser
-from typing import Dict, List, Optional, Generator, AsyncGenerator
+from typing import List, Optional
 import os
-import asyncio # Added for async operations
-from dataclasses import dataclass
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 # from google.generativeai.generative_models import GenerativeModel # Will be replaced by ADK
 # from google.generativeai.types import content_types # May not be needed with ADK
-from google_adk.agent import Agent
-from google_adk.llm import Gemini
 from datetime import datetime
-import html
-import re
-import json
-from models.response_models import NewsItem, NewsResponse
+import logging
+from models.response_models import NewsItem
+from models.metrics import Metrics
+from models.feed_health import FeedHealthTracker
+# The bot core has no Streamlit dependency; this script is its UI (see news_batch.py for headless use)
+from models.news_bot import REPORT_LOG_LEVELS, IoTNewsBot, stream_bot_response
+from models.ui_fragments import compact_css, news_page_html, page_bounds
+
+logger = logging.getLogger(__name__)
 
 # Page configuration
 st.set_page_config(
@@ -25,7 +25,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better UI
-st.markdown("""
+APP_CSS = """
     <style>
     /* Define color palette */
     :root {
@@ -135,7 +135,9 @@ st.markdown("""
     }
 
     </style>
-""", unsafe_allow_html=True)
+"""
+# Fragment reruns (feedback clicks, sidebar paging) skip this; full reruns send the compacted sheet
+st.markdown(compact_css(APP_CSS), unsafe_allow_html=True)
 
 # Configure Gemini
 # Load environment variables from .env file if running locally
@@ -145,6 +147,12 @@ try:
 except ImportError:
     pass
 
+# Reruns render at most this many chat messages and sidebar articles, however long the chat or large the corpus
+CHAT_HISTORY_WINDOW = int(os.environ.get("CHAT_HISTORY_WINDOW", 30))
+NEWS_SIDEBAR_PAGE_SIZE = int(os.environ.get("NEWS_SIDEBAR_PAGE_SIZE", 10))
+# How often an open page checks whether a background refresh published new news
+NEWS_POLL_SECONDS = float(os.environ.get("NEWS_POLL_SECONDS", 5))
+
 # Load API key from environment variable or Streamlit secrets
 try:
     # First try to get from Streamlit secrets
@@ -156,224 +164,11 @@ except:
         st.error("No Gemini API key found. Please set the GEMINI_API_KEY environment variable or Streamlit secret.")
         st.stop()
 
-genai.configure(api_key=GEMINI_API_KEY)
-
 # Initialize Gemini model
 # model = genai.GenerativeModel('gemini-2.0-flash') # ADK Agent will manage its own model
+# The bot configures the Gemini SDK with GEMINI_API_KEY when it builds its first agent
 
-# Define the ADK Agent
-# This agent is responsible for analyzing the news context against a user query.
-# It uses the Google ADK's Agent base class and leverages the Gemini LLM
-# via the `google_adk.llm.Gemini` wrapper. Its primary method `call`
-# takes the news context and user query, constructs a prompt, and interacts
-# with the LLM to generate a text-based response.
-class NewsAnalysisAgent(Agent):
-    def __init__(self, model_name="gemini-1.5-flash"): # Using a recent model
-        super().__init__()
-        self.llm = Gemini(model_name=model_name)
-
-    async def call(self, context: str, query: str) -> Dict[str, any]:
-        prompt = f"""You are an IoT News Assistant. Your task is to answer questions based on the provided news articles.
-        When answering:
-
-        1. Provide a natural, conversational response directly addressing the user's query
-        2. Format your answer as a cohesive paragraph or bullet points as appropriate
-        3. Include specific details from articles (dates, numbers, quotes)
-        4. Always include the source article title AND URL at the end of each information point
-        5. Do not use formulaic headers or repetitive structures
-
-        For direct questions (like "who is X?"), provide a single, clear answer.
-        For summary requests, organize the information in a readable format with appropriate bullet points.
-
-        IMPORTANT: Always include both the article title and URL at the end of your responses,
-        like this: "Source: Article Title (https://www.example.com/article-url)"
-
-        Only include relevant information from the articles. If information is not found, say so clearly.
-
-        Current news context:
-        {context}
-
-        User query: {query}"""
-
-        try:
-            # ADK's generate_content is suitable for non-streaming text generation
-            # For simplicity, using generate_text which is often available for direct text output
-            # Depending on the ADK version, this might be self.llm.generate_content(prompt).text
-            response_content = await self.llm.generate_text(prompt=prompt)
-            return {"text": response_content}
-        except Exception as e:
-            # Log error or handle more gracefully
-            return {"text": f"Error in NewsAnalysisAgent: {str(e)}"}
-
-
-class IoTNewsBot:
-    def __init__(self):
-        self.feed_urls = [
-            "https://www.iotinsider.com/feed/",
-            "https://www.electronicspecifier.com/?format=rss",
-            "https://www.student-circuit.com/feed/"
-        ]
-        self.history: List[Dict] = []
-        # Instantiate the ADK agent that will handle query processing.
-        self.news_agent = NewsAnalysisAgent(model_name='gemini-1.5-flash')
-        self.current_news_items: List[NewsItem] = []
-        self.current_news_context: str = ""
-
-    def clean_html(self, raw_html: str) -> str:
-        """Remove HTML tags and clean up text."""
-        # First, remove script and style elements
-        raw_html = re.sub(r'<script.*?</script>', '', raw_html, flags=re.DOTALL)
-        raw_html = re.sub(r'<style.*?</style>', '', raw_html, flags=re.DOTALL)
-        
-        # Remove HTML tags but preserve line breaks
-        cleanr = re.compile(r'<br\s*/?>', re.IGNORECASE) # Use raw string for regex
-        raw_html = cleanr.sub('\n', raw_html)
-        cleanr = re.compile('<.*?>')
-        text = cleanr.sub('', raw_html)
-        
-        # Clean up whitespace while preserving structure
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        return html.unescape(text.strip())
-
-    def fetch_news(self) -> None:
-        """Fetch the latest IoT news and store it in instance attributes."""
-        all_posts: List[NewsItem] = []
-        all_formatted_posts = []
-        self.current_news_items = [] # Clear previous items
-        self.current_news_context = "" # Clear previous context
-        
-        for feed_url in self.feed_urls:
-            try:
-                st.write(f"Fetching from: {feed_url}")
-                feed = feedparser.parse(feed_url)
-                
-                if hasattr(feed, 'bozo_exception') and feed.bozo:
-                    st.warning(f"Feed warning for {feed_url}: {feed.bozo_exception}")
-                    continue
-                
-                if not feed.entries:
-                    st.warning(f"No entries found in feed: {feed_url}")
-                    continue
-                
-                # Get source name from feed
-                source_name = feed.feed.get('title', feed_url.split('/')[2])
-                
-                for entry in feed.entries[:5]:  # Get latest 5 entries from each feed
-                    try:
-                        # Get full content if available, otherwise use description
-                        if hasattr(entry, 'content') and entry.content:
-                            content = entry.content[0]['value']
-                        else:
-                            content = entry.get('description', entry.get('summary', ''))
-                        
-                        clean_content = self.clean_html(content)
-                        
-                        # Format date - handle different date formats
-                        try:
-                            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                                pub_date = datetime(*entry.published_parsed[:6])
-                            elif hasattr(entry, 'published'):
-                                # Try different date formats
-                                for fmt in ["%a, %d %b %Y %H:%M:%S %z", "%a, %d %b %Y %H:%M:%S %Z", "%Y-%m-%dT%H:%M:%S%z"]:
-                                    try:
-                                        pub_date = datetime.strptime(entry.published, fmt)
-                                        break
-                                    except ValueError:
-                                        continue
-                                else:
-                                    pub_date = datetime.now()
-                            else:
-                                pub_date = datetime.now()
-                            
-                            formatted_date = pub_date.strftime("%B %d, %Y")
-                        except Exception:
-                            formatted_date = "Recent"
-                        
-                        # Get categories/tags if available
-                        categories = entry.get('tags', [])
-                        tags = [tag.get('term', '') for tag in categories if tag.get('term')]
-                        
-                        # Get author information
-                        authors = entry.get('authors', [])
-                        author_names = [author.get('name', '') for author in authors if author.get('name')]
-                        
-                        post_data = {
-                            "title": entry.title,
-                            "description": clean_content,
-                            "link": entry.link,
-                            "date": formatted_date,
-                            "tags": tags,
-                            "authors": author_names,
-                            "source": source_name
-                        }
-                        # Append NewsItem instance
-                        all_posts.append(NewsItem(**post_data))
-                        
-                        # Format for context with more detailed information - using post_data dict for convenience
-                        all_formatted_posts.append(f"""Title: {post_data['title']}
-Date: {post_data['date']}
-Source: {post_data['source']}
-{'Authors: ' + ', '.join(post_data['authors']) if post_data['authors'] else ''}
-Full Content: {post_data['description']}
-Topics: {', '.join(post_data['tags']) if post_data['tags'] else 'N/A'}
-Source URL: {post_data['link']}
----""")
-                    except Exception as e:
-                        st.warning(f"Error processing entry from {feed_url}: {str(e)}")
-                        continue
-                        
-            except Exception as e:
-                st.warning(f"Error fetching from {feed_url}: {str(e)}")
-                continue
-        
-        if not all_posts:
-            st.error("No valid entries could be processed from any feed")
-            # No return value needed, but internal state remains empty
-            return
-        
-        # Sort posts by date (most recent first)
-        try:
-            # Now all_posts contains NewsItem objects, so access date attribute
-            all_posts.sort(key=lambda x: datetime.strptime(x.date, "%B %d, %Y") if x.date != "Recent" else datetime.now(), reverse=True)
-        except Exception as e: # Catch potential errors during sort
-            st.warning(f"Could not sort news items by date: {e}")
-            # Keep original order if sorting fails
-        
-        self.current_news_items = all_posts
-        self.current_news_context = "\n".join(all_formatted_posts)
-        # No explicit return
-
-    async def process_query(self, query: str) -> AsyncGenerator[str, None]:
-        """Process user query using ADK Agent and yield response using stored news context."""
-        if not self.current_news_context:
-            yield "News has not been fetched yet or no news is available. Please refresh the news feed."
-            return
-
-        try:
-            # Invoke the ADK agent to process the query against the current news context.
-            agent_response = await self.news_agent.call(context=self.current_news_context, query=query)
-            response_text = agent_response.get("text", "No response text found.")
-
-            # For now, yield the entire response as a single chunk.
-            # Streaming from ADK agent's `generate_content` would require more changes.
-            # Basic cleaning similar to before, can be expanded
-            cleaned_text = response_text
-            cleaned_text = re.sub(r'^#+ .+$', '', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'^\* ', '- ', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'^-([^\s])', r'- \1', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'>"([^"]+)"', r'"\1"', cleaned_text)
-            cleaned_text = re.sub(r'^Key Point:', '', cleaned_text)
-            cleaned_text = re.sub(r'^- Key Point:', '- ', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'^- \*\*Key Point\*\*:', '- ', cleaned_text, flags=re.MULTILINE)
-            cleaned_text = re.sub(r'Source: ([^(]+) \(([^)]+)\)', r'Source: [\1](\2)', cleaned_text)
-            
-            yield cleaned_text
-        except Exception as e:
-            st.error(f"Error processing query with NewsAnalysisAgent: {str(e)}")
-            yield f"I apologize, but I encountered an error while processing your query with the ADK agent: {str(e)}"
-
-def display_news_sidebar(news_items: List[NewsItem]):
+def display_news_sidebar(news_items: List[NewsItem], refreshed_at: Optional[float] = None):
     """Display news items in the sidebar."""
     st.sidebar.title("📰 Latest IoT News")
     
@@ -381,26 +176,110 @@ def display_news_sidebar(news_items: List[NewsItem]):
     if st.sidebar.button("🔄 Refresh News"):
         st.session_state.refresh_news_request = True
         st.rerun()
+    if refreshed_at:
+        st.sidebar.caption(f"Last updated: {datetime.fromtimestamp(refreshed_at).strftime('%B %d, %Y %H:%M')}")
     
     st.sidebar.markdown("---")
-    
-    for item in news_items:
-        # Use a generic news icon (e.g., emoji)
-        icon = "📰" # Newspaper emoji as a generic icon
-        # Could add more logic here for source-specific icons if desired
-        # e.g., if 'iotinsider' in item['source'].lower(): icon = "💡"
-
-        with st.sidebar.container():
-            st.markdown(f"""
-            <div class="news-item">
-                <div class="news-title">{icon} {item.title}</div>
-                <div class="news-date">📅 {item.date} | Source: {item.source}</div>
-                <div style="margin-top: 0.5rem;">{item.description[:180]}...</div>
-                <a href="{item.link}" target="_blank">🔗 Read full article</a>
-            </div>
-            """, unsafe_allow_html=True)
-
-def init_streamlit(news_items: List[NewsItem]):
+
+    # Paging reruns only the article list, not the page
+    with st.sidebar:
+        display_news_page(news_items)
+
+def change_news_page(step: int):
+    st.session_state.news_page = st.session_state.get("news_page", 0) + step
+
+@st.fragment
+def display_news_page(news_items: List[NewsItem]):
+    """One page of sidebar articles, rendered as a single block of memoized cards."""
+    page, start, end, page_count = page_bounds(len(news_items), st.session_state.get("news_page", 0),
+                                               NEWS_SIDEBAR_PAGE_SIZE)
+    st.session_state.news_page = page # Clamped, in case a refresh left fewer pages
+    if news_items:
+        st.markdown(news_page_html(news_items[start:end]), unsafe_allow_html=True)
+    if page_count > 1:
+        cols = st.columns([1, 2, 1])
+        with cols[0]:
+            st.button("◀", key="news_prev", disabled=page == 0, on_click=change_news_page, args=(-1,))
+        with cols[1]:
+            st.caption(f"Page {page + 1} of {page_count}")
+        with cols[2]:
+            st.button("▶", key="news_next", disabled=page == page_count - 1, on_click=change_news_page, args=(1,))
+
+@st.fragment(run_every=NEWS_POLL_SECONDS)
+def watch_news(bot: IoTNewsBot, shown_version: int):
+    """Poll the shared corpus and rerun the page once a refresh publishes news this run did not show."""
+    snapshot = bot.corpus.snapshot()
+    if snapshot.version != shown_version:
+        st.rerun()
+    # Polls between refreshes only redraw this status line
+    error = bot.refresh_error()
+    if not snapshot.items:
+        if error:
+            st.error(f"Could not load the IoT news: {error}. Retrying in the background.")
+        else:
+            st.info("Fetching the latest IoT news in the background. Articles will appear shortly.")
+    elif error:
+        st.caption(f"The last news refresh failed ({error}); showing the previous articles.")
+
+def display_diagnostics(metrics: Metrics, feed_health: Optional[FeedHealthTracker] = None):
+    """Show stage timings, counters and feed health in a collapsed sidebar panel."""
+    def describe(name, labels):
+        labels = dict(labels)
+        # Stage spans are listed by stage name; other metrics keep their labels
+        if name == "stage_seconds":
+            name = labels.pop("stage")
+        return name + (" (" + ", ".join(f"{k}={v}" for k, v in labels.items()) + ")" if labels else "")
+
+    snapshot = metrics.snapshot()
+    with st.sidebar.expander("Diagnostics", expanded=False):
+        rows = []
+        for (name, labels), stats in sorted(snapshot.summaries.items()):
+            # Timings in milliseconds, sizes as recorded
+            scale = 1000 if name.endswith("_seconds") else 1
+            rows.append({
+                "metric": describe(name, labels),
+                "count": stats["count"],
+                "p50": round(stats["p50"] * scale, 1),
+                "p95": round(stats["p95"] * scale, 1),
+                "max": round(stats["max"] * scale, 1),
+            })
+        if rows:
+            st.caption("Timings in ms")
+            st.table(rows)
+        for (name, labels), value in sorted(snapshot.counters.items()):
+            st.caption(f"{describe(name, labels)}: {value:g}")
+        feeds = feed_health.snapshot() if feed_health is not None else []
+        if feeds:
+            st.caption("Feed health")
+            st.table(feeds)
+
+def show_earlier_messages():
+    st.session_state.history_window += CHAT_HISTORY_WINDOW
+
+def record_feedback(message_id: str, feedback: str):
+    st.session_state.feedback[message_id] = feedback
+
+@st.fragment
+def display_feedback(message_id: str):
+    """Feedback buttons for one response; a click reruns only this row."""
+    # Check if feedback has been given for this message
+    feedback_given = st.session_state.feedback.get(message_id)
+
+    cols = st.columns([1, 1, 8]) # Adjust column ratios as needed
+    with cols[0]:
+        st.button("👍", key=f"up_{message_id}", help="Positive feedback",
+                  disabled=feedback_given is not None, use_container_width=True,
+                  on_click=record_feedback, args=(message_id, "positive"))
+    with cols[1]:
+        st.button("👎", key=f"down_{message_id}", help="Negative feedback",
+                  disabled=feedback_given is not None, use_container_width=True,
+                  on_click=record_feedback, args=(message_id, "negative"))
+
+    if feedback_given:
+        with cols[2]:
+            st.caption(f"Feedback: {feedback_given}",)
+
+def init_streamlit(news_items: List[NewsItem], refreshed_at: Optional[float] = None):
     """Initialize Streamlit UI components."""
     col1, col2 = st.columns([1, 4])
     
@@ -423,38 +302,26 @@ def init_streamlit(news_items: List[NewsItem]):
     if "feedback" not in st.session_state: # For feedback
         st.session_state.feedback = {}
     
-    # Display chat history
-    for i, message in enumerate(st.session_state.messages):
+    if "history_window" not in st.session_state:
+        st.session_state.history_window = CHAT_HISTORY_WINDOW
+
+    # Display the most recent chat history; older messages load on request
+    messages = st.session_state.messages
+    first = max(0, len(messages) - st.session_state.history_window)
+    if first:
+        st.button(f"Show {min(first, CHAT_HISTORY_WINDOW)} earlier messages", key="show_earlier",
+                  on_click=show_earlier_messages)
+    for i in range(first, len(messages)):
+        message = messages[i]
         with st.chat_message(message["role"], avatar="🧑‍💻" if message["role"] == "user" else "🤖"):
             st.markdown(message["content"], unsafe_allow_html=True) # Allow HTML for potential markdown links
 
             if message["role"] == "assistant":
-                message_id = f"msg_{i}" # Create a unique ID for feedback keys
-
-                # Check if feedback has been given for this message
-                feedback_given = st.session_state.feedback.get(message_id)
-
-                cols = st.columns([1, 1, 8]) # Adjust column ratios as needed
-                with cols[0]:
-                    if st.button("👍", key=f"up_{message_id}", help="Positive feedback",
-                                 disabled=feedback_given is not None,
-                                 use_container_width=True): # Apply custom class here if needed via markdown
-                        st.session_state.feedback[message_id] = "positive"
-                        st.rerun() # Rerun to update button state
-                with cols[1]:
-                    if st.button("👎", key=f"down_{message_id}", help="Negative feedback",
-                                 disabled=feedback_given is not None,
-                                 use_container_width=True):
-                        st.session_state.feedback[message_id] = "negative"
-                        st.rerun() # Rerun to update button state
-
-                if feedback_given:
-                    with cols[2]:
-                        st.caption(f"Feedback: {feedback_given}",)
+                display_feedback(f"msg_{i}") # Index in the full history, so ids stay stable as it grows
 
 
     # Display the news sidebar
-    display_news_sidebar(news_items)
+    display_news_sidebar(news_items, refreshed_at)
     
     # Add a subtle footer
     st.markdown("---")
@@ -470,48 +337,42 @@ def init_streamlit(news_items: List[NewsItem]):
     
     return st.chat_input("🤔 What would you like to know about IoT?")
 
-async def get_bot_response(bot: IoTNewsBot, user_input: str) -> str:
-    """Helper async function to get full response from the bot."""
-    full_response_chunks = []
-    # process_query is now an async generator
-    async for chunk in bot.process_query(user_input):
-        if chunk:
-            full_response_chunks.append(chunk)
-    return "".join(full_response_chunks)
+def report_status(level: str, message: str) -> None:
+    """Show a bot status message in the session that triggered the work, or log it from background threads."""
+    if get_script_run_ctx() is not None:
+        getattr(st, level)(message)
+    else:
+        logger.log(REPORT_LOG_LEVELS[level], message)
+
+@st.cache_resource(show_spinner=False)
+def get_news_bot() -> IoTNewsBot:
+    """One bot, and so one news corpus, per process, shared by every browser session."""
+    bot = IoTNewsBot(reporter=report_status, api_key=GEMINI_API_KEY)
+    # Feeds are fetched by the background scheduler; no user request waits on the network
+    bot.start_background_refresh()
+    return bot
 
 def main():
     try:
-        # Initialize bot
-        if "iot_news_bot" not in st.session_state:
-            st.session_state.iot_news_bot = IoTNewsBot()
-        bot = st.session_state.iot_news_bot
-
-        # Determine if news needs to be fetched
-        refresh_requested = st.session_state.get('refresh_news_request', False)
-        if 'first_load' not in st.session_state:
-            st.session_state.first_load = True
-
-        if st.session_state.first_load or refresh_requested:
-            with st.spinner("Fetching latest IoT news..."):
-                bot.fetch_news() # Populates bot.current_news_items and bot.current_news_context
-                if bot.current_news_items: # Check if fetch was successful
-                    st.success("News feed updated successfully!")
-                # Error messages are now handled within fetch_news using st.error
-                # We can add a check here if critical failure needs to halt execution
-                elif not bot.current_news_items and st.session_state.first_load: # Critical fail on first load
-                     st.error("Unable to fetch news for the first time. Please check console or try again later.")
-                     return # Stop execution if first load fails critically
-                elif refresh_requested and not bot.current_news_items:
-                    st.warning("Failed to refresh news. Existing news (if any) will be used.")
-
+        # The bot and its corpus are shared; each session only keeps its chat state
+        bot = get_news_bot()
 
+        # Refreshes only get queued; the last good snapshot keeps being served meanwhile
+        if st.session_state.get('refresh_news_request', False):
+            bot.request_refresh()
+            st.toast("News refresh queued - the sidebar will update when it completes.")
             st.session_state.refresh_news_request = False # Reset flag
-            st.session_state.first_load = False
+
+        snapshot = bot.corpus.snapshot()
+        # Shows the cold-start or refresh error state, and picks up the refresh once it completes
+        watch_news(bot, snapshot.version)
         
-        news_items_for_sidebar = bot.current_news_items
+        news_items_for_sidebar = list(snapshot.items)
         
         # Initialize UI with news items
-        user_input = init_streamlit(news_items_for_sidebar)
+        user_input = init_streamlit(news_items_for_sidebar, snapshot.refreshed_at)
+        if bot.metrics.diagnostics_panel:
+            display_diagnostics(bot.metrics, bot.feed_health)
         
         # Process user input
         if user_input:
@@ -520,32 +381,31 @@ def main():
                 st.markdown(user_input)
             
             with st.chat_message("assistant", avatar="🤖"):
-                message_placeholder = st.empty()
-                with st.spinner("Analyzing IoT news with ADK Agent..."):
-                    # Run the async function to get the bot's response
-                    # For Streamlit, which runs in its own thread, directly calling asyncio.run
-                    # might lead to "RuntimeError: asyncio.run() cannot be called from a running event loop".
-                    # A common pattern is to use st.experimental_singleton or st.cache_data for async calls,
-                    # or run it in a way that Streamlit handles.
-                    # For simplicity, as process_query yields a single string now,
-                    # we can adapt the calling pattern.
-
-                    # This is a simplified way to run an async gen and get its first (and only) result.
-                    # In a more complex scenario with true async streaming to UI, this would need st.write_stream or similar.
-                    
-                    # We need to run the async generator.
-                    # Using asyncio.run() here if not in an existing loop.
-                    # If Streamlit runs its own loop, this might need adjustment.
-                    # Let's try a direct run for this specific case, as we expect one item.
-
-                    complete_response = asyncio.run(get_bot_response(bot, user_input))
-
-                    if complete_response:
-                        message_placeholder.markdown(complete_response, unsafe_allow_html=True)
-                        st.session_state.messages.append({"role": "assistant", "content": complete_response})
+                # While the request waits for an LLM slot, show where it is in the queue
+                ctx = get_script_run_ctx()
+                session_id = ctx.session_id if ctx else "default"
+                queue_status = st.empty()
+
+                def show_queue_status():
+                    status = bot.admission.queue_status(session_id)
+                    if status:
+                        position, wait = status
+                        queue_status.caption(f"⏳ The assistant is busy: you are #{position} in line, "
+                                             f"about {max(1, round(wait))}s to go.")
                     else:
-                        message_placeholder.markdown("Sorry, I couldn't generate a response.", unsafe_allow_html=True)
-                        st.session_state.messages.append({"role": "assistant", "content": "Sorry, I couldn't generate a response."})
+                        queue_status.empty()
+
+                # Render the answer as it streams in rather than behind a spinner
+                complete_response = st.write_stream(
+                    stream_bot_response(bot, user_input, session_id, on_wait=show_queue_status)
+                )
+                queue_status.empty()
+
+                if complete_response:
+                    st.session_state.messages.append({"role": "assistant", "content": complete_response})
+                else:
+                    st.markdown("Sorry, I couldn't generate a response.", unsafe_allow_html=True)
+                    st.session_state.messages.append({"role": "assistant", "content": "Sorry, I couldn't generate a response."})
                 
     except Exception as e:
         st.error(f"An error occurred in main: {str(e)}")
@@ -555,6 +415,5 @@ def main():
         st.info("Please try refreshing the page or check your internet connection.")
 
 if __name__ == "__main__":
-    # To run main() which now might involve async operations initiated by asyncio.run()
-    # This setup should be okay as main() itself is not async, but calls asyncio.run().
+    # main() itself is synchronous; responses are streamed from the bot's background event loop.
     main()
@@ -0,0 +1,396 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from models.compact_article import intern_all
+from models.near_duplicates import Signature, pack_signature, unpack_signature
+from models.response_models import ArticleSummary, NewsItem, SourceLink
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "articles.db")
+
+# Query parameters that only track the click and never identify the article
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link_hash TEXT PRIMARY KEY,
+    link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    date TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    source TEXT NOT NULL,
+    published_ts REAL,
+    fingerprint TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    canonical_hash TEXT,
+    minhash BLOB,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_ts);
+CREATE TABLE IF NOT EXISTS article_tags (
+    link_hash TEXT NOT NULL REFERENCES articles (link_hash) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (link_hash, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_article_tags_tag ON article_tags (tag COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS article_summaries (
+    content_hash TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    entities TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Columns added after the first release, created on stores written by older versions
+MIGRATIONS = (
+    ("canonical_hash", "ALTER TABLE articles ADD COLUMN canonical_hash TEXT"),
+    ("minhash", "ALTER TABLE articles ADD COLUMN minhash BLOB"),
+    ("content_hash", "ALTER TABLE articles ADD COLUMN content_hash TEXT"),
+)
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_articles_canonical ON articles (canonical_hash);
+"""
+
+
+def normalize_link(link: str) -> str:
+    """Normalize an article URL so trivially different links map to one article."""
+    parts = urlsplit(link.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAMS)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+def link_hash(link: str) -> str:
+    """Stable article key: a hash of the normalized link."""
+    return hashlib.sha1(normalize_link(link).encode("utf-8")).hexdigest()
+
+
+def item_fingerprint(item: NewsItem) -> str:
+    """Hash of an item's content, used to detect changed articles."""
+    payload = json.dumps(item.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def content_hash(item: NewsItem) -> str:
+    """Hash of an article's text only, so identical text shares one generated summary."""
+    return _text_hash(item.title, item.description)
+
+
+def _text_hash(title: str, description: str) -> str:
+    return hashlib.sha1(f"{title}\n{description}".encode("utf-8")).hexdigest()
+
+
+def _published_ts(item: NewsItem) -> Optional[float]:
+    return item.published_at.timestamp() if item.published_at else None
+
+
+class ArticleStore:
+    """Persistent, incremental SQLite store of news articles.
+
+    Articles are keyed by the hash of their normalized link and only written
+    when new or changed, so a refresh costs time in proportion to what changed.
+    History is kept beyond what the feeds currently list, and the store can be
+    queried by source, date range and tag through indexed lookups.
+
+    Near-duplicate copies of an article (the same press release in another
+    feed) are stored with ``canonical_hash`` pointing at the first copy seen.
+    They still count for change detection, but reads only return canonical
+    articles, each listing its copies in ``syndicated``.
+
+    Generated article summaries are cached by a hash of the article text, so
+    they survive restarts and are never generated twice for the same text.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # One shared connection guarded by a lock; Streamlit calls in from several threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(articles)")}
+            for column, statement in MIGRATIONS:
+                if column not in columns:
+                    self._conn.execute(statement)
+            if "content_hash" not in columns:
+                rows = self._conn.execute("SELECT link_hash, title, description FROM articles").fetchall()
+                self._conn.executemany(
+                    "UPDATE articles SET content_hash = ? WHERE link_hash = ?",
+                    [(_text_hash(row["title"], row["description"]), row["link_hash"]) for row in rows],
+                )
+            self._conn.executescript(POST_MIGRATION_SCHEMA)
+
+    def fingerprints(self, link_hashes: Iterable[str]) -> Dict[str, str]:
+        """Return the stored fingerprint for each of the given link hashes that is known."""
+        keys = list(link_hashes)
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT link_hash, fingerprint FROM articles WHERE link_hash IN ({placeholders})", keys
+            ).fetchall()
+        return {row["link_hash"]: row["fingerprint"] for row in rows}
+
+    def canonical_keys(self, link_hashes: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Return the stored canonical key (None for a canonical article) of each given link hash that is known."""
+        keys = list(link_hashes)
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT link_hash, canonical_hash FROM articles WHERE link_hash IN ({placeholders})", keys
+            ).fetchall()
+        return {row["link_hash"]: row["canonical_hash"] for row in rows}
+
+    def contains(self, link: str) -> bool:
+        """Whether an article with this (normalized) link is already stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM articles WHERE link_hash = ?", (link_hash(link),)
+            ).fetchone()
+        return row is not None
+
+    def upsert(self, items: List[NewsItem], fingerprints: Optional[List[str]] = None,
+               canonical_keys: Optional[Sequence[Optional[str]]] = None,
+               signatures: Optional[Sequence[Optional[Signature]]] = None) -> List[NewsItem]:
+        """Insert new articles and update changed ones; return the items actually written.
+
+        ``fingerprints`` lets the caller supply its own change detector (e.g. a
+        hash of the raw feed entry); by default the item content is hashed.
+        ``canonical_keys`` marks items that are near-duplicates of another
+        stored article (None for canonical items) and ``signatures`` holds
+        their MinHash signatures, kept for deduplicating later articles.
+        """
+        if fingerprints is None:
+            fingerprints = [item_fingerprint(item) for item in items]
+        canonical_keys = canonical_keys or [None] * len(items)
+        signatures = signatures or [None] * len(items)
+        keyed = {link_hash(item.link): (item, fp, canonical, signature)
+                 for item, fp, canonical, signature in zip(items, fingerprints, canonical_keys, signatures)}
+        known = self.fingerprints(keyed.keys())
+        changed = {key: value for key, value in keyed.items() if known.get(key) != value[1]}
+        if not changed:
+            return []
+
+        now = time.time()
+        with self._lock, self._conn:
+            for key, (item, fp, canonical, signature) in changed.items():
+                self._conn.execute(
+                    """INSERT INTO articles (link_hash, link, title, description, date, tags, authors, source,
+                                             published_ts, fingerprint, first_seen, updated_at,
+                                             canonical_hash, minhash, content_hash)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (link_hash) DO UPDATE SET
+                           link = excluded.link, title = excluded.title,
+                           description = excluded.description, date = excluded.date,
+                           tags = excluded.tags, authors = excluded.authors, source = excluded.source,
+                           published_ts = excluded.published_ts, fingerprint = excluded.fingerprint,
+                           updated_at = excluded.updated_at, canonical_hash = excluded.canonical_hash,
+                           minhash = excluded.minhash, content_hash = excluded.content_hash""",
+                    (key, item.link, item.title, item.description, item.date, json.dumps(item.tags),
+                     json.dumps(item.authors), item.source, _published_ts(item), fp, now, now,
+                     canonical, pack_signature(signature) if signature else None, content_hash(item)),
+                )
+                self._conn.execute("DELETE FROM article_tags WHERE link_hash = ?", (key,))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO article_tags (link_hash, tag) VALUES (?, ?)",
+                    [(key, tag) for tag in item.tags],
+                )
+        return [value[0] for value in changed.values()]
+
+    def query(self, source: Optional[str] = None, tag: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              limit: Optional[int] = None) -> List[NewsItem]:
+        """Return canonical articles matching the filters, most recently published first."""
+        clauses, params = ["a.canonical_hash IS NULL"], []
+        if source:
+            clauses.append("a.source = ?")
+            params.append(source)
+        if tag:
+            clauses.append("a.link_hash IN (SELECT link_hash FROM article_tags WHERE tag = ? COLLATE NOCASE)")
+            params.append(tag)
+        if since:
+            clauses.append("a.published_ts >= ?")
+            params.append(since.timestamp())
+        if until:
+            clauses.append("a.published_ts < ?")
+            params.append(until.timestamp())
+        sql = "SELECT * FROM articles a WHERE " + " AND ".join(clauses)
+        # Undated articles sort by when we first saw them
+        sql += " ORDER BY COALESCE(a.published_ts, a.first_seen) DESC, a.first_seen DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return self._rows_to_items(rows)
+
+    def get_many(self, link_hashes: Iterable[str]) -> List[NewsItem]:
+        """Load the given articles, in the order of ``link_hashes``; unknown keys are skipped."""
+        keys = list(link_hashes)
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM articles WHERE link_hash IN ({placeholders})", keys
+            ).fetchall()
+        by_key = {row["link_hash"]: row for row in rows}
+        return self._rows_to_items([by_key[key] for key in keys if key in by_key])
+
+    def iter_articles(self, batch_size: int = 500) -> Iterator[NewsItem]:
+        """Yield every canonical article in batches, without holding the whole corpus in memory."""
+        for rows in self._iter_canonical_rows("*", batch_size):
+            yield from self._rows_to_items(rows)
+
+    def iter_signatures(self, batch_size: int = 2000) -> Iterator[Tuple[str, Signature, str]]:
+        """Yield (link hash, MinHash signature, source) for every canonical article that has a signature."""
+        for rows in self._iter_canonical_rows("link_hash, minhash, source", batch_size):
+            for row in rows:
+                if row["minhash"] is not None:
+                    yield row["link_hash"], unpack_signature(row["minhash"]), row["source"]
+
+    def _iter_canonical_rows(self, columns: str, batch_size: int) -> Iterator[List[sqlite3.Row]]:
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT rowid, {columns} FROM articles WHERE rowid > ? AND canonical_hash IS NULL "
+                    "ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1]["rowid"]
+            yield rows
+
+    def _syndicated(self, canonical_keys: List[str]) -> Dict[str, List[SourceLink]]:
+        """Stored near-duplicate copies of each of the given canonical articles."""
+        if not canonical_keys:
+            return {}
+        placeholders = ",".join("?" * len(canonical_keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT canonical_hash, source, link FROM articles
+                    WHERE canonical_hash IN ({placeholders}) ORDER BY first_seen""",
+                canonical_keys,
+            ).fetchall()
+        copies: Dict[str, List[SourceLink]] = {}
+        for row in rows:
+            copies.setdefault(row["canonical_hash"], []).append(
+                SourceLink.model_construct(source=sys.intern(row["source"]), link=row["link"]))
+        return copies
+
+    def _rows_to_items(self, rows: List[sqlite3.Row]) -> List[NewsItem]:
+        copies = self._syndicated([row["link_hash"] for row in rows])
+        return [self._row_to_item(row, copies.get(row["link_hash"], [])) for row in rows]
+
+    def summaries(self, items: Iterable[NewsItem]) -> Dict[str, ArticleSummary]:
+        """Cached summaries of the given articles, keyed by their content hash; missing ones are left out."""
+        keys = list({content_hash(item) for item in items})
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM article_summaries WHERE content_hash IN ({placeholders})", keys
+            ).fetchall()
+        return {
+            row["content_hash"]: ArticleSummary.model_construct(
+                summary=row["summary"], entities=list(intern_all(json.loads(row["entities"]))))
+            for row in rows
+        }
+
+    def save_summaries(self, summaries: Dict[str, ArticleSummary]) -> None:
+        """Cache generated summaries by content hash."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO article_summaries (content_hash, summary, entities, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, value.summary, json.dumps(value.entities), now) for key, value in summaries.items()],
+            )
+
+    def unsummarized(self, limit: int, exclude: Iterable[str] = ()) -> List[NewsItem]:
+        """Canonical articles whose text has no cached summary yet, most recent first.
+
+        ``exclude`` lists content hashes to skip, e.g. ones whose summary just failed.
+        """
+        exclude = list(exclude)
+        placeholders = ",".join("?" * len(exclude))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT * FROM articles a
+                    WHERE a.canonical_hash IS NULL AND a.content_hash IS NOT NULL
+                      AND a.content_hash NOT IN ({placeholders})
+                      AND NOT EXISTS (SELECT 1 FROM article_summaries s WHERE s.content_hash = a.content_hash)
+                    ORDER BY COALESCE(a.published_ts, a.first_seen) DESC LIMIT ?""",
+                exclude + [limit],
+            ).fetchall()
+        return self._rows_to_items(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def prune(self, max_articles: int) -> List[str]:
+        """Delete all but the ``max_articles`` most recent canonical articles, with their copies.
+
+        Summaries no longer used by any article go too. Returns the link hashes
+        of the deleted canonical articles, so the caller can drop them from its indexes.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT link_hash FROM articles WHERE canonical_hash IS NULL "
+                "ORDER BY COALESCE(published_ts, first_seen) DESC, first_seen DESC LIMIT -1 OFFSET ?",
+                (max_articles,),
+            ).fetchall()
+            keys = [row["link_hash"] for row in rows]
+            if not keys:
+                return []
+            params = [(key,) for key in keys]
+            self._conn.executemany("DELETE FROM articles WHERE canonical_hash = ?", params)
+            self._conn.executemany("DELETE FROM articles WHERE link_hash = ?", params)
+            self._conn.execute(
+                "DELETE FROM article_summaries WHERE content_hash NOT IN "
+                "(SELECT content_hash FROM articles WHERE content_hash IS NOT NULL)"
+            )
+        return keys
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row, syndicated: Optional[List[SourceLink]] = None) -> NewsItem:
+        # Rows were validated when they were written: skip pydantic validation on the way back
+        return NewsItem.model_construct(
+            title=row["title"],
+            description=row["description"],
+            link=row["link"],
+            published_at=(datetime.fromtimestamp(row["published_ts"], timezone.utc)
+                          if row["published_ts"] is not None else None),
+            tags=list(intern_all(json.loads(row["tags"]))),
+            authors=list(intern_all(json.loads(row["authors"]))),
+            source=sys.intern(row["source"]),
+            syndicated=syndicated or [],
+        )
@@ -0,0 +1,83 @@
+import json
+import re
+from typing import Dict, List, Optional
+
+from google_adk import Agent
+from google_adk.llm import Gemini
+
+from models.context_packer import leading_text
+from models.llm_admission import AdmissionController
+from models.metrics import Metrics
+from models.response_models import ArticleSummary, NewsItem
+
+JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+MAX_ENTITIES = 8
+
+
+class ArticleSummaryAgent(Agent):
+    """Writes a compact summary and key-entity list for a batch of articles in one LLM call.
+
+    Requests share the bot's admission layer under their own session id, so
+    background summarizing is queued fairly alongside user questions.
+    """
+
+    def __init__(self, model_name: str = "gemini-1.5-flash", metrics: Optional[Metrics] = None,
+                 admission: Optional[AdmissionController] = None, max_body_tokens: int = 800,
+                 session_id: str = "ingest-summaries"):
+        super().__init__()
+        self.metrics = metrics or Metrics()
+        self.admission = admission or AdmissionController()
+        self.max_body_tokens = max_body_tokens # Long articles are summarized from their leading paragraphs
+        self.session_id = session_id
+        self.llm = Gemini(model_name=model_name)
+
+    def build_prompt(self, items: List[NewsItem]) -> str:
+        articles = "\n".join(
+            f"[{i}] Title: {item.title}\nSource: {item.source}\n"
+            f"Content: {leading_text(item.description, self.max_body_tokens)}\n---"
+            for i, item in enumerate(items, start=1)
+        )
+        return f"""Summarize each IoT news article below for a news assistant that answers questions from these summaries.
+For each article write 2-3 factual sentences that keep names, numbers and dates, and list up to {MAX_ENTITIES} key entities (companies, people, products, technologies, standards).
+Reply with only a JSON array, one object per article: [{{"id": 1, "summary": "...", "entities": ["..."]}}]
+
+{articles}"""
+
+    @staticmethod
+    def parse(text: str, count: int) -> Dict[int, ArticleSummary]:
+        """Summaries by 0-based article position; malformed or missing entries are left out."""
+        match = JSON_ARRAY_RE.search(text)
+        if not match:
+            return {}
+        try:
+            entries = json.loads(match.group(0))
+        except ValueError:
+            return {}
+        summaries = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            index, summary = entry.get("id"), entry.get("summary")
+            if not (isinstance(index, int) and 1 <= index <= count and isinstance(summary, str) and summary.strip()):
+                continue
+            entities = [str(entity).strip() for entity in entry.get("entities") or [] if str(entity).strip()]
+            summaries[index - 1] = ArticleSummary(summary=summary.strip(), entities=entities[:MAX_ENTITIES])
+        return summaries
+
+    async def summarize(self, items: List[NewsItem]) -> Dict[int, ArticleSummary]:
+        """Summaries by position in ``items``; articles the model skipped are left out."""
+        prompt = self.build_prompt(items)
+        async with self.admission.slot(self.session_id):
+            attempt = 0
+            while True:
+                try:
+                    with self.metrics.span("summary_generate"):
+                        text = await self.llm.generate_text(prompt=prompt)
+                    break
+                except Exception as e:
+                    status = await self.admission.retry_after(e, attempt)
+                    if status is None:
+                        raise
+                    self.metrics.inc("llm_retries_total", status=status)
+                    attempt += 1
+        return self.parse(text, len(items))
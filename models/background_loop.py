@@ -0,0 +1,113 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """A long-lived asyncio event loop on a daemon thread, shared by all sessions.
+
+    Synchronous code (Streamlit script threads, the CLI) hands coroutines to
+    the loop with ``submit``/``run`` and async generators with ``iterate``,
+    from any thread. Async clients created while running here, such as the
+    Gemini SDK client and its connection pool, stay bound to this one loop
+    and are reused across queries instead of being rebuilt per message. The
+    loop starts on first use.
+    """
+
+    def __init__(self, name: str = "async-loop"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            if not self._loop:
+                return
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the loop from any thread; returns a thread-safe future."""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("BackgroundLoop.submit() called from the loop's own thread; await instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block the calling thread until it finishes.
+
+        On timeout the coroutine is cancelled before ``TimeoutError`` is raised.
+        """
+        return self._wait(self.submit(coro), timeout)
+
+    @staticmethod
+    def _wait(future: "concurrent.futures.Future[T]", timeout: Optional[float],
+              on_wait: Optional[Callable[[], None]] = None, poll_interval: float = 0.25) -> T:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            step = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if on_wait is not None:
+                step = poll_interval if step is None else min(step, poll_interval)
+            try:
+                return future.result(step)
+            except concurrent.futures.TimeoutError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    future.cancel()
+                    raise
+                on_wait()
+
+    def iterate(self, agen: AsyncIterator[T], timeout: Optional[float] = None,
+                on_wait: Optional[Callable[[], None]] = None) -> Iterator[T]:
+        """Consume an async generator on the loop, yielding its items to the calling thread.
+
+        ``timeout`` bounds the wait for each item; ``on_wait`` is called on
+        the calling thread every quarter second while an item is pending (e.g.
+        to show progress). Closing the returned generator early also closes
+        ``agen`` on the loop.
+        """
+        try:
+            while True:
+                try:
+                    item = self._wait(self.submit(agen.__anext__()), timeout, on_wait)
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            aclose = getattr(agen, "aclose", None)
+            if aclose is not None and self._loop is not None:
+                try:
+                    self.run(aclose(), timeout)
+                except RuntimeError:
+                    pass # Still unwinding a cancelled step; it finishes on the loop
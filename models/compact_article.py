@@ -0,0 +1,54 @@
+import sys
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+from models.response_models import NewsItem
+
+
+def intern_all(values: Iterable[str]) -> Tuple[str, ...]:
+    """Intern a list of repeated strings (tags, authors) so every article shares one copy."""
+    return tuple(sys.intern(value) for value in values)
+
+
+class ArticleMeta:
+    """Compact, bodiless record of one stored article.
+
+    Indexes hold one of these per article instead of a full ``NewsItem``:
+    slots instead of an instance dict, a float timestamp instead of a
+    ``datetime``, and interned source, tag and author strings, which repeat
+    across thousands of articles. The body stays in the article store and is
+    loaded only for the articles actually selected for a prompt.
+    """
+
+    __slots__ = ("key", "title", "link", "source", "published_ts", "tags", "authors")
+
+    def __init__(self, key: str, title: str, link: str, source: str, published_ts: Optional[float],
+                 tags: Tuple[str, ...] = (), authors: Tuple[str, ...] = ()):
+        self.key = key
+        self.title = title
+        self.link = link
+        self.source = sys.intern(source)
+        self.published_ts = published_ts
+        self.tags = intern_all(tags)
+        self.authors = intern_all(authors)
+
+    @classmethod
+    def from_item(cls, key: str, item: NewsItem) -> "ArticleMeta":
+        return cls(
+            key=key,
+            title=item.title,
+            link=item.link,
+            source=item.source,
+            published_ts=item.published_at.timestamp() if item.published_at else None,
+            tags=item.tags,
+            authors=item.authors,
+        )
+
+    @property
+    def published_at(self) -> Optional[datetime]:
+        if self.published_ts is None:
+            return None
+        return datetime.fromtimestamp(self.published_ts, timezone.utc)
+
+    def __repr__(self) -> str:
+        return f"ArticleMeta(key={self.key!r}, title={self.title!r}, source={self.source!r})"
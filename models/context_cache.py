@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, FrozenSet, Optional, Tuple
+
+from models.context_packer import estimate_tokens
+from models.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Bump when the instruction text changes, so cached prefixes are never mixed across prompt versions
+PROMPT_TEMPLATE_VERSION = 2
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """The stable head of every prompt: instructions plus the current news snapshot."""
+    text: str
+    article_keys: FrozenSet[str] = field(default_factory=frozenset) # Articles already in the prefix
+    key: str = ""
+
+    def __post_init__(self):
+        if not self.key:
+            digest = hashlib.sha1(self.text.encode("utf-8")).hexdigest()[:16]
+            object.__setattr__(self, "key", f"v{PROMPT_TEMPLATE_VERSION}-{digest}")
+
+
+class ContextCache(ABC):
+    """Registers one prompt prefix at a time with a backend and hands out a model bound to it.
+
+    Queries then send only their own suffix. A prefix with a new key (a new
+    corpus snapshot or prompt version) replaces and releases the previous
+    one; registration happens once per key however many queries arrive
+    together. Prefixes below the backend's ``min_tokens`` are never sent,
+    and after a failed registration no new one is tried for a backoff that
+    doubles with each failure, so a backend that keeps refusing is not
+    called on every snapshot. All methods run on the bot's event loop.
+    """
+
+    min_tokens = 0 # Smallest prefix the backend will cache
+
+    def __init__(self, ttl: float = 3600.0, metrics: Optional[Metrics] = None, release_delay: float = 120.0,
+                 failure_backoff: float = 600.0, max_failure_backoff: float = 6 * 3600.0):
+        self.ttl = ttl
+        self.release_delay = release_delay # Grace period for queries still using the replaced prefix
+        self.failure_backoff = failure_backoff
+        self.max_failure_backoff = max_failure_backoff
+        self.metrics = metrics or Metrics()
+        self._lock: Optional[asyncio.Lock] = None
+        self._current: Optional[Tuple[str, Any, float]] = None # (key, handle, registered at)
+        self._failures = 0
+        self._retry_at = 0.0 # No registration is attempted before this (monotonic) time
+
+    async def model_for(self, prefix: PromptPrefix, base_model) -> Optional[Any]:
+        """A model that already holds ``prefix``, or None to send the full prompt instead."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            current = self._current
+            # Refresh a little before the backend would expire the entry
+            if current and current[0] == prefix.key and time.monotonic() - current[2] < self.ttl * 0.9:
+                self.metrics.inc("prompt_prefix_hits_total")
+                return self._bind(current[1], base_model)
+            if estimate_tokens(prefix.text) < self.min_tokens:
+                self.metrics.inc("prompt_prefix_too_small_total")
+                return None
+            if time.monotonic() < self._retry_at:
+                return None
+            try:
+                with self.metrics.span("prompt_prefix_register"):
+                    handle = await self._register(prefix, base_model)
+            except Exception as e:
+                # Fall back to full prompts, and leave the backend alone for a while
+                backoff = min(self.max_failure_backoff, self.failure_backoff * 2 ** self._failures)
+                self._failures += 1
+                self._retry_at = time.monotonic() + backoff
+                self.metrics.inc("prompt_prefix_errors_total")
+                logger.warning("Could not cache prompt prefix %s: %s; not retrying for %.0fs", prefix.key, e, backoff)
+                return None
+            self._failures = 0
+            self._current = (prefix.key, handle, time.monotonic())
+            self.metrics.inc("prompt_prefix_registrations_total")
+            if current is not None:
+                old_handle = current[1]
+                asyncio.get_running_loop().call_later(
+                    self.release_delay, lambda: asyncio.ensure_future(self._release_quietly(old_handle)))
+            return self._bind(handle, base_model)
+
+    async def _release_quietly(self, handle: Any) -> None:
+        try:
+            await self._release(handle)
+        except Exception as e:
+            logger.info("Releasing a cached prompt prefix failed: %s", e)
+
+    @abstractmethod
+    async def _register(self, prefix: PromptPrefix, base_model) -> Any:
+        """Upload ``prefix`` to the backend; returns a handle for ``_bind`` and ``_release``."""
+
+    async def _release(self, handle: Any) -> None:
+        pass
+
+    @abstractmethod
+    def _bind(self, handle: Any, base_model) -> Any:
+        """A model that sends every request after the registered prefix."""
+
+
+class GeminiContextCache(ContextCache):
+    """Uses the Gemini API's context caching: the prefix is uploaded and processed once per key.
+
+    The API only caches prefixes of at least ~32k tokens, for a versioned
+    model id such as ``gemini-1.5-flash-001``.
+    """
+
+    min_tokens = 32768
+    min_sdk_version = (0, 7, 0) # First google-generativeai release with genai.caching
+
+    def __init__(self, model_name: str, ttl: float = 3600.0, metrics: Optional[Metrics] = None):
+        super().__init__(ttl, metrics)
+        self.model_name = model_name
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the installed google-generativeai has context caching (0.3.2, as pinned, does not)."""
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            return False
+        version = tuple(int(part) for part in re.findall(r"\d+", getattr(genai, "__version__", "0"))[:3])
+        if version < cls.min_sdk_version:
+            return False
+        return (importlib.util.find_spec("google.generativeai.caching") is not None
+                and hasattr(genai.GenerativeModel, "from_cached_content"))
+
+    @staticmethod
+    def versioned(model_name: str) -> bool:
+        return re.search(r"-\d{3}$", model_name) is not None
+
+    async def _register(self, prefix: PromptPrefix, base_model) -> Any:
+        import google.generativeai as genai
+        return await asyncio.to_thread(
+            genai.caching.CachedContent.create,
+            model=f"models/{self.model_name}",
+            display_name=f"news-prompt-{prefix.key}",
+            contents=[prefix.text],
+            ttl=timedelta(seconds=self.ttl),
+        )
+
+    async def _release(self, handle: Any) -> None:
+        await asyncio.to_thread(handle.delete)
+
+    def _bind(self, handle: Any, base_model) -> Any:
+        import google.generativeai as genai
+        return genai.GenerativeModel.from_cached_content(cached_content=handle)
+
+
+class _PrefixedModel:
+    """Wraps a model so every request is sent as prefix + suffix."""
+
+    def __init__(self, model, prefix: str):
+        self.model = model
+        self.prefix = prefix
+
+    async def generate_content_async(self, prompt: str, **kwargs):
+        return await self.model.generate_content_async(f"{self.prefix}\n\n{prompt}", **kwargs)
+
+
+class LocalContextCache(ContextCache):
+    """In-process stand-in for a backend context cache, for tests and benchmarks.
+
+    Keeps the registration and invalidation behaviour (and its metrics) but
+    still sends the full prompt, so it saves no tokens by itself.
+    """
+
+    async def _register(self, prefix: PromptPrefix, base_model) -> Any:
+        return prefix.text
+
+    def _bind(self, handle: Any, base_model) -> Any:
+        return _PrefixedModel(base_model, handle)
+
+
+def context_cache_from_env(mode: str, model_name: str, ttl: float, metrics: Optional[Metrics] = None,
+                           prefix_token_budget: Optional[int] = None) -> Optional[ContextCache]:
+    """The context cache for ``PROMPT_CONTEXT_CACHE`` (auto, gemini, local or off); None when disabled.
+
+    ``auto`` is off: Gemini only caches prefixes of ~32k tokens or more, which
+    needs a prefix budget (``prefix_token_budget``) far above a single query's
+    context, so it has to be asked for explicitly (``gemini``, with a
+    caching-capable SDK and a versioned ``model_name``).
+    """
+    mode = mode.strip().lower()
+    if mode == "gemini":
+        if not GeminiContextCache.available():
+            logger.warning("Gemini context caching needs google-generativeai %s or later with genai.caching; "
+                           "sending full prompts", ".".join(map(str, GeminiContextCache.min_sdk_version)))
+            return None
+        if prefix_token_budget is not None and prefix_token_budget < GeminiContextCache.min_tokens:
+            logger.warning("PROMPT_PREFIX_TOKEN_BUDGET=%d is below Gemini's %d-token caching minimum; "
+                           "sending full prompts", prefix_token_budget, GeminiContextCache.min_tokens)
+            return None
+        if not GeminiContextCache.versioned(model_name):
+            logger.warning("Gemini context caching needs a versioned model id (e.g. gemini-1.5-flash-001), "
+                           "not %r; sending full prompts", model_name)
+            return None
+        return GeminiContextCache(model_name, ttl, metrics)
+    if mode == "local":
+        return LocalContextCache(ttl, metrics)
+    if mode not in ("auto", "off", ""):
+        logger.warning("Unknown PROMPT_CONTEXT_CACHE mode %r; sending full prompts", mode)
+    return None
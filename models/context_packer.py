@@ -0,0 +1,132 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from models.article_store import content_hash, link_hash
+from models.response_models import ArticleSummary, NewsItem
+
+# Rough chars-per-token ratio for English prose with Gemini/SentencePiece tokenizers
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = " [...]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; good enough for budgeting without a tokenizer round trip."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def format_news_item(item: NewsItem, body: Optional[str] = None, truncated: bool = False,
+                     summary: Optional[ArticleSummary] = None) -> str:
+    """Format a news item for the agent context, with its full or shortened body or only its summary."""
+    if summary is not None:
+        content = f"Summary: {summary.summary}\nKey entities: {', '.join(summary.entities) or 'N/A'}"
+    else:
+        content_label = "Content (truncated)" if truncated else "Full Content"
+        content = f"{content_label}: {item.description if body is None else body}"
+    return f"""Title: {item.title}
+Date: {item.date}
+Source: {item.source}
+{'Authors: ' + ', '.join(item.authors) if item.authors else ''}
+{'Also reported by: ' + ', '.join(f'{copy.source} ({copy.link})' for copy in item.syndicated) if item.syndicated else ''}
+{content}
+Topics: {', '.join(item.tags) if item.tags else 'N/A'}
+Source URL: {item.link}
+---"""
+
+
+def leading_text(text: str, max_tokens: int) -> str:
+    """Return the leading paragraphs of ``text`` that fit in ``max_tokens``.
+
+    Whole paragraphs are kept while they fit; the first paragraph that does
+    not is cut at a word boundary and marked as truncated.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+    kept = []
+    used = 0
+    for paragraph in text.split("\n"):
+        cost = len(paragraph) + (1 if kept else 0)
+        if used + cost <= max_chars:
+            kept.append(paragraph)
+            used += cost
+            continue
+        room = max_chars - used - (1 if kept else 0)
+        if room > 0:
+            cut = paragraph[:room].rsplit(" ", 1)[0] if " " in paragraph[:room] else paragraph[:room]
+            kept.append(cut)
+        break
+    return "\n".join(kept).rstrip() + TRUNCATION_MARKER
+
+
+@dataclass
+class PackedContext:
+    """The packed prompt context plus a report of what did not fit."""
+    text: str
+    tokens: int
+    included: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    summarized: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    # Link hashes of the dropped and summarized articles: titles are not unique across feeds
+    partial_keys: Set[str] = field(default_factory=set)
+
+
+class ContextPacker:
+    """Fit ranked articles into a fixed token budget for the agent prompt.
+
+    Title and metadata are always kept for an included article; bodies are
+    limited to their leading paragraphs (``max_body_tokens``) and shortened
+    further when the budget runs low. Only the first ``full_text_articles``
+    carry their text: later ones are given as their ingest-time summary when
+    one is cached. Articles whose metadata plus a minimal body no longer fit
+    are dropped and reported.
+    """
+
+    def __init__(self, token_budget: int = 6000, max_body_tokens: int = 600, min_body_tokens: int = 60,
+                 full_text_articles: int = 3):
+        self.token_budget = token_budget
+        self.max_body_tokens = max_body_tokens
+        self.min_body_tokens = min_body_tokens
+        self.full_text_articles = full_text_articles
+
+    def pack(self, items: List[NewsItem], summaries: Optional[Dict[str, ArticleSummary]] = None) -> PackedContext:
+        """Pack items (most relevant first) into the budget.
+
+        ``summaries`` maps content hashes to cached summaries, used for the
+        articles past the first ``full_text_articles``.
+        """
+        blocks: List[str] = []
+        packed = PackedContext(text="", tokens=0)
+        for rank, item in enumerate(items):
+            remaining = self.token_budget - packed.tokens
+            summary = (summaries or {}).get(content_hash(item)) if rank >= self.full_text_articles else None
+            if summary is not None:
+                block = format_news_item(item, summary=summary)
+                packed.partial_keys.add(link_hash(item.link))
+                if estimate_tokens(block) > remaining:
+                    packed.dropped.append(item.title)
+                    continue
+                blocks.append(block)
+                packed.tokens += estimate_tokens(block) + 1
+                packed.included.append(item.title)
+                packed.summarized.append(item.title)
+                continue
+
+            header_tokens = estimate_tokens(format_news_item(item, body="", truncated=True))
+            body_budget = min(self.max_body_tokens, remaining - header_tokens)
+            if body_budget < min(self.min_body_tokens, estimate_tokens(item.description)):
+                packed.dropped.append(item.title)
+                packed.partial_keys.add(link_hash(item.link))
+                continue
+
+            body = leading_text(item.description, body_budget)
+            truncated = body is not item.description
+            block = format_news_item(item, body=body, truncated=truncated)
+            blocks.append(block)
+            packed.tokens += estimate_tokens(block) + 1 # +1 for the joining newline
+            packed.included.append(item.title)
+            if truncated:
+                packed.truncated.append(item.title)
+
+        packed.text = "\n".join(blocks)
+        return packed
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "feed_cache.json")
+
+
+class FeedCache:
+    """On-disk HTTP validator cache for feeds.
+
+    Stores the ETag / Last-Modified headers for every feed URL so a refresh
+    can send a conditional GET; when the server answers 304 Not Modified the
+    previously parsed articles are reused from the article store. The cache
+    is a single JSON file, rewritten atomically, so it survives restarts.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            # Missing or corrupt cache simply means every feed is fetched in full
+            return {}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return the If-None-Match / If-Modified-Since headers for a feed URL."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Remember the validators of a freshly fetched feed."""
+        with self._lock:
+            if etag or last_modified:
+                self._entries[url] = {"etag": etag, "last_modified": last_modified}
+            else:
+                self._entries.pop(url, None)
+
+    def clear(self) -> None:
+        """Forget all validators so every feed is fetched in full next time."""
+        with self._lock:
+            self._entries.clear()
+
+    def save(self) -> None:
+        """Persist the cache atomically so a crash never leaves a half-written file."""
+        with self._lock:
+            payload = json.dumps(self._entries)
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".feed_cache.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,153 @@
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import feedparser
+
+from models.feed_stream_parser import StreamingFeedParser
+
+USER_AGENT = "IoTNewsAssistant/0.1 (+https://github.com/syedasad-kiwi/electronicPOC)"
+
+
+@dataclass
+class FeedResult:
+    """Outcome of fetching and parsing a single feed URL."""
+    url: str
+    feed: Optional[Any] = None # feedparser.FeedParserDict when the fetch succeeded
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    # Set when the server answered 304 to a conditional GET; the caller reuses its cached items
+    not_modified: bool = False
+    # True when the streaming parser handled the feed, False when it fell back to feedparser
+    streamed: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and (self.feed is not None or self.not_modified)
+
+
+class FeedFetcher:
+    """Fetch many RSS/Atom feeds concurrently with per-feed deadlines.
+
+    Every feed gets its own connect timeout and read deadline, and the whole
+    batch is bounded by ``overall_timeout``. Feeds that have not finished by
+    then are reported as timed out so callers can work with partial results;
+    refresh latency therefore tracks the slowest healthy feed rather than the
+    sum of all feeds.
+
+    Bodies are parsed while they download by ``StreamingFeedParser``, which
+    stops (and closes the connection) once ``max_entries`` entries or an
+    already-seen entry have been read; malformed feeds fall back to a full
+    ``feedparser`` parse.
+    """
+
+    def __init__(self, max_workers: int = 8, connect_timeout: float = 5.0,
+                 read_timeout: float = 10.0, overall_timeout: Optional[float] = None,
+                 chunk_size: int = 64 * 1024, cache=None, max_entries: int = 20):
+        self.max_workers = max_workers
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # Slack on top of the per-feed deadlines before giving up on stragglers
+        self.overall_timeout = overall_timeout or (connect_timeout + read_timeout + 2.0)
+        self.chunk_size = chunk_size
+        # Optional FeedCache supplying ETag / Last-Modified validators for conditional GETs
+        self.cache = cache
+        self.max_entries = max_entries
+
+    def _download(self, url: str, extra_headers: Optional[Dict[str, str]] = None,
+                  is_seen: Optional[Callable[[str], bool]] = None) -> Tuple[Any, Dict[str, str], bool]:
+        """Download and parse a feed, enforcing the connect and read deadlines.
+
+        Returns the parsed feed, the validator headers of the response and
+        whether the streaming parser produced it.
+        """
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8",
+        }
+        headers.update(extra_headers or {})
+        request = urllib.request.Request(url, headers=headers)
+        parser: Optional[StreamingFeedParser] = StreamingFeedParser(self.max_entries, is_seen)
+        # The socket timeout bounds the connect and every individual recv;
+        # the read deadline bounds the total time spent streaming the body.
+        with urllib.request.urlopen(request, timeout=self.connect_timeout) as response:
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            deadline = time.monotonic() + self.read_timeout
+            chunks = []
+            while True:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"read deadline of {self.read_timeout}s exceeded")
+                chunk = response.read(self.chunk_size)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if parser is not None:
+                    try:
+                        parser.feed(chunk)
+                    except ET.ParseError:
+                        parser = None # Malformed for a strict XML parser; let feedparser cope
+                        continue
+                    if parser.done:
+                        # Early exit: everything further down the feed is unused
+                        return parser.result(), validators, True
+
+        if parser is not None:
+            try:
+                parser.close()
+                return parser.result(), validators, True
+            except ET.ParseError:
+                pass
+        return feedparser.parse(b"".join(chunks)), validators, False
+
+    def fetch_one(self, url: str, is_seen: Optional[Callable[[str], bool]] = None) -> FeedResult:
+        """Fetch and parse one feed, capturing any error on the result."""
+        started = time.monotonic()
+        conditional = self.cache.conditional_headers(url) if self.cache else {}
+        try:
+            feed, validators, streamed = self._download(url, conditional, is_seen)
+            return FeedResult(url=url, feed=feed, elapsed=time.monotonic() - started, streamed=streamed,
+                              etag=validators["etag"], last_modified=validators["last_modified"])
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and conditional:
+                return FeedResult(url=url, not_modified=True, elapsed=time.monotonic() - started)
+            return FeedResult(url=url, error=f"HTTP {e.code}: {e.reason}",
+                              elapsed=time.monotonic() - started)
+        except Exception as e:
+            return FeedResult(url=url, error=str(e) or type(e).__name__,
+                              elapsed=time.monotonic() - started)
+
+    def fetch_all(self, urls: List[str], is_seen: Optional[Callable[[str], bool]] = None) -> List[FeedResult]:
+        """Fetch all feeds in parallel and return results in the order of ``urls``.
+
+        ``is_seen(link)`` lets parsing stop at the first entry already stored.
+        """
+        if not urls:
+            return []
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)),
+                                      thread_name_prefix="feed-fetch")
+        started = time.monotonic()
+        try:
+            futures = {url: executor.submit(self.fetch_one, url, is_seen) for url in urls}
+            wait(futures.values(), timeout=self.overall_timeout)
+        finally:
+            # Never block the caller on a stalled host; its worker exits on its own deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results = []
+        for url, future in futures.items():
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                results.append(FeedResult(url=url, error=f"timed out after {self.overall_timeout}s",
+                                          elapsed=time.monotonic() - started))
+        return results
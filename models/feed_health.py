@@ -0,0 +1,158 @@
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from models.metrics import Metrics
+
+
+@dataclass
+class FeedHealth:
+    """Rolling health of one feed."""
+    url: str
+    latencies: Deque[float] = field(default_factory=deque)
+    outcomes: Deque[bool] = field(default_factory=deque) # True for a successful fetch
+    consecutive_failures: int = 0
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+    open_until: Optional[float] = None # Circuit open (feed skipped) until then
+    published: List[float] = field(default_factory=list) # Most recent publication times seen, ascending
+
+    @property
+    def error_rate(self) -> float:
+        return 1 - sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def latency_p50(self) -> float:
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+
+class FeedHealthTracker:
+    """Per-feed health for the refresh loop: circuit breaking, backoff and adaptive polling.
+
+    Keeps each feed's rolling fetch latency and error rate and its last
+    success. After ``failure_threshold`` consecutive failures (errors,
+    timeouts, unparsable XML) the feed's circuit opens and it is skipped for
+    ``backoff_base * 2**n`` seconds, capped at ``backoff_max``, while its
+    stored articles keep being served. Once the backoff expires one trial
+    fetch goes through: success closes the circuit, another failure reopens
+    it for twice as long.
+
+    Healthy feeds are polled about twice per typical gap between their
+    posts, within ``min_interval`` and ``max_interval``, so busy feeds are
+    polled often and quiet or dead ones rarely.
+    """
+
+    def __init__(self, failure_threshold: int = 3, backoff_base: float = 60.0, backoff_max: float = 6 * 3600.0,
+                 default_interval: float = 900.0, min_interval: float = 300.0, max_interval: float = 6 * 3600.0,
+                 adaptive: bool = True, window: int = 20, clock: Callable[[], float] = time.time):
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.adaptive = adaptive
+        self.window = window
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._feeds: Dict[str, FeedHealth] = {}
+
+    def _feed(self, url: str) -> FeedHealth:
+        health = self._feeds.get(url)
+        if health is None:
+            health = self._feeds[url] = FeedHealth(url, deque(maxlen=self.window), deque(maxlen=self.window))
+        return health
+
+    def allow(self, url: str) -> bool:
+        """False while the feed's circuit is open; True once its backoff has expired (a trial fetch)."""
+        with self._lock:
+            health = self._feeds.get(url)
+            return health is None or health.open_until is None or self.clock() >= health.open_until
+
+    def record_success(self, url: str, elapsed: float, published: Iterable[Optional[datetime]] = ()) -> None:
+        """A fetch that worked (including 304 Not Modified), with the publication times of the entries it listed."""
+        now = self.clock()
+        with self._lock:
+            health = self._feed(url)
+            health.latencies.append(elapsed)
+            health.outcomes.append(True)
+            health.consecutive_failures = 0
+            health.open_until = None
+            health.last_success = now
+            times = {published_at.timestamp() for published_at in published if published_at is not None}
+            if times:
+                # Future-dated entries would make the feed look busier than it is
+                merged = set(health.published) | {ts for ts in times if ts <= now}
+                health.published = sorted(merged)[-self.window:]
+
+    def record_failure(self, url: str, elapsed: float, error: str) -> bool:
+        """A failed fetch; returns True if it opened (or reopened) the feed's circuit."""
+        now = self.clock()
+        with self._lock:
+            health = self._feed(url)
+            health.latencies.append(elapsed)
+            health.outcomes.append(False)
+            health.consecutive_failures += 1
+            health.last_error = error
+            if health.consecutive_failures < self.failure_threshold:
+                return False
+            backoff = min(self.backoff_max,
+                          self.backoff_base * 2 ** (health.consecutive_failures - self.failure_threshold))
+            health.open_until = now + backoff
+            return True
+
+    def poll_interval(self, url: str) -> float:
+        """Seconds until the feed should be fetched again."""
+        with self._lock:
+            health = self._feeds.get(url)
+            return self.default_interval if health is None else self._poll_interval(health, self.clock())
+
+    def _poll_interval(self, health: FeedHealth, now: float) -> float:
+        if health.open_until is not None and health.open_until > now:
+            return health.open_until - now # Next try is the trial fetch after the backoff
+        if not self.adaptive or len(health.published) < 2:
+            return self.default_interval
+        gaps = [later - earlier for earlier, later in zip(health.published, health.published[1:])]
+        # A feed that has gone quiet for longer than its usual gap is polled less often
+        expected_gap = max(statistics.median(gaps), (now - health.published[-1]) / 2)
+        return min(self.max_interval, max(self.min_interval, expected_gap / 2))
+
+    @staticmethod
+    def _state(health: FeedHealth, now: float) -> str:
+        if health.consecutive_failures == 0:
+            return "healthy"
+        if health.open_until is None:
+            return "failing"
+        return "open" if now < health.open_until else "half-open"
+
+    def snapshot(self) -> List[Dict[str, object]]:
+        """One row per tracked feed, for the diagnostics panel."""
+        now = self.clock()
+        with self._lock:
+            return [{
+                "feed": url,
+                "state": self._state(health, now),
+                "error_rate": round(health.error_rate, 2),
+                "latency_p50_ms": round(health.latency_p50 * 1000, 1),
+                "failures": health.consecutive_failures,
+                "last_success": (datetime.fromtimestamp(health.last_success).strftime("%Y-%m-%d %H:%M")
+                                 if health.last_success else "never"),
+                "next_poll_s": round(self._poll_interval(health, now)),
+                "last_error": health.last_error or "",
+            } for url, health in sorted(self._feeds.items())]
+
+    def export(self, metrics: Metrics) -> None:
+        """Publish every feed's current health as gauges."""
+        now = self.clock()
+        with self._lock:
+            for url, health in self._feeds.items():
+                metrics.set_gauge("feed_up", 0 if self._state(health, now) in ("open", "half-open") else 1, feed=url)
+                metrics.set_gauge("feed_error_rate", health.error_rate, feed=url)
+                metrics.set_gauge("feed_consecutive_failures", health.consecutive_failures, feed=url)
+                metrics.set_gauge("feed_poll_interval_seconds", self._poll_interval(health, now), feed=url)
+                if health.last_success is not None:
+                    metrics.set_gauge("feed_last_success_timestamp_seconds", health.last_success, feed=url)
@@ -0,0 +1,153 @@
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional
+
+from feedparser import FeedParserDict
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+DC_CREATOR = "{http://purl.org/dc/elements/1.1/}creator"
+
+ENTRY_TAGS = ("item", RSS1 + "item", ATOM + "entry")
+FEED_TAGS = ("channel", RSS1 + "channel", ATOM + "feed")
+TITLE_TAGS = ("title", RSS1 + "title", ATOM + "title")
+
+
+def _parse_date(value: str):
+    """Parse an RFC 822 (RSS) or ISO 8601 (Atom) date into a UTC struct_time, or None."""
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.utctimetuple()
+
+
+def _text(element: ET.Element) -> str:
+    return (element.text or "").strip()
+
+
+def _markup(element: ET.Element) -> str:
+    """Content of a text construct: its text, or for inline XHTML (Atom ``type="xhtml"``) its markup."""
+    if len(element) == 0:
+        return element.text or ""
+    for node in element.iter():
+        if isinstance(node.tag, str) and node.tag.startswith("{"):
+            node.tag = node.tag.split("}", 1)[1] # Serialize as plain HTML, without namespace prefixes
+    if len(element) == 1 and element[0].tag == "div" and not (element.text or "").strip():
+        element = element[0] # Atom wraps inline XHTML in a single div, which feedparser drops too
+    return (element.text or "") + "".join(ET.tostring(child, encoding="unicode") for child in element)
+
+
+class StreamingFeedParser:
+    """Incremental RSS 2.0 / RSS 1.0 / Atom parser that stops early.
+
+    Bytes are fed as they are downloaded and entries are produced as soon
+    as their closing tag arrives, in the same ``FeedParserDict`` shape that
+    ``feedparser`` returns, so the ingest code handles both alike. Parsing is
+    ``done`` once ``max_entries`` entries were read or an entry whose link
+    ``is_seen`` is reached (feeds list newest first, so everything after it
+    is already known). Each parsed entry element is cleared, keeping memory
+    independent of feed length. Malformed XML raises ``ET.ParseError`` so the
+    caller can fall back to ``feedparser``.
+    """
+
+    def __init__(self, max_entries: int = 20, is_seen: Optional[Callable[[str], bool]] = None):
+        self.max_entries = max_entries
+        self.is_seen = is_seen
+        self.feed_title: Optional[str] = None
+        self.entries: List[FeedParserDict] = []
+        self.done = False
+        self.reached_seen = False # Stopped at an entry that is already known
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[str] = []
+
+    def feed(self, data: bytes) -> None:
+        """Consume a chunk of the document; sets ``done`` when no more entries are needed."""
+        if self.done:
+            return
+        self._parser.feed(data)
+        self._process_events()
+
+    def close(self) -> None:
+        """Signal the end of the document."""
+        if not self.done:
+            self._parser.close()
+            self._process_events()
+        self.done = True
+
+    def result(self) -> FeedParserDict:
+        return FeedParserDict(
+            feed=FeedParserDict(title=self.feed_title) if self.feed_title else FeedParserDict(),
+            entries=self.entries,
+            bozo=0,
+            reached_seen=self.reached_seen,
+        )
+
+    def _process_events(self) -> None:
+        for event, element in self._parser.read_events():
+            if event == "start":
+                self._stack.append(element.tag)
+                continue
+            self._stack.pop()
+            if element.tag in TITLE_TAGS and self._stack and self._stack[-1] in FEED_TAGS:
+                self.feed_title = self.feed_title or _text(element)
+            elif element.tag in ENTRY_TAGS:
+                entry = self._entry(element)
+                element.clear() # Drop the parsed subtree
+                if self.is_seen and entry.get("link") and self.is_seen(entry["link"]):
+                    self.reached_seen = True
+                    self.done = True
+                    return
+                self.entries.append(entry)
+                if len(self.entries) >= self.max_entries:
+                    self.done = True
+                    return
+
+    @staticmethod
+    def _entry(element: ET.Element) -> FeedParserDict:
+        entry = FeedParserDict()
+        tags, authors = [], []
+        for child in element:
+            tag = child.tag
+            if tag in TITLE_TAGS:
+                entry["title"] = _text(child)
+            elif tag in ("link", RSS1 + "link"):
+                entry["link"] = _text(child)
+            elif tag == ATOM + "link":
+                if child.get("rel", "alternate") == "alternate" and "link" not in entry:
+                    entry["link"] = child.get("href", "")
+            elif tag in ("description", RSS1 + "description", ATOM + "summary"):
+                entry["summary"] = _markup(child)
+            elif tag in (CONTENT_ENCODED, ATOM + "content"):
+                content = _markup(child)
+                if content.strip(): # Otherwise the summary is used (e.g. out-of-line Atom content)
+                    entry["content"] = [FeedParserDict(value=content)]
+            elif tag in ("pubDate", ATOM + "published") or (tag == ATOM + "updated" and "published" not in entry):
+                entry["published"] = _text(child)
+                published_parsed = _parse_date(entry["published"])
+                if published_parsed:
+                    entry["published_parsed"] = published_parsed
+            elif tag == "category":
+                if _text(child):
+                    tags.append(FeedParserDict(term=_text(child)))
+            elif tag == ATOM + "category":
+                if child.get("term"):
+                    tags.append(FeedParserDict(term=child.get("term")))
+            elif tag in (DC_CREATOR, "author"):
+                if _text(child):
+                    authors.append(FeedParserDict(name=_text(child)))
+            elif tag == ATOM + "author":
+                name = child.find(ATOM + "name")
+                if name is not None and _text(name):
+                    authors.append(FeedParserDict(name=_text(name)))
+        entry["tags"] = tags
+        entry["authors"] = authors
+        return entry
@@ -0,0 +1,121 @@
+import html
+import re
+
+# Whitespace normalization, applied to the tag-free text: blank-line runs
+# become one empty line, then space runs become a single space. Matching two
+# or more spaces (with a literal prefix) is much faster than rewriting every
+# single space as ` +` did.
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_SPACES_RE = re.compile(r'  +')
+
+
+def _match_br(text: str, start: int) -> int:
+    """Return the end of a ``<br>``, ``<br/>`` or ``<BR />`` tag at ``start``, or -1."""
+    if text[start + 1:start + 3].lower() != 'br':
+        return -1
+    i = start + 3
+    n = len(text)
+    while i < n and text[i].isspace():
+        i += 1
+    if i < n and text[i] == '/':
+        i += 1
+    return i + 1 if i < n and text[i] == '>' else -1
+
+
+def _drop_blocks(text: str, opening: str, closing: str) -> str:
+    """Remove every ``opening...closing`` block, contents included, leftmost first."""
+    start = text.find(opening)
+    if start == -1:
+        return text
+    out = []
+    i = 0
+    while start != -1:
+        end = text.find(closing, start + len(opening))
+        if end == -1:
+            break
+        out.append(text[i:start])
+        i = end + len(closing)
+        start = text.find(opening, i)
+    out.append(text[i:])
+    return ''.join(out)
+
+
+def _nested_tag_end(text: str, start: int) -> int:
+    """End of a tag at ``start`` whose text contains another ``<``, or -1 if it does not close.
+
+    The old cleaner turned ``<br>`` into line breaks before matching tags,
+    so a tag never continues past a ``<br>``. This rare path reproduces that.
+    """
+    n = len(text)
+    pos = start + 1
+    while True:
+        newline = text.find('\n', pos)
+        if newline == -1:
+            newline = n
+        end = text.find('>', pos, newline)
+        inner = text.find('<', pos, end if end != -1 else newline)
+        if inner == -1:
+            return end + 1 if end != -1 else -1
+        if _match_br(text, inner) != -1:
+            return -1
+        pos = inner + 1
+
+
+def clean_html(raw_html: str) -> str:
+    """Remove HTML tags and clean up text.
+
+    Produces the same text as the former multi-pass regex cleaner, in a few
+    linear passes: ``<script>`` blocks and then ``<style>`` blocks are
+    dropped (in that order, as before, so interleaved blocks come out the
+    same; each pass is a no-op when a body has no such block), then a main
+    scan turns ``<br>`` into line breaks and removes other tags (which never
+    span a line), then two regex passes collapse blank lines and runs of
+    spaces, and finally entities are unescaped. The main scan jumps from
+    ``<`` to ``<`` with ``str.find`` and never backtracks, so it stays linear
+    on large bodies with many tags.
+    """
+    raw_html = _drop_blocks(raw_html, '<script', '</script>')
+    raw_html = _drop_blocks(raw_html, '<style', '</style>')
+    out = []
+    append = out.append
+    find = raw_html.find
+    n = len(raw_html)
+    i = 0
+    next_newline = -1 # Cached position of the next '\n' at or after the current tag
+
+    while True:
+        start = find('<', i)
+        if start == -1:
+            append(raw_html[i:])
+            break
+        append(raw_html[i:start])
+
+        # <br> variants become line breaks
+        end = _match_br(raw_html, start)
+        if end != -1:
+            append('\n')
+            i = end
+            continue
+
+        # Any other tag, as long as it closes before the end of the line
+        if next_newline < start:
+            next_newline = find('\n', start)
+            if next_newline == -1:
+                next_newline = n
+        end = find('>', start + 1, next_newline)
+        if end != -1 and find('<', start + 1, end) == -1:
+            i = end + 1
+            continue
+        if end != -1:
+            end = _nested_tag_end(raw_html, start)
+            if end != -1:
+                i = end
+                continue
+
+        # A stray '<' is kept as text
+        append('<')
+        i = start + 1
+
+    text = _BLANK_LINES_RE.sub('\n\n', ''.join(out))
+    text = _SPACES_RE.sub(' ', text)
+    return html.unescape(text.strip())
@@ -0,0 +1,214 @@
+import asyncio
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+# HTTP statuses worth retrying: rate limited or a transient server error
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# gRPC status codes the Gemini SDK raises, mapped to their HTTP equivalents
+GRPC_TO_HTTP = {8: 429, 13: 500, 14: 503} # RESOURCE_EXHAUSTED, INTERNAL, UNAVAILABLE
+STATUS_IN_MESSAGE_RE = re.compile(r"\b(429|50[0234])\b")
+
+
+def retryable_status(error: BaseException) -> Optional[int]:
+    """The HTTP status of a retryable LLM error (429/5xx), or None if it should not be retried."""
+    for attr in ("code", "status_code", "status"):
+        value = getattr(error, attr, None)
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                continue
+        grpc_value = getattr(value, "value", None) # grpc.StatusCode is an enum of (int, str)
+        if isinstance(grpc_value, tuple) and grpc_value and isinstance(grpc_value[0], int):
+            value = GRPC_TO_HTTP.get(grpc_value[0])
+        if isinstance(value, int) and value in RETRYABLE_STATUS:
+            return int(value)
+    match = STATUS_IN_MESSAGE_RE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+class AdmissionRejected(Exception):
+    """Raised when the request queue is full; the caller should ask the user to retry later."""
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError(f"token bucket rate must be positive, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"token bucket capacity must be at least 1, got {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        self._refill(time.monotonic())
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def give_back(self) -> None:
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+    def time_until_token(self) -> float:
+        self._refill(time.monotonic())
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+
+class AdmissionController:
+    """Shared admission layer in front of the LLM, for every session of the process.
+
+    At most ``max_in_flight`` requests run at once and new requests start no
+    faster than ``requests_per_minute`` (a token bucket allowing ``burst``).
+    Waiting requests are queued per session and admitted round-robin across
+    sessions, so one busy session cannot starve the others; past
+    ``max_queued`` waiting requests new ones are rejected instead of piling
+    up. ``backoff()`` gives the jittered delay before retrying a 429/5xx.
+
+    All coroutines must run on the same event loop (the bot's background
+    loop). ``queue_status()`` may be read from any thread to show the queue
+    position and estimated wait in the UI.
+    """
+
+    def __init__(self, max_in_flight: int = 4, requests_per_minute: float = 60.0, burst: Optional[int] = None,
+                 max_queued: int = 100, max_retries: int = 3, backoff_base: float = 1.0, backoff_cap: float = 20.0):
+        # A zero rate would divide by zero and a zero slot count would never admit anything
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+        if requests_per_minute <= 0:
+            raise ValueError(f"requests_per_minute must be positive, got {requests_per_minute}")
+        if burst is not None and burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        if max_queued < 0 or max_retries < 0:
+            raise ValueError(f"max_queued and max_retries must not be negative, got {max_queued} and {max_retries}")
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst or max_in_flight)
+        self.max_queued = max_queued
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.in_flight = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._queued = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._avg_service = 5.0 # Seconds a request holds its slot, smoothed
+        # Published copy of each session's (position, estimated wait); replaced, never mutated
+        self._status: Dict[str, Tuple[int, float]] = {}
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests queued for a slot, across all sessions."""
+        return self._queued
+
+    def queue_status(self, session_id: str) -> Optional[Tuple[int, float]]:
+        """(position, estimated seconds) of the session's next waiting request, or None if it is not queued."""
+        return self._status.get(session_id)
+
+    @asynccontextmanager
+    async def slot(self, session_id: str = "default") -> AsyncIterator[float]:
+        """Hold one in-flight slot for the enclosed LLM request; yields the seconds spent queued."""
+        queued_at = time.monotonic()
+        await self._admit(session_id)
+        started = time.monotonic()
+        try:
+            yield started - queued_at
+        finally:
+            self._avg_service = 0.8 * self._avg_service + 0.2 * (time.monotonic() - started)
+            self.in_flight -= 1
+            self._dispatch()
+
+    async def retry_after(self, error: Exception, attempt: int) -> Optional[int]:
+        """Back off before retrying a 429/5xx error; returns its status, or None if it must not be retried."""
+        status = retryable_status(error)
+        if status is None or attempt >= self.max_retries:
+            return None
+        await asyncio.sleep(self.backoff(attempt))
+        await self.wait_for_token()
+        return status
+
+    async def wait_for_token(self) -> None:
+        """Take a rate-limit token for a retry made while already holding a slot."""
+        while not self.bucket.try_take():
+            await asyncio.sleep(self.bucket.time_until_token())
+
+    async def _admit(self, session_id: str) -> None:
+        if not self._queued and self.in_flight < self.max_in_flight and self.bucket.try_take():
+            self.in_flight += 1
+            return
+        if self._queued >= self.max_queued:
+            raise AdmissionRejected("Too many requests are waiting for the assistant")
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session_id, deque()).append(waiter)
+        self._queued += 1
+        self._dispatch() # Arms the refill timer if only the rate limit holds it back
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as we were cancelled: hand the slot on
+                self.in_flight -= 1
+            else:
+                self._forget(session_id, waiter)
+            self._dispatch()
+            raise
+
+    def _forget(self, session_id: str, waiter: asyncio.Future) -> None:
+        queue = self._queues.get(session_id)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._queues[session_id]
+        self._publish_status()
+
+    def _dispatch(self) -> None:
+        """Admit queued requests round-robin across sessions while slots and tokens allow."""
+        while self._queues and self.in_flight < self.max_in_flight:
+            if not self.bucket.try_take():
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(
+                        self.bucket.time_until_token(), self._on_timer)
+                break
+            session_id, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(session_id) # Next session's turn
+            else:
+                del self._queues[session_id]
+            if waiter.done():
+                self.bucket.give_back() # Cancelled meanwhile
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+        self._publish_status()
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _publish_status(self) -> None:
+        # Requests are admitted no faster than slots free up or tokens refill
+        per_request = max(self._avg_service / self.max_in_flight, 1 / self.bucket.rate)
+        token_wait = self.bucket.time_until_token()
+        # Round-robin: a session's next request goes after one request of each session ahead of it
+        self._status = {
+            session_id: (position, position * per_request + token_wait)
+            for position, session_id in enumerate(self._queues, start=1)
+        }
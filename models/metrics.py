@@ -0,0 +1,226 @@
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "news_bot_"
+QUANTILES = (0.5, 0.95, 0.99)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Summary:
+    """Count, sum and max of observations, plus a recent window for quantiles."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)] # Nearest rank
+
+
+class MetricsSnapshot:
+    """Point-in-time copy of every counter, gauge and summary, safe to read without locks."""
+
+    def __init__(self, counters: Dict[Tuple[str, LabelKey], float],
+                 summaries: Dict[Tuple[str, LabelKey], Dict[str, float]],
+                 gauges: Optional[Dict[Tuple[str, LabelKey], float]] = None):
+        self.counters = counters
+        self.summaries = summaries
+        self.gauges = gauges or {}
+        self.taken_at = time.time()
+
+
+class Exporter(Protocol):
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        ...
+
+
+class Metrics:
+    """Thread-safe registry of pipeline counters and timing spans.
+
+    ``span("fetch")`` times a block into the ``stage_seconds`` summary with a
+    ``stage`` label, ``observe`` records any other value (prompt size, per-feed
+    fetch time), ``inc`` bumps a counter and ``set_gauge`` records a current value
+    (a gauge, e.g. whether a feed's circuit is open). Exporters are pluggable: each
+    receives a ``MetricsSnapshot`` from ``flush()``, which ``maybe_flush()``
+    calls at most once per ``export_interval`` seconds.
+    """
+
+    def __init__(self, exporters: Optional[List[Exporter]] = None, export_interval: float = 60.0,
+                 diagnostics_panel: bool = False):
+        self.exporters = list(exporters or [])
+        self.export_interval = export_interval
+        self.diagnostics_panel = diagnostics_panel # Show the in-app diagnostics panel
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._summaries: Dict[Tuple[str, LabelKey], Summary] = {}
+        self._last_export = time.monotonic()
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        """Build the registry with the exporters listed in ``METRICS_EXPORTERS`` (e.g. ``log,prometheus,panel``)."""
+        exporters: List[Exporter] = []
+        diagnostics_panel = False
+        for name in os.environ.get("METRICS_EXPORTERS", "").split(","):
+            name = name.strip().lower()
+            if name == "panel":
+                diagnostics_panel = True
+            elif name == "log":
+                exporters.append(LogExporter())
+            elif name == "prometheus":
+                exporters.append(PrometheusTextfileExporter(
+                    os.environ.get("METRICS_PROMETHEUS_PATH", os.path.join(".cache", "news_bot.prom"))))
+            elif name:
+                logger.warning("Unknown metrics exporter %r ignored", name)
+        return cls(exporters, export_interval=float(os.environ.get("METRICS_EXPORT_INTERVAL_SECONDS", 60)),
+                   diagnostics_panel=diagnostics_panel)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(value)
+
+    @contextmanager
+    def span(self, stage: str, **labels) -> Iterator[None]:
+        """Time the enclosed block as one observation of ``stage_seconds{stage=...}``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def snapshot(self) -> MetricsSnapshot:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = {
+                key: {
+                    "count": summary.count,
+                    "sum": summary.total,
+                    "max": summary.max,
+                    **{f"p{int(q * 100)}": summary.quantile(q) for q in QUANTILES},
+                }
+                for key, summary in self._summaries.items()
+            }
+        return MetricsSnapshot(counters, summaries, gauges)
+
+    def flush(self) -> None:
+        self._last_export = time.monotonic()
+        if not self.exporters:
+            return
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            try:
+                exporter.export(snapshot)
+            except Exception:
+                logger.exception("Metrics exporter %s failed", type(exporter).__name__)
+
+    def maybe_flush(self) -> None:
+        if self.exporters and time.monotonic() - self._last_export >= self.export_interval:
+            self.flush()
+
+
+def _format_labels(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class LogExporter:
+    """Writes one log line per counter, gauge and summary."""
+
+    def __init__(self, log: logging.Logger = logger, level: int = logging.INFO):
+        self.log = log
+        self.level = level
+
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        for (name, labels), value in sorted(snapshot.counters.items()):
+            self.log.log(self.level, "metric %s%s %g", name, _format_labels(labels), value)
+        for (name, labels), value in sorted(snapshot.gauges.items()):
+            self.log.log(self.level, "metric %s%s %g", name, _format_labels(labels), value)
+        for (name, labels), stats in sorted(snapshot.summaries.items()):
+            self.log.log(self.level, "metric %s%s count=%d sum=%.4f p50=%.4f p95=%.4f p99=%.4f max=%.4f",
+                         name, _format_labels(labels), stats["count"], stats["sum"],
+                         stats["p50"], stats["p95"], stats["p99"], stats["max"])
+
+
+class PrometheusTextfileExporter:
+    """Writes the metrics in Prometheus text format for the node_exporter textfile collector."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def render(self, snapshot: MetricsSnapshot) -> str:
+        lines = []
+        typed = set()
+        for kind, values in (("counter", snapshot.counters), ("gauge", snapshot.gauges)):
+            for (name, labels), value in sorted(values.items()):
+                metric = METRIC_PREFIX + name
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} {kind}")
+                    typed.add(metric)
+                lines.append(f"{metric}{_format_labels(labels)} {value:.12g}")
+        for (name, labels), stats in sorted(snapshot.summaries.items()):
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} summary")
+                typed.add(metric)
+            for q in QUANTILES:
+                quantile_label = (("quantile", str(q)),)
+                lines.append(f"{metric}{_format_labels(labels, quantile_label)} {stats[f'p{int(q * 100)}']:.6g}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {stats['sum']:.12g}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {stats['count']:d}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, snapshot: MetricsSnapshot) -> None:
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Write-then-rename so the collector never reads a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.render(snapshot))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,144 @@
+import re
+import zlib
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+WORD_RE = re.compile(rb"[a-z0-9]+")
+
+Signature = Tuple[int, ...]
+
+
+class MinHasher:
+    """MinHash signatures of article text over word shingles.
+
+    Two texts' signatures agree in about the same fraction of positions as
+    the Jaccard similarity of their shingle sets, so syndicated copies of a
+    press release (same body, different intro or footer) come out close while
+    unrelated articles do not.
+
+    Uses one-permutation hashing: every shingle is hashed once (CRC32) into
+    one of ``num_perm`` bins, keeping the minimum per bin, instead of being
+    hashed ``num_perm`` times. Empty bins (short texts) borrow the value of
+    the next filled bin, offset by the distance, so they still compare
+    consistently. Hashes are stable, so signatures kept in the article store
+    stay comparable across restarts.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._span = (1 << 32) // num_perm # Bin values stay below this, so borrowed ones fit in 32 bits
+
+    def shingles(self, text: str) -> Set[int]:
+        """CRC32 hashes of the text's overlapping word n-grams."""
+        words = WORD_RE.findall(text.lower().encode("utf-8"))
+        size = min(self.shingle_size, len(words)) or 1
+        grams = zip(*(words[i:] for i in range(size))) if words else [()]
+        return set(map(zlib.crc32, map(b" ".join, grams)))
+
+    def signature(self, text: str) -> Signature:
+        empty = self._span
+        bins = [empty] * self.num_perm
+        for h in self.shingles(text):
+            index, value = h % self.num_perm, h // self.num_perm
+            if value < bins[index]:
+                bins[index] = value
+        filled = [i for i, value in enumerate(bins) if value != empty]
+        signature = []
+        for i, value in enumerate(bins):
+            if value == empty:
+                # Densify: take the next filled bin to the right, wrapping around
+                source = next((j for j in filled if j > i), filled[0])
+                value = bins[source] + (source - i) % self.num_perm * self._span
+            signature.append(value)
+        return tuple(signature)
+
+
+def similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+def pack_signature(signature: Signature) -> bytes:
+    return array("I", signature).tobytes()
+
+
+def unpack_signature(blob: bytes) -> Signature:
+    values = array("I")
+    values.frombytes(blob)
+    return tuple(values)
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures for finding syndicated copies.
+
+    Signatures are cut into ``bands`` bands; two articles become candidates
+    when any band matches exactly, and a candidate counts as a duplicate when
+    its estimated similarity reaches ``threshold``. Each article may carry a
+    ``group`` (its source), so a lookup can skip articles of its own feed,
+    whose look-alikes are templates rather than copies. A lookup only compares
+    against the articles sharing a bucket with it, so the cost of
+    deduplicating an article stays flat as the corpus grows instead of
+    comparing it with every stored article.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.threshold = threshold
+        self._buckets: List[Dict[Signature, List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[str, Signature] = {}
+        self._groups: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def _band_keys(self, signature: Signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, key: str, signature: Signature, group: Optional[str] = None) -> None:
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        if group is not None:
+            self._groups[key] = group
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        self._groups.pop(key, None)
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def find(self, signature: Signature, exclude: Optional[str] = None,
+             exclude_group: Optional[str] = None) -> Optional[str]:
+        """Key of the most similar indexed article at or above the threshold, or None.
+
+        Articles in ``exclude_group`` are never returned.
+        """
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        candidates.discard(exclude)
+        best, best_score = None, self.threshold
+        for key in sorted(candidates): # Deterministic choice between equally close copies
+            if exclude_group is not None and self._groups.get(key) == exclude_group:
+                continue
+            score = similarity(signature, self._signatures[key])
+            if score >= best_score:
+                best, best_score = key, score
+        return best
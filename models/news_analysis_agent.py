@@ -0,0 +1,163 @@
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+
+import google.generativeai as genai
+from google_adk.agent import Agent
+from google_adk.llm import Gemini
+
+from models.context_cache import ContextCache, PromptPrefix
+from models.context_packer import estimate_tokens
+from models.llm_admission import AdmissionController, AdmissionRejected
+from models.metrics import Metrics
+
+
+# Define the ADK Agent
+# This agent is responsible for analyzing the news context against a user query.
+# It uses the Google ADK's Agent base class and leverages the Gemini LLM
+# via the `google_adk.llm.Gemini` wrapper. Its primary method `call`
+# takes the news context and user query, constructs a prompt, and interacts
+# with the LLM to generate a text-based response. `stream` does the same but
+# yields the response incrementally as the model produces it.
+class NewsAnalysisAgent(Agent):
+    def __init__(self, model_name="gemini-1.5-flash", metrics: Optional[Metrics] = None,
+                 admission: Optional[AdmissionController] = None,
+                 context_cache: Optional[ContextCache] = None): # Using a recent model
+        super().__init__()
+        self.metrics = metrics or Metrics()
+        # Every LLM request goes through the shared admission layer (concurrency, rate, retries)
+        self.admission = admission or AdmissionController()
+        self.llm = Gemini(model_name=model_name)
+        # The ADK Gemini wrapper only returns complete responses, so token
+        # streaming goes through the underlying Gemini SDK model directly.
+        self.stream_model = genai.GenerativeModel(model_name)
+        # Holds the instructions + news snapshot prefix so queries send only their suffix; None sends full prompts.
+        self.context_cache = context_cache
+
+    def build_instructions(self) -> str:
+        return """You are an IoT News Assistant. Your task is to answer questions based on the provided news articles.
+        When answering:
+
+        1. Provide a natural, conversational response directly addressing the user's query
+        2. Format your answer as a cohesive paragraph or bullet points as appropriate
+        3. Include specific details from articles (dates, numbers, quotes)
+        4. Always include the source article title AND URL at the end of each information point
+        5. Do not use formulaic headers or repetitive structures
+
+        For direct questions (like "who is X?"), provide a single, clear answer.
+        For summary requests, organize the information in a readable format with appropriate bullet points.
+        The most relevant articles come with their full text; the others are given as a summary with key entities.
+
+        IMPORTANT: Always include both the article title and URL at the end of your responses,
+        like this: "Source: Article Title (https://www.example.com/article-url)"
+
+        Only include relevant information from the articles. If information is not found, say so clearly."""
+
+    def build_prefix(self, context: str) -> str:
+        """The query-independent head of the prompt: instructions and news context."""
+        return f"""{self.build_instructions()}
+
+        Current news context:
+        {context}"""
+
+    def build_suffix(self, context: str, query: str) -> str:
+        """What follows a cached prefix: articles retrieved for this query that it lacks, and the query."""
+        extra = f"Additional relevant articles:\n{context}\n\n" if context else ""
+        return f"{extra}User query: {query}"
+
+    def build_prompt(self, context: str, query: str) -> str:
+        return f"""{self.build_prefix(context)}
+
+        User query: {query}"""
+
+    def _record_prompt(self, prompt: str) -> None:
+        self.metrics.observe("prompt_chars", len(prompt))
+        self.metrics.observe("prompt_tokens", estimate_tokens(prompt))
+
+    async def _retry_delay(self, error: Exception, attempt: int) -> bool:
+        """Back off before retrying a rate-limited or transient (429/5xx) error; False if it must not be retried."""
+        status = await self.admission.retry_after(error, attempt)
+        if status is None:
+            return False
+        self.metrics.inc("llm_retries_total", status=status)
+        return True
+
+    async def call(self, context: str, query: str, session_id: str = "default") -> Dict[str, any]:
+        prompt = self.build_prompt(context, query)
+        self._record_prompt(prompt)
+        try:
+            async with self.admission.slot(session_id) as queued:
+                self.metrics.observe("stage_seconds", queued, stage="admission_wait")
+                attempt = 0
+                while True:
+                    try:
+                        # ADK's generate_content is suitable for non-streaming text generation
+                        # For simplicity, using generate_text which is often available for direct text output
+                        # Depending on the ADK version, this might be self.llm.generate_content(prompt).text
+                        with self.metrics.span("llm_generate"):
+                            response_content = await self.llm.generate_text(prompt=prompt)
+                        break
+                    except Exception as e:
+                        if not await self._retry_delay(e, attempt):
+                            raise
+                        attempt += 1
+            return {"text": response_content}
+        except Exception as e:
+            # Log error or handle more gracefully
+            self.metrics.inc("llm_errors_total")
+            return {"text": f"Error in NewsAnalysisAgent: {str(e)}", "error": str(e)}
+
+    async def prefix_model(self, prefix: PromptPrefix) -> Optional[Any]:
+        """A model holding ``prefix`` (instructions and news snapshot) in the context cache.
+
+        None without a cache or when the prefix cannot be cached; the caller
+        then sends the full prompt for its own top-k articles instead.
+        """
+        if self.context_cache is None:
+            return None
+        model = await self.context_cache.model_for(prefix, self.stream_model)
+        if model is not None:
+            self.metrics.observe("prompt_prefix_tokens", estimate_tokens(prefix.text))
+        return model
+
+    async def stream(self, context: str, query: str, session_id: str = "default",
+                     prefix_model: Optional[Any] = None) -> AsyncGenerator[str, None]:
+        """Yield the response text chunk by chunk as the model generates it.
+
+        With a ``prefix_model`` (from ``prefix_model()``) only the suffix is
+        sent: ``context`` holds just the articles the cached prefix lacks.
+        """
+        start = time.perf_counter()
+        first_chunk = True
+        try:
+            if prefix_model is not None:
+                model, prompt = prefix_model, self.build_suffix(context, query)
+            else:
+                model, prompt = self.stream_model, self.build_prompt(context, query)
+            self._record_prompt(prompt)
+            async with self.admission.slot(session_id) as queued:
+                self.metrics.observe("stage_seconds", queued, stage="admission_wait")
+                attempt = 0
+                while True:
+                    try:
+                        response = await model.generate_content_async(prompt, stream=True)
+                        async for chunk in response:
+                            if chunk.text:
+                                if first_chunk:
+                                    self.metrics.observe("stage_seconds", time.perf_counter() - start,
+                                                         stage="llm_first_chunk")
+                                    first_chunk = False
+                                yield chunk.text
+                        break
+                    except Exception as e:
+                        # Only a request that has not streamed anything yet can be replayed
+                        if not first_chunk or not await self._retry_delay(e, attempt):
+                            raise
+                        attempt += 1
+        except AdmissionRejected:
+            self.metrics.inc("admission_rejected_total")
+            raise
+        except Exception:
+            self.metrics.inc("llm_errors_total")
+            raise
+        finally:
+            self.metrics.observe("stage_seconds", time.perf_counter() - start, stage="llm_stream")
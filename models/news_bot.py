@@ -0,0 +1,677 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, AsyncGenerator, Callable, Dict, Generator, List, Optional, Set, Tuple
+
+from models.article_store import ArticleStore, link_hash
+from models.background_loop import BackgroundLoop
+from models.context_cache import PromptPrefix, context_cache_from_env
+from models.context_packer import ContextPacker, PackedContext, format_news_item
+from models.feed_cache import FeedCache
+from models.feed_health import FeedHealthTracker
+from models.html_cleaner import clean_html
+from models.llm_admission import AdmissionController, AdmissionRejected
+from models.metrics import Metrics
+from models.near_duplicates import MinHasher, NearDuplicateIndex, Signature
+from models.news_corpus import NewsCorpus
+from models.query_router import MetadataIndex, QueryRouter
+from models.refresh_scheduler import RefreshScheduler
+from models.response_cache import ResponseCache
+from models.response_cleaner import StreamingResponseCleaner
+from models.response_models import NewsItem
+from models.retrieval_index import BM25Index
+
+if TYPE_CHECKING:
+    # Heavy (google_adk, google.generativeai, feedparser): imported when the bot first needs them
+    from models.news_analysis_agent import NewsAnalysisAgent
+    from models.parallel_agent import DataFetcherAgent
+    from models.sequential_agent import NewsProcessingPipeline
+
+logger = logging.getLogger(__name__)
+# Log levels for status messages when no reporter shows them
+REPORT_LOG_LEVELS = {"write": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+# Receives (level, message) status updates, level being one of REPORT_LOG_LEVELS
+Reporter = Callable[[str, str], None]
+
+
+class IoTNewsBot:
+    """The news bot core: feeds, article store, indexes and the agent, with no UI dependency.
+
+    Status messages go to ``reporter`` (the Streamlit app shows them in the
+    session) and are logged when there is none.
+    """
+
+    def __init__(self, reporter: Optional[Reporter] = None, api_key: Optional[str] = None):
+        self.reporter = reporter
+        self.api_key = api_key # Passed to the Gemini SDK when the first agent is built
+        self.feed_urls = [
+            "https://www.iotinsider.com/feed/",
+            "https://www.electronicspecifier.com/?format=rss",
+            "https://www.student-circuit.com/feed/"
+        ]
+        self.history: List[Dict] = []
+        # Stage timings and counters; exporters are chosen with METRICS_EXPORTERS.
+        self.metrics = Metrics.from_env()
+        # One event loop for every session's LLM calls, so the client's connections are reused.
+        self.event_loop = BackgroundLoop(name="news-bot-loop")
+        # Shared LLM admission: max in-flight requests, a fair per-session queue and a rate limit.
+        try:
+            self.admission = AdmissionController(
+                max_in_flight=int(os.environ.get("LLM_MAX_IN_FLIGHT", 4)),
+                requests_per_minute=float(os.environ.get("LLM_REQUESTS_PER_MINUTE", 60)),
+                max_queued=int(os.environ.get("LLM_MAX_QUEUED", 100)),
+                max_retries=int(os.environ.get("LLM_MAX_RETRIES", 3))
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid LLM admission settings (LLM_* environment variables): {e}") from e
+        # The agents and the feed fetcher pull in google_adk, google.generativeai and feedparser, so
+        # they are built on first use (first question, summary batch or refresh) and reused after that.
+        self._lazy_lock = threading.RLock()
+        self._llm_configured = False
+        self._news_agent: Optional["NewsAnalysisAgent"] = None
+        self._data_fetcher: Optional["DataFetcherAgent"] = None
+        self._news_pipeline: Optional["NewsProcessingPipeline"] = None
+        # Persistent article history keyed by normalized link hash; survives restarts.
+        self.article_store = ArticleStore()
+        self.max_entries_per_feed = 20 # Entries considered per feed on each refresh
+        self.max_context_items = 15 # Most recent articles exposed as the current news
+        # ETag/Last-Modified validators per feed, persisted across restarts.
+        self.feed_cache = FeedCache()
+        if self.article_store.count() == 0:
+            # A 304 is only useful if the store still holds the feed's articles
+            self.feed_cache.clear()
+        # Copy-on-write snapshot of the current news, shared by every session reading this bot.
+        self.corpus = NewsCorpus()
+        # BM25 index over the whole stored history; queries only see the top-k matches.
+        # It keeps postings and compact metadata only: bodies are loaded for the selected articles.
+        self.retrieval_index = BM25Index()
+        self.top_k = 6
+        # MinHash + LSH over cleaned article text: syndicated copies of a story collapse into the
+        # first copy seen, which lists every source carrying it.
+        self.minhasher = MinHasher()
+        self.duplicate_index = NearDuplicateIndex(threshold=float(os.environ.get("NEWS_DEDUP_THRESHOLD", 0.7)))
+        # Source/author/tag indexes: lookups like "latest from IoT Insider" are answered without the LLM.
+        self.metadata_index = MetadataIndex()
+        self.query_router_enabled = os.environ.get("QUERY_ROUTER", "1") != "0"
+        self.query_router = QueryRouter(self.metadata_index,
+                                        max_results=int(os.environ.get("QUERY_ROUTER_MAX_RESULTS", 10)))
+        # Fits the selected articles into a predictable prompt size.
+        self.context_packer = ContextPacker(
+            token_budget=int(os.environ.get("NEWS_CONTEXT_TOKEN_BUDGET", 6000)),
+            max_body_tokens=int(os.environ.get("NEWS_CONTEXT_MAX_BODY_TOKENS", 600)),
+            full_text_articles=int(os.environ.get("NEWS_CONTEXT_FULL_TEXT_ARTICLES", 3))
+        )
+        # The cached prompt prefix is packed on its own budget. Gemini only caches prefixes of ~32k tokens
+        # or more, so with PROMPT_CONTEXT_CACHE=gemini it covers far more of the stored history, in full text.
+        gemini_prefix = os.environ.get("PROMPT_CONTEXT_CACHE", "auto").strip().lower() == "gemini"
+        self.prefix_max_articles = int(os.environ.get("PROMPT_PREFIX_MAX_ARTICLES",
+                                                      150 if gemini_prefix else self.max_context_items))
+        self.prefix_packer = ContextPacker(
+            token_budget=int(os.environ.get("PROMPT_PREFIX_TOKEN_BUDGET",
+                                            48000 if gemini_prefix else self.context_packer.token_budget)),
+            max_body_tokens=self.context_packer.max_body_tokens,
+            full_text_articles=self.prefix_max_articles if gemini_prefix else self.context_packer.full_text_articles
+        )
+        self.last_packed_context: Optional[PackedContext] = None
+        self._prompt_prefix: Optional[Tuple[int, PromptPrefix]] = None # (snapshot version, prefix)
+        # Answers keyed on normalized query + fingerprint of the context sent; cleared on corpus change.
+        self.response_cache = ResponseCache(
+            maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", 256)),
+            ttl=float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", 900))
+        )
+        # Summarizes new articles once at ingest, in background batches; queries then read
+        # the cached summaries instead of every full body.
+        self.summaries_enabled = os.environ.get("NEWS_SUMMARIES", "1") != "0"
+        self._summary_backlog_checked = False
+        refresh_interval = float(os.environ.get("NEWS_REFRESH_INTERVAL_SECONDS", 900))
+        # Per-feed health: failing feeds are skipped behind a circuit breaker with exponential backoff
+        # (their stored articles are still served), and each feed is polled as often as it publishes.
+        self.feed_health = FeedHealthTracker(
+            failure_threshold=int(os.environ.get("FEED_FAILURE_THRESHOLD", 3)),
+            backoff_base=float(os.environ.get("FEED_BACKOFF_BASE_SECONDS", 60)),
+            backoff_max=float(os.environ.get("FEED_BACKOFF_MAX_SECONDS", 21600)),
+            default_interval=refresh_interval,
+            min_interval=float(os.environ.get("FEED_MIN_INTERVAL_SECONDS", 300)),
+            max_interval=float(os.environ.get("FEED_MAX_INTERVAL_SECONDS", 21600)),
+            adaptive=os.environ.get("FEED_ADAPTIVE_POLLING", "1") != "0"
+        )
+        # Feeds are refreshed in the background; per-feed intervals (set from feed health) override the default.
+        self.feed_refresh_intervals: Dict[str, float] = {}
+        self.refresh_scheduler = RefreshScheduler(
+            self.fetch_news,
+            self.feed_urls,
+            default_interval=refresh_interval,
+            feed_intervals=self.feed_refresh_intervals,
+            jitter=float(os.environ.get("NEWS_REFRESH_JITTER", 0.1))
+        )
+        # Only the most recent stories are kept (with their syndicated copies); 0 keeps the whole history
+        self.max_stored_articles = int(os.environ.get("NEWS_MAX_STORED_ARTICLES", 10000))
+        # Come up with whatever was stored by previous runs. The current news is published right away;
+        # re-indexing the stored history takes seconds for thousands of articles, so it runs on its own
+        # thread (not event_loop, which streams answers). Until it is done queries use the latest news
+        # and skip the metadata router, and refreshes wait for it.
+        self.indexes_ready = threading.Event()
+        self._load_current_news(refreshed=False)
+        threading.Thread(target=self._warm_indexes, name="news-index-warmup", daemon=True).start()
+
+    def _warm_indexes(self) -> None:
+        """Build the BM25, metadata and near-duplicate indexes from the stored articles."""
+        try:
+            with self.metrics.span("index_warmup"):
+                self._prune_store()
+                for item in self.article_store.iter_articles():
+                    self.retrieval_index.add(link_hash(item.link), item)
+                    self.metadata_index.add(link_hash(item.link), item)
+                for key, signature, source in self.article_store.iter_signatures():
+                    self.duplicate_index.add(key, signature, group=source)
+            logger.info("Indexed %d stored articles", len(self.retrieval_index))
+        except Exception:
+            # Refreshes still run (and index what they fetch); queries fall back to the latest news
+            self.metrics.inc("index_warmup_errors_total")
+            logger.exception("Indexing the stored articles failed")
+        finally:
+            self.indexes_ready.set()
+
+    def _prune_store(self) -> Set[str]:
+        """Apply the retention cap; returns the keys of the pruned articles, now out of every index."""
+        if self.max_stored_articles <= 0:
+            return set()
+        pruned = self.article_store.prune(self.max_stored_articles)
+        for key in pruned:
+            self.retrieval_index.remove(key)
+            self.metadata_index.remove(key)
+            self.duplicate_index.remove(key)
+        if pruned:
+            self.metrics.inc("articles_pruned_total", len(pruned))
+            logger.info("Pruned %d article(s) beyond the retention cap of %d", len(pruned), self.max_stored_articles)
+        return set(pruned)
+
+    def _build_once(self, attribute: str, build: Callable[[], object], component: str):
+        """Return ``self.<attribute>``, building it with ``build`` the first time it is needed."""
+        value = getattr(self, attribute)
+        if value is None:
+            with self._lazy_lock:
+                value = getattr(self, attribute)
+                if value is None:
+                    with self.metrics.span("lazy_init", component=component):
+                        value = build()
+                    setattr(self, attribute, value)
+        return value
+
+    def _configure_llm(self) -> None:
+        if self.api_key and not self._llm_configured:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._llm_configured = True
+
+    @property
+    def news_agent(self) -> "NewsAnalysisAgent":
+        """The ADK agent that answers questions; it only ever runs on event_loop."""
+        return self._build_once("_news_agent", self._build_news_agent, "news_agent")
+
+    def _build_news_agent(self) -> "NewsAnalysisAgent":
+        from models.news_analysis_agent import NewsAnalysisAgent
+        self._configure_llm()
+        # Instructions + news snapshot form a stable prompt prefix, registered once per snapshot with
+        # Gemini context caching (PROMPT_CONTEXT_CACHE); each query then sends only its own suffix.
+        # Caching needs a versioned model id, which then also answers the cached queries.
+        context_cache = context_cache_from_env(
+            os.environ.get("PROMPT_CONTEXT_CACHE", "auto"),
+            os.environ.get("PROMPT_CONTEXT_CACHE_MODEL", "gemini-1.5-flash-001"),
+            ttl=float(os.environ.get("PROMPT_CONTEXT_CACHE_TTL_SECONDS", 3600)), metrics=self.metrics,
+            prefix_token_budget=self.prefix_packer.token_budget
+        )
+        return NewsAnalysisAgent(model_name='gemini-1.5-flash', metrics=self.metrics,
+                                 admission=self.admission, context_cache=context_cache)
+
+    @property
+    def data_fetcher(self) -> "DataFetcherAgent":
+        """Fetches all feeds concurrently with per-feed deadlines and conditional GETs."""
+        return self._build_once("_data_fetcher", self._build_data_fetcher, "data_fetcher")
+
+    def _build_data_fetcher(self) -> "DataFetcherAgent":
+        from models.parallel_agent import DataFetcherAgent
+        return DataFetcherAgent(cache=self.feed_cache, max_entries_per_feed=self.max_entries_per_feed)
+
+    @property
+    def news_pipeline(self) -> "NewsProcessingPipeline":
+        """The ingest pipeline that summarizes new articles."""
+        return self._build_once("_news_pipeline", self._build_news_pipeline, "news_pipeline")
+
+    def _build_news_pipeline(self) -> "NewsProcessingPipeline":
+        from models.article_summary_agent import ArticleSummaryAgent
+        from models.sequential_agent import NewsProcessingPipeline
+        self._configure_llm()
+        return NewsProcessingPipeline(
+            summary_agent=ArticleSummaryAgent(model_name='gemini-1.5-flash', metrics=self.metrics,
+                                              admission=self.admission),
+            batch_size=int(os.environ.get("NEWS_SUMMARY_BATCH_SIZE", 8)),
+            max_per_pass=int(os.environ.get("NEWS_SUMMARY_MAX_PER_PASS", 64)),
+            pass_pause=float(os.environ.get("NEWS_SUMMARY_PASS_PAUSE_SECONDS", 30))
+        )
+
+    @property
+    def current_news_items(self) -> List[NewsItem]:
+        return list(self.corpus.snapshot().items)
+
+    @property
+    def current_news_context(self) -> str:
+        return self.corpus.snapshot().context
+
+    def _report(self, level: str, message: str) -> None:
+        """Pass a status message to the reporter, or log it."""
+        if self.reporter is not None:
+            self.reporter(level, message)
+        else:
+            logger.log(REPORT_LOG_LEVELS[level], message)
+
+    def start_background_refresh(self) -> None:
+        """Start refreshing the feeds periodically off the request path."""
+        # The first refresh also catches up on stored articles that were never summarized
+        self.refresh_scheduler.start()
+
+    def schedule_summaries(self) -> None:
+        """Generate missing article summaries in the background."""
+        if self.summaries_enabled:
+            self.news_pipeline.schedule_summaries(self.article_store, self.event_loop)
+
+    def refresh_error(self) -> Optional[str]:
+        """Why the last background refresh failed, or None; finishing with no articles at all counts as failing."""
+        if self.refresh_scheduler.last_error:
+            return self.refresh_scheduler.last_error
+        if self.refresh_scheduler.last_run_at is not None and not self.corpus.snapshot().items:
+            return "No valid entries could be processed from any feed"
+        return None
+
+    def request_refresh(self) -> None:
+        """Queue an early background refresh of all feeds; never blocks on the network."""
+        self.refresh_scheduler.request_refresh()
+
+    def clean_html(self, raw_html: str) -> str:
+        """Remove HTML tags and clean up text."""
+        return clean_html(raw_html)
+
+    def format_news_item(self, item: NewsItem) -> str:
+        """Format a news item for the agent context with detailed information."""
+        return format_news_item(item)
+
+    def _entry_fingerprint(self, entry, source_name: str) -> str:
+        """Hash the raw feed entry so unchanged entries can be skipped before any cleaning."""
+        if hasattr(entry, 'content') and entry.content:
+            content = entry.content[0]['value']
+        else:
+            content = entry.get('description', entry.get('summary', ''))
+        payload = json.dumps([
+            entry.get('title', ''), entry.get('link', ''), content, entry.get('published', ''),
+            [tag.get('term', '') for tag in entry.get('tags', [])],
+            [author.get('name', '') for author in entry.get('authors', [])],
+            source_name
+        ])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _entry_published_at(entry) -> Optional[datetime]:
+        """Timezone-aware publication time of a feed entry, or None if it has no usable date."""
+        if entry.get('published_parsed'):
+            # Parsed dates are normalized to UTC
+            return datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
+        if entry.get('published'):
+            # Try different date formats
+            for fmt in ["%a, %d %b %Y %H:%M:%S %z", "%a, %d %b %Y %H:%M:%S %Z", "%Y-%m-%dT%H:%M:%S%z"]:
+                try:
+                    published_at = datetime.strptime(entry.published, fmt)
+                except ValueError:
+                    continue
+                if published_at.tzinfo is None:
+                    published_at = published_at.replace(tzinfo=timezone.utc)
+                return published_at
+        return None
+
+    def _feed_failed(self, feed_url: str, elapsed: float, error: str) -> None:
+        if self.feed_health.record_failure(feed_url, elapsed, error):
+            self.metrics.inc("feed_circuit_opened_total", feed=feed_url)
+            logger.warning("Feed %s keeps failing (%s); skipping it for %.0fs", feed_url, error,
+                           self.feed_health.poll_interval(feed_url))
+
+    def _canonical_key(self, key: str, item: NewsItem) -> Tuple[Optional[str], Signature]:
+        """Return (canonical key or None, signature) for an item; canonical items join the index."""
+        signature = self.minhasher.signature(f"{item.title}\n{item.description}")
+        # An article that is already canonical stays so, keeping its copies attached. Only another
+        # feed's article counts as a copy: look-alikes within one feed are templates (e.g. a weekly roundup)
+        canonical = None if key in self.duplicate_index else self.duplicate_index.find(
+            signature, exclude=key, exclude_group=item.source)
+        if canonical is None:
+            self.duplicate_index.add(key, signature, group=item.source)
+        return canonical, signature
+
+    def _load_current_news(self, refreshed: bool = True) -> None:
+        """Publish the current items from the article store; unchanged items keep the snapshot version."""
+        self.corpus.publish(self.article_store.query(limit=self.max_context_items), refreshed=refreshed)
+
+    def fetch_news(self, feed_urls: Optional[List[str]] = None) -> None:
+        """Fetch the latest IoT news (all feeds by default) and publish a new corpus snapshot.
+
+        Concurrent callers share a single refresh instead of each fetching the feeds.
+        """
+        self.corpus.refresh(lambda: self._refresh_news(feed_urls or self.feed_urls))
+
+    def _refresh_news(self, feed_urls: List[str]) -> None:
+        """Fetch the feeds, upsert new or changed articles and publish the result."""
+        # Ingest deduplicates against, and adds to, the indexes the warm-up is still filling
+        self.indexes_ready.wait()
+        with self.metrics.span("refresh"):
+            self._ingest_feeds(feed_urls)
+        if not self._summary_backlog_checked:
+            # Stored articles from earlier runs may lack summaries; the pipeline is built here, off the request path
+            self._summary_backlog_checked = True
+            self.schedule_summaries()
+        self.metrics.maybe_flush()
+
+    def _ingest_feeds(self, feed_urls: List[str]) -> None:
+        changed_items: List[NewsItem] = []
+        changed_canonical: List[NewsItem] = [] # Copies of a known story are not indexed again
+        regrouped: Set[str] = set() # Canonical articles that gained or lost a syndicated copy
+        
+        # Feeds whose circuit is open are not fetched; their stored articles stay in the corpus
+        skipped = [url for url in feed_urls if not self.feed_health.allow(url)]
+        for feed_url in skipped:
+            self.metrics.inc("feed_skipped_total", feed=feed_url)
+        if skipped:
+            logger.info("Skipping failing feed(s) until their backoff expires: %s", ", ".join(skipped))
+        due = [url for url in feed_urls if url not in skipped]
+
+        self._report("write", f"Fetching from: {', '.join(due)}")
+        # Feeds are newest first: parsing stops at the first article we already have
+        with self.metrics.span("fetch"):
+            feed_results = self.data_fetcher.fetch_feeds(due, is_seen=self.article_store.contains) if due else []
+
+        for result in feed_results:
+            feed_url = result.url
+            self.metrics.observe("feed_fetch_seconds", result.elapsed, feed=feed_url)
+            self.metrics.inc("feed_fetches_total", feed=feed_url)
+            try:
+                if not result.ok:
+                    self.metrics.inc("feed_fetch_errors_total", feed=feed_url)
+                    self._feed_failed(feed_url, result.elapsed, result.error)
+                    self._report("warning", f"Error fetching from {feed_url}: {result.error}")
+                    continue
+
+                if result.not_modified:
+                    # 304 Not Modified: the store already holds this feed's articles
+                    self.metrics.inc("feed_not_modified_total", feed=feed_url)
+                    self.feed_health.record_success(feed_url, result.elapsed)
+                    continue
+                feed = result.feed
+                
+                if hasattr(feed, 'bozo_exception') and feed.bozo:
+                    self.metrics.inc("feed_parse_errors_total", feed=feed_url)
+                    self._feed_failed(feed_url, result.elapsed, f"parse error: {feed.bozo_exception}")
+                    self._report("warning", f"Feed warning for {feed_url}: {feed.bozo_exception}")
+                    continue
+                
+                entries = feed.entries[:self.max_entries_per_feed]
+                # Publication times of the listed entries tell how often the feed posts
+                self.feed_health.record_success(feed_url, result.elapsed,
+                                                (self._entry_published_at(entry) for entry in entries))
+                if not entries:
+                    # Nothing to ingest, but the new validators still spare the next poll a full download
+                    self.feed_cache.store(feed_url, result.etag, result.last_modified)
+                    if feed.get('reached_seen'):
+                        # Streaming parse stopped at a stored article: nothing new
+                        self.metrics.inc("feed_no_new_entries_total", feed=feed_url)
+                        continue
+                    self._report("warning", f"No entries found in feed: {feed_url}")
+                    continue
+                
+                # Get source name from feed
+                source_name = feed.feed.get('title', feed_url.split('/')[2])
+                entry_fingerprints = [self._entry_fingerprint(entry, source_name) for entry in entries]
+                known = self.article_store.fingerprints(link_hash(entry.get('link', '')) for entry in entries)
+                feed_items: List[NewsItem] = []
+                feed_fingerprints: List[str] = []
+                feed_canonical_keys: List[Optional[str]] = []
+                feed_signatures = []
+                
+                for entry, fingerprint in zip(entries, entry_fingerprints):
+                    if known.get(link_hash(entry.get('link', ''))) == fingerprint:
+                        continue # Unchanged since it was stored
+                    try:
+                        # Get full content if available, otherwise use description
+                        if hasattr(entry, 'content') and entry.content:
+                            content = entry.content[0]['value']
+                        else:
+                            content = entry.get('description', entry.get('summary', ''))
+                        
+                        with self.metrics.span("clean_html"):
+                            clean_content = self.clean_html(content)
+                        
+                        # Parse the publication date once; it is only formatted for display
+                        published_at = self._entry_published_at(entry)
+                        
+                        # Get categories/tags if available
+                        categories = entry.get('tags', [])
+                        tags = [tag.get('term', '') for tag in categories if tag.get('term')]
+                        
+                        # Get author information
+                        authors = entry.get('authors', [])
+                        author_names = [author.get('name', '') for author in authors if author.get('name')]
+                        
+                        post_data = {
+                            "title": entry.title,
+                            "description": clean_content,
+                            "link": entry.link,
+                            "published_at": published_at,
+                            "tags": tags,
+                            "authors": author_names,
+                            "source": source_name
+                        }
+                        item = NewsItem(**post_data)
+                        with self.metrics.span("dedupe"):
+                            canonical, signature = self._canonical_key(link_hash(item.link), item)
+                        if canonical is not None:
+                            self.metrics.inc("duplicates_collapsed_total", feed=feed_url)
+                        feed_items.append(item)
+                        feed_fingerprints.append(fingerprint)
+                        feed_canonical_keys.append(canonical)
+                        feed_signatures.append(signature)
+                    except Exception as e:
+                        self.metrics.inc("entry_errors_total", feed=feed_url)
+                        self._report("warning", f"Error processing entry from {feed_url}: {str(e)}")
+                        continue
+
+                with self.metrics.span("store_upsert"):
+                    previous = self.article_store.canonical_keys(link_hash(item.link) for item in feed_items)
+                    written = self.article_store.upsert(feed_items, feed_fingerprints,
+                                                        feed_canonical_keys, feed_signatures)
+                changed_items.extend(written)
+                duplicates = {link_hash(item.link) for item, canonical in zip(feed_items, feed_canonical_keys)
+                              if canonical is not None}
+                changed_canonical.extend(item for item in written if link_hash(item.link) not in duplicates)
+                written_keys = {link_hash(item.link) for item in written}
+                regrouped.update(canonical for item, canonical in zip(feed_items, feed_canonical_keys)
+                                 if canonical is not None and link_hash(item.link) in written_keys)
+                # An updated copy that now matches another article, or none, leaves its old group
+                regrouped.update(previous[key] for key, canonical in
+                                 zip((link_hash(item.link) for item in feed_items), feed_canonical_keys)
+                                 if key in written_keys and previous.get(key) not in (None, canonical))
+                self.feed_cache.store(feed_url, result.etag, result.last_modified)
+                        
+            except Exception as e:
+                self.metrics.inc("feed_fetch_errors_total", feed=feed_url)
+                self._feed_failed(feed_url, result.elapsed, str(e))
+                self._report("warning", f"Error fetching from {feed_url}: {str(e)}")
+                continue
+        
+        try:
+            self.feed_cache.save()
+        except OSError as e:
+            self._report("warning", f"Could not persist feed cache: {e}")
+        # Poll each fetched feed again when it is likely to have news, or when its backoff expires
+        for feed_url in feed_urls:
+            self.feed_refresh_intervals[feed_url] = self.feed_health.poll_interval(feed_url)
+        self.feed_health.export(self.metrics)
+
+        # Previously stored articles stay available even if every feed failed this time
+        pruned = self._prune_store()
+        if pruned:
+            # Old entries a feed still lists can be pruned as soon as they are stored
+            changed_canonical = [item for item in changed_canonical if link_hash(item.link) not in pruned]
+            regrouped -= pruned
+        with self.metrics.span("index_update"):
+            self.retrieval_index.add_many((link_hash(item.link), item) for item in changed_canonical)
+            self.metadata_index.add_many((link_hash(item.link), item) for item in changed_canonical)
+            # Their copies' sources now list them too
+            self.metadata_index.add_many((link_hash(item.link), item) for item in self.article_store.get_many(regrouped))
+        self.metrics.inc("articles_ingested_total", len(changed_items))
+        if changed_items:
+            self.response_cache.clear()
+        if changed_canonical:
+            self.schedule_summaries()
+        self._load_current_news()
+        if not self.current_news_items:
+            self._report("error", "No valid entries could be processed from any feed")
+
+    def select_articles(self, query: str) -> List[NewsItem]:
+        """Pick the top-k articles relevant to the query, falling back to the most recent ones."""
+        hits = self.retrieval_index.search(query, k=self.top_k) if self.indexes_ready.is_set() else []
+        if hits:
+            return self.article_store.get_many(article.key for article, _ in hits)
+        # Nothing matched (e.g. "summarize today") or the index is still warming up: use the latest news instead
+        return list(self.corpus.snapshot().items[:self.top_k])
+
+    def prompt_prefix(self) -> PromptPrefix:
+        """The prompt prefix for the current snapshot: instructions plus the packed recent articles.
+
+        Covers the snapshot's items, or the ``prefix_max_articles`` most recent stored articles when
+        that is more. Built once per snapshot version, so its key only changes when a refresh
+        publishes new news.
+        """
+        snapshot = self.corpus.snapshot()
+        cached = self._prompt_prefix
+        if cached is not None and cached[0] == snapshot.version:
+            return cached[1]
+        items = list(snapshot.items)
+        if self.prefix_max_articles > len(items):
+            items = self.article_store.query(limit=self.prefix_max_articles)
+        packed = self.prefix_packer.pack(items, self.article_store.summaries(items))
+        # Queries still send the full text of relevant articles the prefix only summarizes or dropped
+        keys = (link_hash(item.link) for item in items)
+        prefix = PromptPrefix(
+            text=self.news_agent.build_prefix(packed.text),
+            article_keys=frozenset(key for key in keys if key not in packed.partial_keys),
+        )
+        self._prompt_prefix = (snapshot.version, prefix)
+        return prefix
+
+    def build_query_context(self, query: str, exclude: frozenset = frozenset()) -> str:
+        """Assemble the agent context from the articles selected for the query, within the token budget.
+
+        Articles whose link hash is in ``exclude`` (already in the prompt prefix) are left out.
+        """
+        items = [item for item in self.select_articles(query) if link_hash(item.link) not in exclude]
+        # Past the first few, articles are sent as their cached ingest-time summaries
+        summaries = self.article_store.summaries(items[self.context_packer.full_text_articles:])
+        packed = self.context_packer.pack(items, summaries)
+        self.last_packed_context = packed
+        if packed.dropped or packed.truncated:
+            logger.info("Context packed to ~%d tokens; truncated %d article(s), summarized %d, dropped %s",
+                        packed.tokens, len(packed.truncated), len(packed.summarized), packed.dropped or "none")
+        return packed.text
+
+    async def process_query(self, query: str, session_id: str = "default") -> AsyncGenerator[str, None]:
+        """Process user query using ADK Agent and yield response using the most relevant stored news.
+
+        Source, author, tag and date lookups are answered from the metadata
+        indexes without calling the agent. ``session_id`` identifies the asking session for fair queueing of LLM requests.
+        """
+        if not self.corpus.snapshot().items:
+            yield "News has not been fetched yet or no news is available. Please refresh the news feed."
+            return
+
+        self.metrics.inc("queries_total")
+        start = time.perf_counter()
+        try:
+            # Source/author/tag/date lookups are answered from the metadata indexes in milliseconds
+            # Until the stored history is indexed a lookup could miss articles, so it goes to the agent
+            if self.query_router_enabled and self.indexes_ready.is_set():
+                with self.metrics.span("route"):
+                    routed = self.query_router.answer(query)
+                if routed is not None:
+                    structured, answer = routed
+                    self.metrics.inc("queries_routed_total", kind=structured.kind)
+                    yield answer
+                    return
+
+            # This runs on the event loop shared by every session's stream, so the SQLite reads and
+            # the agent's first-use build run on worker threads instead of stalling the other streams.
+            news_agent = await asyncio.to_thread(lambda: self.news_agent)
+            # Invoke the ADK agent on the top-k relevant articles rather than the whole corpus.
+            # With a cached prompt prefix the current snapshot travels in it instead, and only the
+            # articles it lacks are sent; if the prefix cannot be cached the plain top-k prompt is used.
+            prefix, prefix_model = None, None
+            if news_agent.context_cache is not None:
+                prefix = await asyncio.to_thread(self.prompt_prefix)
+                prefix_model = await news_agent.prefix_model(prefix)
+                if prefix_model is None:
+                    prefix = None
+            with self.metrics.span("context_build"):
+                context = await asyncio.to_thread(self.build_query_context, query,
+                                                  prefix.article_keys if prefix else frozenset())
+            cache_context = f"{prefix.key}\n{context}" if prefix else context
+            cached_response = self.response_cache.get(query, cache_context)
+            if cached_response is not None:
+                self.metrics.inc("response_cache_hits_total")
+                yield cached_response
+                return
+            self.metrics.inc("response_cache_misses_total")
+
+            # Stream the answer, cleaning each chunk as soon as it is safe to release
+            cleaner = StreamingResponseCleaner()
+            clean_seconds = 0.0
+            response_parts = []
+            async for chunk in news_agent.stream(context=context, query=query, session_id=session_id,
+                                                      prefix_model=prefix_model):
+                clean_start = time.perf_counter()
+                cleaned_chunk = cleaner.feed(chunk)
+                clean_seconds += time.perf_counter() - clean_start
+                if cleaned_chunk:
+                    response_parts.append(cleaned_chunk)
+                    yield cleaned_chunk
+            tail = cleaner.flush()
+            self.metrics.observe("stage_seconds", clean_seconds, stage="response_clean")
+            if tail:
+                response_parts.append(tail)
+                yield tail
+
+            if response_parts:
+                self.response_cache.put(query, cache_context, "".join(response_parts))
+            else:
+                yield "No response text found."
+        except AdmissionRejected:
+            # Backpressure: shed the request rather than queue it behind an unbounded backlog
+            yield "The assistant is handling a lot of questions right now. Please try again in a minute."
+        except Exception as e:
+            self.metrics.inc("query_errors_total")
+            self._report("error", f"Error processing query with NewsAnalysisAgent: {str(e)}")
+            yield f"I apologize, but I encountered an error while processing your query with the ADK agent: {str(e)}"
+        finally:
+            self.metrics.observe("stage_seconds", time.perf_counter() - start, stage="process_query")
+            self.metrics.maybe_flush()
+
+
+def stream_bot_response(bot: IoTNewsBot, user_input: str, session_id: str = "default",
+                        on_wait: Optional[Callable[[], None]] = None) -> Generator[str, None, None]:
+    """Drive the bot's async response stream from synchronous code (e.g. a Streamlit script), chunk by chunk.
+
+    ``on_wait`` is called periodically while the next chunk is pending, e.g. to show the queue position.
+    """
+    # The response runs on the bot's long-lived background loop, where the LLM
+    # client and its connections live; this script thread only waits for chunks.
+    for chunk in bot.event_loop.iterate(bot.process_query(user_input, session_id), on_wait=on_wait):
+        if chunk:
+            yield chunk
@@ -0,0 +1,73 @@
+import dataclasses
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Iterable, Optional, Tuple
+
+from models.context_packer import format_news_item
+from models.response_models import NewsItem
+
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """Immutable view of the current news; readers never see a half-applied refresh."""
+    version: int
+    items: Tuple[NewsItem, ...]
+    refreshed_at: Optional[float] = None
+
+    @cached_property
+    def context(self) -> str:
+        """All current items formatted for a prompt; built on first use only."""
+        return "\n".join(format_news_item(item) for item in self.items)
+
+
+class NewsCorpus:
+    """Process-wide, thread-safe holder of the current news snapshot.
+
+    Readers call ``snapshot()`` and keep using the object they got; writers
+    build a complete new snapshot and swap it in with ``publish()``
+    (copy-on-write), so no reader ever blocks on a refresh. The version only
+    changes when the items do, so caches keyed on it survive refreshes that
+    find nothing new. ``refresh()``
+    runs at most one refresh at a time: callers that arrive while a refresh
+    is in flight wait for it and reuse its result instead of fetching again.
+    """
+
+    def __init__(self):
+        self._snapshot = CorpusSnapshot(version=0, items=())
+        self._publish_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_count = 0
+
+    def snapshot(self) -> CorpusSnapshot:
+        # A single attribute read is atomic, so no lock is needed on the read path
+        return self._snapshot
+
+    def publish(self, items: Iterable[NewsItem], refreshed: bool = True) -> CorpusSnapshot:
+        """Atomically replace the current snapshot; the version is bumped only if the items or their order changed."""
+        items = tuple(items)
+        with self._publish_lock:
+            current = self._snapshot
+            refreshed_at = time.time() if refreshed else current.refreshed_at
+            if items == current.items:
+                if refreshed_at != current.refreshed_at:
+                    self._snapshot = dataclasses.replace(current, refreshed_at=refreshed_at)
+                return self._snapshot
+            self._snapshot = CorpusSnapshot(version=current.version + 1, items=items, refreshed_at=refreshed_at)
+            return self._snapshot
+
+    def refresh(self, refresh_fn: Callable[[], None]) -> bool:
+        """Run ``refresh_fn`` unless a concurrent caller already refreshed meanwhile.
+
+        Returns True if this call performed the refresh.
+        """
+        seen = self._refresh_count
+        with self._refresh_lock:
+            if self._refresh_count != seen:
+                return False
+            try:
+                refresh_fn()
+            finally:
+                self._refresh_count += 1
+        return True
@@ -1,10 +1,28 @@
+from typing import Callable, List, Optional
 from google_adk import ParallelAgent
+from models.feed_fetcher import FeedFetcher, FeedResult
 
 class DataFetcherAgent(ParallelAgent):
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, connect_timeout: float = 5.0, read_timeout: float = 10.0, cache=None,
+                 max_entries_per_feed: int = 20):
         super().__init__(
             name="DataFetcherAgent",
             sub_agents=[
-                # Add RSS Feed Fetcher and Google Search Fetcher here
+                # Add Google Search Fetcher here
             ]
         )
+        # RSS feeds are fetched concurrently by the feed fetcher rather than one sub-agent per URL
+        self.feed_fetcher = FeedFetcher(
+            max_workers=max_workers,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            cache=cache,
+            max_entries=max_entries_per_feed
+        )
+
+    def fetch_feeds(self, feed_urls: List[str], is_seen: Optional[Callable[[str], bool]] = None) -> List[FeedResult]:
+        """Fetch all RSS feeds in parallel, returning partial results if some are slow.
+
+        Parsing of a feed stops early at the first entry for which ``is_seen(link)`` is true.
+        """
+        return self.feed_fetcher.fetch_all(feed_urls, is_seen)
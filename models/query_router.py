@@ -0,0 +1,239 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models.compact_article import ArticleMeta
+from models.response_models import DISPLAY_DATE_FORMAT, NewsItem
+from models.retrieval_index import STOPWORDS
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+# Questions that need reading and reasoning go to the LLM even when they name a source or author
+ANALYTIC_RE = re.compile(r"\b(summar\w*|explain\w*|why|how|compare\w*|analy\w*|impact|opinion|think|mean\w*)\b")
+LISTING_RE = re.compile(r"\b(latest|recent|newest|articles?|news|stories|story|posts?|headlines|anything|list|show)\b")
+SOURCE_CUE_RE = re.compile(r"\b(from|in|on|at)\s+$")
+AUTHOR_CUE_RE = re.compile(r"\b(by|written by|from)\s+$")
+TAG_CUE_RE = re.compile(r"\b(tagged|tagged with|tag|tags|category|topic)\s+$")
+LAST_N_RE = re.compile(r"\b(?:last|past)\s+(\d+)\s+(day|week|month)s?\b")
+# Words a lookup may contain besides the names it asks for; any other word makes it a free-form question
+FILLER_WORDS = STOPWORDS | frozenset("""
+s whats articles article stories story posts post headlines headline anything everything all recent newest new
+list find get see some most written tagged tag tags category topic this week month today yesterday last past
+""".split())
+
+
+def normalize_name(text: str) -> str:
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+@dataclass
+class StructuredQuery:
+    """A metadata lookup recognized in a user question."""
+    source: Optional[str] = None
+    author: Optional[str] = None
+    tag: Optional[str] = None
+    since: Optional[datetime] = None
+    period: Optional[str] = None # How the date range was phrased, for the answer
+
+    @property
+    def kind(self) -> str:
+        """Which fields the lookup filters on, e.g. ``source+date``."""
+        fields = [name for name in ("source", "author", "tag") if getattr(self, name)]
+        return "+".join(fields + (["date"] if self.since else []))
+
+    def describe(self) -> str:
+        parts = []
+        if self.source:
+            parts.append(f"from {self.source}")
+        if self.author:
+            parts.append(f"by {self.author}")
+        if self.tag:
+            parts.append(f"tagged {self.tag}")
+        if self.period:
+            parts.append(self.period)
+        return " ".join(parts)
+
+
+class MetadataIndex:
+    """In-memory indexes of the stored articles by source, author and tag.
+
+    Keeps one compact ``ArticleMeta`` per canonical article; an article is
+    listed under its own source and the sources of its syndicated copies.
+    Names are matched case- and punctuation-insensitively.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._articles: Dict[str, ArticleMeta] = {}
+        self._fields: Dict[str, Dict[str, Set[str]]] = {"source": defaultdict(set), "author": defaultdict(set),
+                                                        "tag": defaultdict(set)}
+        self._display: Dict[str, Dict[str, str]] = {"source": {}, "author": {}, "tag": {}}
+        self._keys: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        # Each source's own link to a syndicated article, by normalized source name
+        self._links: Dict[str, Dict[str, Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def add(self, key: str, item: NewsItem) -> None:
+        """Index an item, replacing any previous version with the same key."""
+        values = {
+            "source": [link.source for link in item.all_sources],
+            "author": item.authors,
+            "tag": item.tags,
+        }
+        with self._lock:
+            self._remove(key)
+            self._articles[key] = ArticleMeta.from_item(key, item)
+            if item.syndicated:
+                self._links[key] = {normalize_name(copy.source): (copy.source, copy.link) for copy in item.syndicated}
+            self._keys[key] = {}
+            for field, names in values.items():
+                normalized = tuple({normalize_name(name): name for name in names if normalize_name(name)}.items())
+                self._keys[key][field] = tuple(name for name, _ in normalized)
+                for name, display in normalized:
+                    self._fields[field][name].add(key)
+                    self._display[field].setdefault(name, display)
+
+    def add_many(self, items: Iterable[Tuple[str, NewsItem]]) -> None:
+        for key, item in items:
+            self.add(key, item)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        if self._articles.pop(key, None) is None:
+            return
+        self._links.pop(key, None)
+        for field, names in self._keys.pop(key).items():
+            for name in names:
+                keys = self._fields[field].get(name)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._fields[field][name]
+                        self._display[field].pop(name, None)
+
+    def names(self, field: str) -> Dict[str, str]:
+        """Normalized name to display name of every indexed source, author or tag."""
+        with self._lock:
+            return dict(self._display[field])
+
+    def lookup(self, query: StructuredQuery, limit: int) -> List[Tuple[ArticleMeta, str, str]]:
+        """(article, source, link) for articles matching every field of the query, most recent first.
+
+        For a source lookup the source and link are that source's own copy of the article.
+        """
+        wanted = normalize_name(query.source) if query.source else None
+        since = query.since.timestamp() if query.since is not None else None
+        with self._lock:
+            candidates: Optional[Set[str]] = None
+            for field, value in (("source", query.source), ("author", query.author), ("tag", query.tag)):
+                if value is None:
+                    continue
+                keys = self._fields[field].get(normalize_name(value), set())
+                candidates = set(keys) if candidates is None else candidates & keys
+            articles = [self._articles[key] for key in (candidates if candidates is not None else self._articles)]
+            if since is not None:
+                articles = [article for article in articles
+                            if article.published_ts is not None and article.published_ts >= since]
+            articles.sort(key=lambda article: article.published_ts or 0.0, reverse=True)
+            results = []
+            for article in articles[:limit]:
+                source, link = self._links.get(article.key, {}).get(wanted, (article.source, article.link))
+                results.append((article, source, link))
+        return results
+
+
+class QueryRouter:
+    """Answers structured metadata lookups straight from ``MetadataIndex``, without the LLM.
+
+    Recognizes questions such as "latest from IoT Insider", "articles by
+    Priya Nair" or "anything tagged LoRaWAN this week": a known source, author
+    or tag named after its cue word ("from", "by", "tagged"), optionally with
+    a date range. Everything else, including questions that ask for a
+    summary or an explanation, returns None and goes to the agent.
+    """
+
+    def __init__(self, index: MetadataIndex, max_results: int = 10,
+                 clock: Callable[[], float] = time.time):
+        self.index = index
+        self.max_results = max_results
+        self.clock = clock
+
+    def route(self, query: str) -> Optional[StructuredQuery]:
+        """The metadata lookup the question asks for, or None if it needs the agent."""
+        text = f" {normalize_name(query)} "
+        if ANALYTIC_RE.search(text):
+            return None
+        found = {
+            "source": self._find(text, "source", SOURCE_CUE_RE, require_cue=not LISTING_RE.search(text)),
+            "author": self._find(text, "author", AUTHOR_CUE_RE),
+            "tag": self._find(text, "tag", TAG_CUE_RE),
+        }
+        if not any(found.values()):
+            return None
+        # Anything left besides the names, cue words and a date range is a topic the index cannot filter on
+        rest = LAST_N_RE.sub(" ", text)
+        for name, _ in filter(None, found.values()):
+            rest = rest.replace(f" {name} ", " ", 1)
+        if any(word not in FILLER_WORDS for word in rest.split()):
+            return None
+        since, period = self._date_range(text)
+        return StructuredQuery(*(match[1] if match else None for match in found.values()), since=since, period=period)
+
+    def _find(self, text: str, field: str, cue: re.Pattern, require_cue: bool = True) -> Optional[Tuple[str, str]]:
+        """(normalized, display) for the longest known ``field`` name in the text, after its cue word if required."""
+        best = None
+        for name, display in self.index.names(field).items():
+            position = text.find(f" {name} ")
+            while position != -1:
+                if not require_cue or cue.search(text[:position + 1]):
+                    if best is None or len(name) > len(best[0]):
+                        best = (name, display)
+                    break
+                position = text.find(f" {name} ", position + 1)
+        return best
+
+    def _date_range(self, text: str) -> Tuple[Optional[datetime], Optional[str]]:
+        now = datetime.fromtimestamp(self.clock(), timezone.utc)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        match = LAST_N_RE.search(text)
+        if match:
+            count, unit = int(match.group(1)), match.group(2)
+            days = count * {"day": 1, "week": 7, "month": 30}[unit]
+            return now - timedelta(days=days), f"in the last {count} {unit}{'s' if count != 1 else ''}"
+        if " today " in text:
+            return today, "today"
+        if " yesterday " in text:
+            return today - timedelta(days=1), "since yesterday"
+        if " this week " in text or " past week " in text or " last week " in text:
+            return now - timedelta(days=7), "this week"
+        if " this month " in text or " past month " in text or " last month " in text:
+            return now - timedelta(days=30), "this month"
+        return None, None
+
+    def answer(self, query: str) -> Optional[Tuple[StructuredQuery, str]]:
+        """Route the question and format the answer, or None if it needs the agent."""
+        structured = self.route(query)
+        if structured is None:
+            return None
+        articles = self.index.lookup(structured, self.max_results)
+        return structured, self.format_answer(structured, articles)
+
+    @staticmethod
+    def format_answer(structured: StructuredQuery, articles: List[Tuple[ArticleMeta, str, str]]) -> str:
+        description = structured.describe()
+        if not articles:
+            return f"I couldn't find any stored articles {description}."
+        lines = [f"Here {'is the latest article' if len(articles) == 1 else f'are the {len(articles)} latest articles'} "
+                 f"{description}:", ""]
+        for article, source, link in articles:
+            published = article.published_at.strftime(DISPLAY_DATE_FORMAT) if article.published_at else "Recent"
+            lines.append(f"- [{article.title}]({link}) ({source}, {published})")
+        return "\n".join(lines) + "\n"
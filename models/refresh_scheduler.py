@@ -0,0 +1,97 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Background scheduler that keeps the news corpus fresh off the request path.
+
+    Each feed has its own refresh interval (``feed_intervals`` overrides
+    ``default_interval``) with random jitter so feeds do not synchronize. The
+    scheduler thread calls ``refresh_fn`` with the feeds that are due; users
+    keep reading the last published snapshot meanwhile
+    (stale-while-revalidate). ``request_refresh()`` only moves feeds to the
+    front of the queue and never waits for the network.
+    """
+
+    def __init__(self, refresh_fn: Callable[[List[str]], None], feed_urls: List[str],
+                 default_interval: float = 900.0, feed_intervals: Optional[Dict[str, float]] = None,
+                 jitter: float = 0.1):
+        self.refresh_fn = refresh_fn
+        self.feed_urls = list(feed_urls)
+        self.default_interval = default_interval
+        self.feed_intervals = feed_intervals if feed_intervals is not None else {}
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Every feed is due immediately so a cold process fills its corpus right away
+        now = time.monotonic()
+        self._next_due: Dict[str, float] = {url: now for url in self.feed_urls}
+        self.last_run_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def interval_for(self, url: str) -> float:
+        return self.feed_intervals.get(url, self.default_interval)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="news-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def request_refresh(self, feed_urls: Optional[List[str]] = None) -> None:
+        """Queue an early refresh of the given feeds (all by default) without blocking."""
+        now = time.monotonic()
+        with self._lock:
+            for url in feed_urls or self.feed_urls:
+                self._next_due[url] = now
+        self._wake.set()
+
+    def seconds_until_next(self) -> float:
+        with self._lock:
+            if not self._next_due:
+                return self.default_interval
+            return max(0.0, min(self._next_due.values()) - time.monotonic())
+
+    def _due_feeds(self) -> Dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            return {url: due for url, due in self._next_due.items() if due <= now}
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            due = self._due_feeds()
+            if due:
+                try:
+                    self.refresh_fn(list(due))
+                    self.last_error = None
+                except Exception as e:
+                    # Keep serving the last good snapshot; try again on the next interval
+                    self.last_error = str(e)
+                    logger.exception("Background news refresh failed")
+                self.last_run_at = time.time()
+                finished = time.monotonic()
+                with self._lock:
+                    for url, due_at in due.items():
+                        # Feeds re-queued while the refresh was running stay due
+                        if self._next_due.get(url) == due_at:
+                            self._next_due[url] = finished + self._jittered(self.interval_for(url))
+                continue
+            self._wake.wait(timeout=self.seconds_until_next())
+            self._wake.clear()
@@ -0,0 +1,79 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?.!]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry."""
+    return _TRAILING_PUNCT_RE.sub("", _WHITESPACE_RE.sub(" ", query.strip().lower()))
+
+
+def context_fingerprint(context: str) -> str:
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache of agent responses.
+
+    Entries are keyed on the normalized query plus a fingerprint of the news
+    context actually sent to the agent, so a changed corpus can never serve a
+    stale answer; ``clear()`` additionally drops everything when the corpus is
+    refreshed. Hit/miss counters are exposed through ``stats()``.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 900.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(query: str, context: str) -> Tuple[str, str]:
+        return normalize_query(query), context_fingerprint(context)
+
+    def get(self, query: str, context: str) -> Optional[str]:
+        """Return the cached response or None, counting the hit or miss."""
+        key = self.make_key(query, context)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key] # Expired
+            self.misses += 1
+            return None
+
+    def put(self, query: str, context: str, response: str) -> None:
+        key = self.make_key(query, context)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Invalidate every entry, e.g. after the news corpus changed."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
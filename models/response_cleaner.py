@@ -0,0 +1,146 @@
+import re
+
+# Rules applied to the start of every line of a model answer
+_HEADER_RE = re.compile(r'^#+ .+$', re.MULTILINE)
+_STAR_BULLET_RE = re.compile(r'^\* ', re.MULTILINE)
+_TIGHT_BULLET_RE = re.compile(r'^-([^\s])', re.MULTILINE)
+_LEADING_KEY_POINT_RE = re.compile(r'^Key Point:')
+_BULLET_KEY_POINT_RE = re.compile(r'^- Key Point:', re.MULTILINE)
+_BOLD_KEY_POINT_RE = re.compile(r'^- \*\*Key Point\*\*:', re.MULTILINE)
+# Rules that can match anywhere in a line
+_QUOTE_RE = re.compile(r'>"([^"]+)"')
+_SOURCE_RE = re.compile(r'Source: ([^(]+) \(([^)]+)\)')
+
+# Raw line starts that a line-start rule may still rewrite (after "* " -> "- " and "-x" -> "- x");
+# a line is held until it is no longer a prefix of one of these
+_HEAD_TRIGGERS = ("* ", "- Key Point:", "-Key Point:", "* Key Point:",
+                  "- **Key Point**:", "-**Key Point**:", "* **Key Point**:")
+# Removing a leading "Key Point:" can expose a bullet key point behind it
+_FIRST_LINE_TRIGGERS = _HEAD_TRIGGERS + ("Key Point:- Key Point:", "Key Point:- **Key Point**:")
+_SOURCE_PREFIX = "Source: "
+
+
+def clean_response_text(text: str) -> str:
+    """Tidy a complete model answer: drop headers, normalize bullets and link sources."""
+    text = _HEADER_RE.sub('', text)
+    text = _STAR_BULLET_RE.sub('- ', text)
+    text = _TIGHT_BULLET_RE.sub(r'- \1', text)
+    text = _QUOTE_RE.sub(r'"\1"', text)
+    text = _LEADING_KEY_POINT_RE.sub('', text)
+    text = _BULLET_KEY_POINT_RE.sub('- ', text)
+    text = _BOLD_KEY_POINT_RE.sub('- ', text)
+    text = _SOURCE_RE.sub(r'Source: [\1](\2)', text)
+    return text
+
+
+def _clean_line_head(line: str, first_line: bool) -> str:
+    if line.startswith('#'):
+        line = _HEADER_RE.sub('', line)
+    line = _STAR_BULLET_RE.sub('- ', line)
+    line = _TIGHT_BULLET_RE.sub(r'- \1', line)
+    if first_line:
+        line = _LEADING_KEY_POINT_RE.sub('', line)
+    line = _BULLET_KEY_POINT_RE.sub('- ', line)
+    return _BOLD_KEY_POINT_RE.sub('- ', line)
+
+
+def _head_settled(line: str, first_line: bool) -> bool:
+    """Whether more text on this (unfinished) line can no longer change what the line-start rules do."""
+    if line.startswith('#'):
+        return False # A header line is dropped or kept as a whole
+    if line == '-':
+        return False # "-x" becomes "- x"
+    triggers = _FIRST_LINE_TRIGGERS if first_line else _HEAD_TRIGGERS
+    return not any(len(line) < len(trigger) and trigger.startswith(line) for trigger in triggers)
+
+
+def _quote_cut(text: str) -> int:
+    """Index up to which the quote rule's matches in ``text`` cannot change as more text arrives."""
+    last_end = 0
+    for match in _QUOTE_RE.finditer(text):
+        last_end = match.end()
+    # A '>' after the last match may still open a quote, unless the attempt there has already failed
+    at = text.find('>', last_end)
+    while at != -1:
+        opening = text[at + 1:at + 3]
+        if opening in ('', '"') or (opening[0] == '"' and opening != '""' and '"' not in text[at + 3:]):
+            return at
+        at = text.find('>', at + 1)
+    return len(text)
+
+
+def _source_cut(text: str) -> int:
+    """Index up to which the source link rule's matches in ``text`` cannot change as more text arrives."""
+    last_end = 0
+    for match in _SOURCE_RE.finditer(text):
+        last_end = match.end()
+    at = text.find(_SOURCE_PREFIX, last_end)
+    while at != -1:
+        paren = text.find('(', at + len(_SOURCE_PREFIX))
+        if paren == -1:
+            return at # The link text may still be streaming
+        if paren > at + len(_SOURCE_PREFIX) + 1 and text[paren - 1] == ' ' and text.find(')', paren + 1) == -1:
+            return at # The URL may still be streaming
+        at = text.find(_SOURCE_PREFIX, at + 1)
+    # A trailing partial "Source: " might be completed by the next chunk
+    for size in range(min(len(_SOURCE_PREFIX) - 1, len(text) - last_end), 0, -1):
+        if _SOURCE_PREFIX.startswith(text[-size:]):
+            return len(text) - size
+    return len(text)
+
+
+class StreamingResponseCleaner:
+    """Apply the ``clean_response_text`` rules incrementally to streamed chunks.
+
+    Produces exactly what ``clean_response_text`` gives for the whole answer,
+    however it is split into chunks. Line-start rules are applied as soon as
+    a line is long enough that none of them can still match (or its newline
+    arrives). The quote and source link rules, whose matches may span lines,
+    release text up to the first match that is still open, so users see
+    output almost as fast as the model produces it.
+    """
+
+    def __init__(self):
+        self._line = "" # Raw text of the current line whose start is not decided yet
+        self._head_done = False # Line-start rules already applied to the current line
+        self._first_line = True
+        self._quote_pending = "" # Line-cleaned text the quote rule has not released
+        self._source_pending = "" # Quote-cleaned text the source link rule has not released
+
+    def _release(self, text: str, final: bool = False) -> str:
+        """Run line-cleaned ``text`` through the inline rules; return what is settled."""
+        pending = self._quote_pending + text
+        cut = len(pending) if final else _quote_cut(pending)
+        self._quote_pending = pending[cut:]
+        pending = self._source_pending + _QUOTE_RE.sub(r'"\1"', pending[:cut])
+        cut = len(pending) if final else _source_cut(pending)
+        self._source_pending = pending[cut:]
+        return _SOURCE_RE.sub(r'Source: [\1](\2)', pending[:cut])
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of model output and return the cleaned text that is ready."""
+        cleaned = []
+        self._line += chunk
+        while "\n" in self._line:
+            line, self._line = self._line.split("\n", 1)
+            if not self._head_done:
+                line = _clean_line_head(line, self._first_line)
+            cleaned.append(line + "\n")
+            self._head_done = False
+            self._first_line = False
+        if not self._head_done and _head_settled(self._line, self._first_line):
+            self._line = _clean_line_head(self._line, self._first_line)
+            self._head_done = True
+        if self._head_done:
+            cleaned.append(self._line)
+            self._line = ""
+        return self._release("".join(cleaned))
+
+    def flush(self) -> str:
+        """Return whatever is left once the stream has ended."""
+        line = self._line
+        if line and not self._head_done:
+            line = _clean_line_head(line, self._first_line)
+        tail = self._release(line, final=True)
+        self.__init__()
+        return tail
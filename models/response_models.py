@@ -1,15 +1,49 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+
+# How publication dates are shown to users and to the LLM
+DISPLAY_DATE_FORMAT = "%B %d, %Y"
+
+class SourceLink(BaseModel):
+    source: str
+    link: str
 
 class NewsItem(BaseModel):
     title: str
     description: str
     link: str
-    date: str # Keep as string for simplicity, as it's already formatted
+    published_at: Optional[datetime] = None # Timezone-aware (UTC); None when the feed gives no date
     tags: List[str]
     authors: List[str]
     source: str
+    # Near-duplicate copies of this story published by other feeds
+    syndicated: List[SourceLink] = []
+
+    @field_validator("published_at")
+    @classmethod
+    def _ensure_aware(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Feeds without an offset publish UTC; naive values are taken as such
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+    @property
+    def date(self) -> str:
+        """Publication date formatted for display."""
+        if self.published_at is None:
+            return "Recent"
+        return self.published_at.strftime(DISPLAY_DATE_FORMAT)
+
+    @property
+    def all_sources(self) -> List[SourceLink]:
+        """Every feed that carried this story, this item's own source first."""
+        return [SourceLink(source=self.source, link=self.link)] + list(self.syndicated)
+
+class ArticleSummary(BaseModel):
+    """Compact digest of one article, generated once at ingest."""
+    summary: str
+    entities: List[str] = []
 
 class NewsResponse(BaseModel):
     section_title: str
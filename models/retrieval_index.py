@@ -0,0 +1,129 @@
+import math
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from models.compact_article import ArticleMeta
+from models.response_models import NewsItem
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can for from has have how i in is it its me of on or
+our so that the their there these this to was what when where which who why
+will with about any latest news tell show give please
+""".split())
+
+# Field weights: a match in the title or tags says more than one in the body
+FIELD_WEIGHTS = {"title": 3, "tags": 2, "authors": 2, "description": 1}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class _IndexedDoc:
+    """Per-document bookkeeping; term frequencies live only in the postings."""
+
+    __slots__ = ("terms", "length", "article")
+
+    def __init__(self, terms: Tuple[str, ...], length: int, article: ArticleMeta):
+        self.terms = terms
+        self.length = length
+        self.article = article
+
+
+class BM25Index:
+    """Incremental in-memory BM25 index over news items.
+
+    Documents are the weighted title, tags, authors and description of a
+    ``NewsItem`` keyed by a caller-chosen id (the article link hash). Adding an
+    existing id replaces its postings, so the index can be updated with just
+    the items that changed on a refresh. Only postings and a compact
+    ``ArticleMeta`` are kept per document, never the body, so the whole stored
+    history can be indexed in one process.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._docs: Dict[str, _IndexedDoc] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def articles(self) -> Dict[str, ArticleMeta]:
+        return {doc_id: doc.article for doc_id, doc in self._docs.items()}
+
+    @staticmethod
+    def _terms(item: NewsItem) -> Counter:
+        fields = {
+            "title": item.title,
+            "tags": " ".join(item.tags),
+            "authors": " ".join(item.authors),
+            "description": item.description,
+        }
+        terms = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token, count in Counter(tokenize(text)).items():
+                # Interned so each term is stored once however many documents use it
+                terms[sys.intern(token)] += weight * count
+        return terms
+
+    def _remove(self, doc_id: str) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in doc.terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_len -= doc.length
+
+    def add(self, doc_id: str, item: NewsItem) -> None:
+        """Index an item, replacing any previous version with the same id."""
+        terms = self._terms(item)
+        doc = _IndexedDoc(tuple(terms), sum(terms.values()), ArticleMeta.from_item(doc_id, item))
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in terms.items():
+                self._postings[term][doc_id] = tf
+            self._docs[doc_id] = doc
+            self._total_len += doc.length
+
+    def add_many(self, docs: Iterable[Tuple[str, NewsItem]]) -> None:
+        for doc_id, item in docs:
+            self.add(doc_id, item)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[ArticleMeta, float]]:
+        """Return up to ``k`` articles ranked by BM25 score for the query."""
+        query_terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs or not query_terms:
+                return []
+            avg_len = self._total_len / n_docs
+            scores: Dict[str, float] = defaultdict(float)
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._docs[doc_id].length / avg_len)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            ranked = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)[:k]
+            return [(self._docs[doc_id].article, score) for doc_id, score in ranked]
@@ -1,12 +1,112 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Optional, Set, Tuple
+
 from google_adk import SequentialAgent
+from models.article_store import ArticleStore, content_hash
+from models.article_summary_agent import ArticleSummaryAgent
+from models.background_loop import BackgroundLoop
 from models.query_processor_agent import QueryProcessorAgent
 
+logger = logging.getLogger(__name__)
+
+
 class NewsProcessingPipeline(SequentialAgent):
-    def __init__(self):
+    def __init__(self, summary_agent: Optional[ArticleSummaryAgent] = None, batch_size: int = 8,
+                 max_per_pass: int = 64, pass_pause: float = 30.0, yield_interval: float = 0.5):
+        summary_agent = summary_agent or ArticleSummaryAgent()
         super().__init__(
             name="NewsProcessingPipeline",
             sub_agents=[
+                summary_agent,
                 QueryProcessorAgent(),
                 # Add RSS Feed Fetcher and Google Search Fetcher here
             ]
         )
+        # Ingest stage: a summary and key entities per new article, generated once in batches
+        # off the request path and cached in the article store by content hash.
+        self.summary_agent = summary_agent
+        self.batch_size = batch_size
+        # A large backlog (e.g. the whole stored history on first start) is worked through in
+        # passes of at most max_per_pass articles, pass_pause seconds apart, and a batch waits
+        # while user questions are queued for admission, so it never competes with them for slots.
+        self.max_per_pass = max_per_pass
+        self.pass_pause = pass_pause
+        self.yield_interval = yield_interval
+        self._lock = threading.Lock()
+        self._running = False
+        self._requested = False
+        self._skipped: Set[str] = set() # Content hashes the model returned nothing for
+
+    def schedule_summaries(self, store: ArticleStore, event_loop: BackgroundLoop) -> None:
+        """Summarize new articles in the background; a pass already running picks them up."""
+        with self._lock:
+            self._requested = True
+            if self._running:
+                return
+            self._running = True
+        event_loop.submit(self._run(store)).add_done_callback(self._pass_done)
+
+    def _pass_done(self, future: "concurrent.futures.Future[None]") -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            # Nothing else waits on the background pass, so its failure is only visible here
+            self.summary_agent.metrics.inc("summary_pass_failures_total")
+            logger.error("Background summary pass failed", exc_info=error)
+
+    async def _run(self, store: ArticleStore) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if not self._requested:
+                        self._running = False
+                        return
+                    self._requested = False
+                _, more = await self._summarize(store, self.max_per_pass, yield_to_queries=True)
+                if more:
+                    with self._lock:
+                        self._requested = True
+                    await asyncio.sleep(self.pass_pause)
+        except BaseException:
+            with self._lock:
+                self._running = False
+            raise
+
+    async def summarize_pending(self, store: ArticleStore) -> int:
+        """Summarize stored articles without a cached summary, newest first; returns how many were added."""
+        added, _ = await self._summarize(store)
+        return added
+
+    async def _summarize(self, store: ArticleStore, limit: Optional[int] = None,
+                         yield_to_queries: bool = False) -> Tuple[int, bool]:
+        """Summarize up to ``limit`` pending articles; returns how many were added and whether more are left."""
+        metrics = self.summary_agent.metrics
+        admission = self.summary_agent.admission
+        added = attempted = 0
+        while True:
+            size = self.batch_size if limit is None else min(self.batch_size, limit - attempted)
+            if size <= 0:
+                return added, True
+            batch = await asyncio.to_thread(store.unsummarized, size, self._skipped)
+            if not batch:
+                return added, False
+            while yield_to_queries and admission.waiting:
+                await asyncio.sleep(self.yield_interval)
+            try:
+                results = await self.summary_agent.summarize(batch)
+            except Exception as e:
+                # Left for the next refresh to retry
+                metrics.inc("summary_errors_total")
+                logger.warning("Summarizing %d article(s) failed: %s", len(batch), e)
+                return added, False
+            attempted += len(batch)
+            summaries = {content_hash(batch[i]): summary for i, summary in results.items()}
+            # Not asked for again in this process, so one odd article cannot stall the backlog
+            self._skipped.update(content_hash(item) for i, item in enumerate(batch) if i not in results)
+            await asyncio.to_thread(store.save_summaries, summaries)
+            metrics.inc("summaries_generated_total", len(summaries))
+            added += len(summaries)
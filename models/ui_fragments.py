@@ -0,0 +1,68 @@
+import html
+import re
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+from models.response_models import NewsItem
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+SIDEBAR_PREVIEW_CHARS = 180
+
+# Streamlit re-executes the app script on every rerun; these caches live in an
+# imported module, so they persist across reruns and browser sessions.
+
+
+@lru_cache(maxsize=4)
+def compact_css(css: str) -> str:
+    """The stylesheet without comments and redundant whitespace, computed once per process."""
+    css = _CSS_COMMENT_RE.sub("", css)
+    css = _CSS_SPACE_RE.sub(" ", css)
+    return _CSS_PUNCTUATION_RE.sub(r"\1", css).strip()
+
+
+@lru_cache(maxsize=4096)
+def _news_card_html(title: str, date: str, source: str, text: str, link: str,
+                    syndicated: Tuple[Tuple[str, str], ...]) -> str:
+    # Feed text may hold blank lines, '<' or '&'; any of them would end or break the shared HTML block
+    preview = html.escape(" ".join(text.split())[:SIDEBAR_PREVIEW_CHARS])
+    title, date, source, link = (html.escape(value) for value in (title, date, source, link))
+    # Syndicated copies are collapsed into this card; link to the other sources instead
+    also_in = ""
+    if syndicated:
+        links = ", ".join(f'<a href="{html.escape(copy_link)}" target="_blank">{html.escape(copy_source)}</a>'
+                          for copy_source, copy_link in syndicated)
+        also_in = f'<div class="news-date" style="margin-top: 0.3rem;">Also in: {links}</div>'
+    # No blank lines inside the block, or markdown would end the HTML there
+    return "".join([
+        '<div class="news-item">',
+        f'<div class="news-title">📰 {title}</div>',
+        f'<div class="news-date">📅 {date} | Source: {source}</div>',
+        f'<div style="margin-top: 0.5rem;">{preview}...</div>',
+        f'<a href="{link}" target="_blank">🔗 Read full article</a>',
+        also_in,
+        '</div>',
+    ])
+
+
+def news_card_html(item: NewsItem) -> str:
+    """The sidebar card for an article, memoized by the card's content."""
+    # Enough text for the preview even after runs of whitespace are collapsed
+    text = item.description[:SIDEBAR_PREVIEW_CHARS * 2]
+    return _news_card_html(item.title, item.date, item.source, text, item.link,
+                           tuple((copy.source, copy.link) for copy in item.syndicated))
+
+
+def news_page_html(items: Sequence[NewsItem]) -> str:
+    """One page of sidebar cards as a single HTML block, so the page is one element instead of one per article."""
+    return "\n".join(news_card_html(item) for item in items)
+
+
+def page_bounds(total: int, page: int, page_size: int) -> Tuple[int, int, int, int]:
+    """(page, start, end, page_count) for a 0-based page, clamped to the pages that exist."""
+    page_count = max(1, -(-total // page_size))
+    page = min(max(page, 0), page_count - 1)
+    start = page * page_size
+    return page, start, min(start + page_size, total), page_count
+
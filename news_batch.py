@@ -0,0 +1,144 @@
+"""Headless batch mode: answer a file of questions over one frozen news snapshot.
+
+Loads the news the app has stored (after one feed refresh with ``--fetch``),
+then runs every question through ``IoTNewsBot.process_query`` with at most
+``--concurrency`` in flight, e.g. for a nightly digest or to load-test the
+agent path without a browser. No background refresh runs meanwhile, so
+every answer sees the same snapshot. Writes one JSON line per question, in
+completion order:
+
+    {"index": 0, "query": "...", "answer": "...", "first_chunk_seconds": 0.41,
+     "latency_seconds": 2.3, "snapshot_version": 1}
+
+Usage (reads GEMINI_API_KEY from the environment or .env):
+
+    python news_batch.py questions.txt --out answers.jsonl --concurrency 8 --fetch
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import time
+from typing import IO, List, Optional
+
+from models.news_bot import IoTNewsBot
+
+logger = logging.getLogger("news_batch")
+
+
+def read_queries(stream: IO[str]) -> List[str]:
+    """One question per line; blank lines and ``#`` comments are skipped."""
+    return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+
+
+async def answer(bot: IoTNewsBot, index: int, query: str, session_id: str) -> dict:
+    start = time.perf_counter()
+    first_chunk: Optional[float] = None
+    parts = []
+    record = {"index": index, "query": query}
+    try:
+        async for chunk in bot.process_query(query, session_id):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            parts.append(chunk)
+    except Exception as e:
+        # process_query reports most failures in its answer; anything else is recorded per question
+        record["error"] = str(e)
+    latency = time.perf_counter() - start
+    record.update(
+        answer="".join(parts),
+        first_chunk_seconds=round(first_chunk if first_chunk is not None else latency, 4),
+        latency_seconds=round(latency, 4),
+        snapshot_version=bot.corpus.snapshot().version,
+    )
+    return record
+
+
+async def run_batch(bot: IoTNewsBot, queries: List[str], concurrency: int, out: IO[str]) -> List[float]:
+    """Answer every query, ``concurrency`` at a time, writing each result as it completes; returns the latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def worker(index: int, query: str) -> None:
+        async with semaphore:
+            # One admission session per parallel slot, so the fair queue interleaves them like users
+            record = await answer(bot, index, query, f"batch-{index % concurrency}")
+        latencies.append(record["latency_seconds"])
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    await asyncio.gather(*(worker(i, query) for i, query in enumerate(queries)))
+    return latencies
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("queries", help="file with one question per line, or - for stdin")
+    parser.add_argument("--out", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=4, help="questions answered in parallel")
+    parser.add_argument("--fetch", action="store_true", help="refresh the feeds once before answering")
+    parser.add_argument("--summaries", action="store_true",
+                        help="generate missing article summaries before answering")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        logger.error("No Gemini API key found. Please set the GEMINI_API_KEY environment variable.")
+        return 2
+    # Summaries are generated up front (--summaries), never mid-batch, so every answer sees the same context
+    os.environ["NEWS_SUMMARIES"] = "0"
+
+    if args.queries == "-":
+        queries = read_queries(sys.stdin)
+    else:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = read_queries(f)
+
+    bot = IoTNewsBot(api_key=api_key)
+    # Every answer should see the fully indexed history, not the warm-up fallback
+    bot.indexes_ready.wait()
+    if args.fetch:
+        bot.fetch_news()
+    if args.summaries:
+        added = bot.event_loop.run(bot.news_pipeline.summarize_pending(bot.article_store))
+        logger.info("Generated %d article summaries", added)
+    snapshot = bot.corpus.snapshot()
+    if not snapshot.items:
+        logger.error("No stored news to answer from; run with --fetch or start the app once.")
+        return 1
+    logger.info("Answering %d question(s) over snapshot %d (%d current articles, %d stored), %d at a time",
+                len(queries), snapshot.version, len(snapshot.items), bot.article_store.count(), args.concurrency)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        latencies = bot.event_loop.run(run_batch(bot, queries, args.concurrency, out))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        bot.metrics.flush()
+    if latencies:
+        logger.info("Answered %d question(s) in %.1fs; latency p50=%.2fs p95=%.2fs max=%.2fs",
+                    len(latencies), time.perf_counter() - start, percentile(latencies, 0.5),
+                    percentile(latencies, 0.95), max(latencies))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
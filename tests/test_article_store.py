@@ -0,0 +1,42 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from models.article_store import ArticleStore, content_hash, link_hash
+from models.response_models import ArticleSummary, NewsItem
+
+
+def make_item(n: int, source: str = "Feed A") -> NewsItem:
+    return NewsItem(title=f"Story {n}", description=f"Body of story {n}", link=f"https://a.example/{n}",
+                    published_at=datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(days=n),
+                    tags=["iot"], authors=["Ann"], source=source)
+
+
+class PruneTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ArticleStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_keeps_most_recent_canonical_articles(self):
+        items = [make_item(n) for n in range(5)]
+        self.store.upsert(items)
+        pruned = self.store.prune(3)
+        self.assertEqual(sorted(pruned), sorted(link_hash(item.link) for item in items[:2]))
+        self.assertEqual([item.title for item in self.store.query()], ["Story 4", "Story 3", "Story 2"])
+        self.assertEqual(self.store.prune(3), [])
+
+    def test_removes_copies_and_unused_summaries(self):
+        old, new = make_item(0), make_item(1)
+        copy = make_item(0, source="Feed B").model_copy(update={"link": "https://b.example/0"})
+        self.store.upsert([old, new, copy], canonical_keys=[None, None, link_hash(old.link)])
+        summary = ArticleSummary(summary="s", entities=[])
+        self.store.save_summaries({content_hash(old): summary, content_hash(new): summary})
+        self.store.prune(1)
+        self.assertEqual(self.store.count(), 1)
+        self.assertEqual(self.store.summaries([old]), {})
+        self.assertEqual(list(self.store.summaries([new])), [content_hash(new)])
+
+
+if __name__ == "__main__":
+    unittest.main()
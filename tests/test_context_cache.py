@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from models.context_cache import GeminiContextCache, LocalContextCache, PromptPrefix, context_cache_from_env
+
+
+class FromEnvTest(unittest.TestCase):
+    def test_auto_and_off_disable_the_cache(self):
+        for mode in ("auto", "off", ""):
+            self.assertIsNone(context_cache_from_env(mode, "gemini-1.5-flash-001", 3600))
+
+    def test_gemini_needs_sdk_support_and_a_large_enough_prefix_budget(self):
+        with mock.patch.object(GeminiContextCache, "available", return_value=False):
+            self.assertIsNone(context_cache_from_env("gemini", "gemini-1.5-flash-001", 3600,
+                                                     prefix_token_budget=48000))
+        with mock.patch.object(GeminiContextCache, "available", return_value=True):
+            self.assertIsNone(context_cache_from_env("gemini", "gemini-1.5-flash-001", 3600,
+                                                     prefix_token_budget=6000))
+            self.assertIsNone(context_cache_from_env("gemini", "gemini-1.5-flash", 3600,
+                                                     prefix_token_budget=48000))
+            cache = context_cache_from_env("gemini", "gemini-1.5-flash-001", 3600, prefix_token_budget=48000)
+        self.assertIsInstance(cache, GeminiContextCache)
+
+    def test_caching_needs_a_recent_sdk(self):
+        for version, expected in (("0.3.2", False), ("0.8.3", True)):
+            genai = mock.Mock(__version__=version)
+            with self.subTest(version=version), \
+                    mock.patch.dict("sys.modules", {"google": mock.Mock(generativeai=genai),
+                                                    "google.generativeai": genai}), \
+                    mock.patch("models.context_cache.importlib.util.find_spec", return_value=object()):
+                self.assertEqual(GeminiContextCache.available(), expected)
+
+
+class LocalContextCacheTest(unittest.TestCase):
+    def test_registers_once_per_key_and_skips_small_prefixes(self):
+        async def run():
+            cache = LocalContextCache()
+            first = PromptPrefix(text="instructions and news")
+            models = [await cache.model_for(first, "base") for _ in range(2)]
+            await cache.model_for(PromptPrefix(text="newer news"), "base")
+            cache.min_tokens = 1000
+            small = await cache.model_for(PromptPrefix(text="newest news"), "base")
+            return models, small, cache.metrics.snapshot().counters
+
+        models, small, counters = asyncio.run(run())
+        self.assertEqual([model.prefix for model in models], ["instructions and news"] * 2)
+        self.assertIsNone(small)
+        self.assertEqual(counters[("prompt_prefix_registrations_total", ())], 2)
+        self.assertEqual(counters[("prompt_prefix_hits_total", ())], 1)
+        self.assertEqual(counters[("prompt_prefix_too_small_total", ())], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
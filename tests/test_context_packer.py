@@ -0,0 +1,102 @@
+import unittest
+
+from models.article_store import content_hash, link_hash
+from models.context_packer import (TRUNCATION_MARKER, ContextPacker, estimate_tokens, format_news_item,
+                                   leading_text)
+from models.response_models import ArticleSummary, NewsItem
+
+PARAGRAPH = "Sensor networks keep growing as gateways get cheaper and batteries last longer. " * 5
+
+
+def make_item(n, paragraphs=1, title=None, source="IoT Insider"):
+    return NewsItem(title=title or f"Article {n}", description="\n".join([PARAGRAPH.strip()] * paragraphs),
+                    link=f"https://example.com/{source.replace(' ', '-').lower()}/{n}", published_at=None,
+                    tags=["IoT"], authors=["Priya Nair"], source=source)
+
+
+def block_tokens(item):
+    return estimate_tokens(format_news_item(item)) + 1
+
+
+class LeadingTextTest(unittest.TestCase):
+    def test_short_text_is_unchanged(self):
+        self.assertEqual(leading_text("one\ntwo", 100), "one\ntwo")
+
+    def test_keeps_whole_paragraphs_then_cuts_at_a_word(self):
+        text = "first paragraph\nsecond paragraph is much longer than the rest"
+        cut = leading_text(text, 8)
+        self.assertTrue(cut.startswith("first paragraph\nsecond"))
+        self.assertTrue(cut.endswith(TRUNCATION_MARKER))
+        self.assertLessEqual(estimate_tokens(cut), 8)
+        self.assertNotIn("longer", cut)
+
+
+class ContextPackerTest(unittest.TestCase):
+    def test_everything_fits(self):
+        items = [make_item(n) for n in range(3)]
+        packed = ContextPacker(token_budget=10_000).pack(items)
+        self.assertEqual(packed.included, ["Article 0", "Article 1", "Article 2"])
+        self.assertEqual((packed.truncated, packed.dropped, packed.summarized), ([], [], []))
+        self.assertEqual(packed.partial_keys, set())
+        self.assertEqual(packed.text, "\n".join(format_news_item(item) for item in items))
+
+    def test_budget_is_never_exceeded(self):
+        items = [make_item(n, paragraphs=4) for n in range(20)]
+        for budget in (200, 700, 1500, 4000):
+            with self.subTest(budget=budget):
+                packed = ContextPacker(token_budget=budget, max_body_tokens=400).pack(items)
+                self.assertLessEqual(packed.tokens, budget)
+                self.assertLessEqual(estimate_tokens(packed.text), budget)
+                self.assertEqual(len(packed.included) + len(packed.dropped), len(items))
+
+    def test_long_bodies_are_cut_to_max_body_tokens(self):
+        packed = ContextPacker(token_budget=10_000, max_body_tokens=100).pack([make_item(1, paragraphs=10)])
+        self.assertEqual(packed.truncated, ["Article 1"])
+        self.assertIn("Content (truncated):", packed.text)
+        self.assertIn(TRUNCATION_MARKER, packed.text)
+
+    def test_last_article_is_truncated_to_fit(self):
+        first, last = make_item(1), make_item(2, paragraphs=10)
+        header = estimate_tokens(format_news_item(last, body="", truncated=True))
+        packer = ContextPacker(token_budget=block_tokens(first) + header + 80, max_body_tokens=1000)
+        packed = packer.pack([first, last])
+        self.assertEqual(packed.included, ["Article 1", "Article 2"])
+        self.assertEqual(packed.truncated, ["Article 2"])
+        self.assertEqual(packed.dropped, [])
+        self.assertLessEqual(packed.tokens, packer.token_budget)
+        # A partially included article still counts as included, not partial
+        self.assertEqual(packed.partial_keys, set())
+
+    def test_article_without_room_for_a_minimal_body_is_dropped(self):
+        first, second, third = make_item(1), make_item(2), make_item(3)
+        header = estimate_tokens(format_news_item(second, body="", truncated=True))
+        packer = ContextPacker(token_budget=block_tokens(first) + header + 20, min_body_tokens=60)
+        packed = packer.pack([first, second, third])
+        self.assertEqual(packed.included, ["Article 1"])
+        self.assertEqual(packed.dropped, ["Article 2", "Article 3"])
+        self.assertEqual(packed.partial_keys, {link_hash(second.link), link_hash(third.link)})
+
+    def test_later_articles_use_cached_summaries(self):
+        items = [make_item(n) for n in range(4)]
+        summaries = {content_hash(item): ArticleSummary(summary=f"Digest {n}", entities=["Acme"])
+                     for n, item in enumerate(items)}
+        packed = ContextPacker(token_budget=10_000, full_text_articles=2).pack(items, summaries)
+        self.assertEqual(packed.included, ["Article 0", "Article 1", "Article 2", "Article 3"])
+        self.assertEqual(packed.summarized, ["Article 2", "Article 3"])
+        self.assertNotIn("Digest 0", packed.text)
+        self.assertIn("Summary: Digest 2\nKey entities: Acme", packed.text)
+        self.assertEqual(packed.partial_keys, {link_hash(items[2].link), link_hash(items[3].link)})
+
+    def test_partial_keys_tell_apart_articles_with_the_same_title(self):
+        # Two feeds running the same headline: only the copy that was cut is partial
+        full = make_item(1, title="Acme launches LoRaWAN module")
+        dropped = make_item(1, paragraphs=3, title="Acme launches LoRaWAN module", source="Student Circuit")
+        header = estimate_tokens(format_news_item(dropped, body="", truncated=True))
+        packed = ContextPacker(token_budget=block_tokens(full) + header + 20).pack([full, dropped])
+        self.assertEqual(packed.included, ["Acme launches LoRaWAN module"])
+        self.assertEqual(packed.dropped, ["Acme launches LoRaWAN module"])
+        self.assertEqual(packed.partial_keys, {link_hash(dropped.link)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.harness import FixtureFeedServer
+from models.article_store import link_hash
+from models.news_bot import IoTNewsBot
+from models.query_router import StructuredQuery
+
+RELEASE = ("Acme Semiconductor today announced a new low power wireless microcontroller for battery "
+           "operated IoT sensors. The chip combines a Bluetooth LE radio with a Thread stack, runs for ten "
+           "years on a coin cell and ships to customers in the first quarter of next year, the company said.")
+ROUNDUP = ("This week in IoT: the top stories from around the industry, our pick of new products, upcoming "
+           "events and webinars, and the most read articles on the site. Sign up to get the roundup by email "
+           "every Friday and follow us for daily news on connected devices, edge computing and wireless.")
+
+
+def rss(title: str, entries) -> bytes:
+    items = "".join(
+        f"<item><title>{entry_title}</title><link>{link}</link><description>{body}</description>"
+        f"<pubDate>Mon, 0{day} Jun 2026 10:00:00 +0000</pubDate></item>"
+        for day, (entry_title, link, body) in enumerate(entries, start=1))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{title}</title>{items}</channel></rss>'.encode()
+
+
+class DeduplicationTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix="news-test-")
+        os.chdir(self.workdir) # The bot keeps its store and feed cache under .cache/
+        self.env = mock.patch.dict(os.environ, {"NEWS_SUMMARIES": "0"})
+        self.env.start()
+        self.server = FixtureFeedServer({
+            "a.xml": rss("Feed A", [("Acme launches wireless MCU", "https://a.example/mcu", RELEASE),
+                                    ("This week in IoT 1", "https://a.example/week-1", ROUNDUP + " Issue 1."),
+                                    ("This week in IoT 2", "https://a.example/week-2", ROUNDUP + " Issue 2.")]),
+            "b.xml": rss("Feed B", [("Acme unveils wireless MCU", "https://b.example/mcu", RELEASE + " More soon.")]),
+        }).start()
+        self.bot = IoTNewsBot()
+        self.bot.indexes_ready.wait()
+        self.bot.feed_urls = self.server.urls
+
+    def tearDown(self):
+        self.bot.event_loop.stop()
+        self.server.stop()
+        self.env.stop()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def sources_of(self, link: str):
+        [item] = self.bot.article_store.get_many([link_hash(link)])
+        return [copy.source for copy in item.syndicated]
+
+    def test_collapses_copies_across_feeds_only(self):
+        self.bot.fetch_news()
+        titles = sorted(item.title for item in self.bot.current_news_items)
+        self.assertEqual(titles, ["Acme launches wireless MCU", "This week in IoT 1", "This week in IoT 2"])
+        self.assertEqual(self.sources_of("https://a.example/mcu"), ["Feed B"])
+
+    def test_copy_that_stops_matching_leaves_its_group(self):
+        self.bot.fetch_news()
+        self.server.feeds["b.xml"] = rss("Feed B", [
+            ("Acme unveils wireless MCU", "https://b.example/mcu",
+             "Correction: the earlier story was published in error and has been replaced by this notice "
+             "about our editorial standards, corrections policy and how readers can contact the newsroom.")])
+        # Parse the whole feed, as a full (non-streamed) parse does, so the stored entry's edit is seen
+        with mock.patch.object(self.bot.article_store, "contains", return_value=False):
+            self.bot.fetch_news()
+        self.assertEqual(self.sources_of("https://a.example/mcu"), [])
+        self.assertEqual(len(self.bot.current_news_items), 4)
+        results = self.bot.metadata_index.lookup(StructuredQuery(source="Feed B"), limit=10)
+        self.assertEqual([link for _, _, link in results], ["https://b.example/mcu"])
+        self.assertEqual(self.bot.metadata_index.lookup(StructuredQuery(source="Feed A"), limit=10)[-1][0].key,
+                         link_hash("https://a.example/mcu"))
+
+
+if __name__ == "__main__":
+    unittest.main()
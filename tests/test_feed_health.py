@@ -0,0 +1,121 @@
+import unittest
+from datetime import datetime, timezone
+
+from models.feed_health import FeedHealthTracker
+
+FEED = "https://example.com/feed.xml"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def state(tracker: FeedHealthTracker) -> str:
+    return tracker.snapshot()[0]["state"]
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = FeedHealthTracker(failure_threshold=3, backoff_base=60.0, backoff_max=600.0,
+                                         clock=self.clock)
+
+    def fail(self, times: int = 1) -> bool:
+        opened = False
+        for _ in range(times):
+            opened = self.tracker.record_failure(FEED, 0.1, "timed out")
+        return opened
+
+    def test_circuit_opens_after_threshold_failures(self):
+        self.assertFalse(self.fail(2))
+        self.assertEqual(state(self.tracker), "failing")
+        self.assertTrue(self.tracker.allow(FEED))
+        self.assertTrue(self.fail())
+        self.assertEqual(state(self.tracker), "open")
+        self.assertFalse(self.tracker.allow(FEED))
+        self.assertEqual(self.tracker.poll_interval(FEED), 60.0) # Next try is the trial fetch
+
+    def test_half_open_trial_fetch_closes_or_reopens(self):
+        self.fail(3)
+        self.clock.now += 59
+        self.assertFalse(self.tracker.allow(FEED))
+        self.clock.now += 1
+        self.assertTrue(self.tracker.allow(FEED))
+        self.assertEqual(state(self.tracker), "half-open")
+        # A failed trial reopens the circuit for twice as long
+        self.assertTrue(self.fail())
+        self.assertFalse(self.tracker.allow(FEED))
+        self.assertEqual(self.tracker.poll_interval(FEED), 120.0)
+        self.clock.now += 120
+        self.assertTrue(self.tracker.allow(FEED))
+        # A successful trial closes it
+        self.tracker.record_success(FEED, 0.2)
+        self.assertEqual(state(self.tracker), "healthy")
+        self.assertEqual(self.tracker.snapshot()[0]["failures"], 0)
+        self.assertTrue(self.tracker.allow(FEED))
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        self.fail(2)
+        backoffs = []
+        for _ in range(6):
+            self.fail()
+            backoffs.append(self.tracker.poll_interval(FEED))
+            self.clock.now += backoffs[-1]
+        self.assertEqual(backoffs, [60.0, 120.0, 240.0, 480.0, 600.0, 600.0])
+
+    def test_snapshot_reports_error_rate_and_last_error(self):
+        self.tracker.record_success(FEED, 0.1)
+        self.fail()
+        row = self.tracker.snapshot()[0]
+        self.assertEqual(row["error_rate"], 0.5)
+        self.assertEqual(row["last_error"], "timed out")
+        self.assertEqual(row["latency_p50_ms"], 100.0)
+
+
+class PollIntervalTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = FeedHealthTracker(default_interval=900.0, min_interval=300.0, max_interval=6 * 3600.0,
+                                         clock=self.clock)
+
+    def published(self, *hours_ago: float):
+        return [datetime.fromtimestamp(self.clock.now - hours * 3600, timezone.utc) for hours in hours_ago]
+
+    def test_unknown_feed_or_too_few_posts_use_the_default(self):
+        self.assertEqual(self.tracker.poll_interval(FEED), 900.0)
+        self.tracker.record_success(FEED, 0.1, self.published(1))
+        self.assertEqual(self.tracker.poll_interval(FEED), 900.0)
+
+    def test_interval_is_half_the_typical_gap_between_posts(self):
+        self.tracker.record_success(FEED, 0.1, self.published(0, 2, 4, 6))
+        self.assertEqual(self.tracker.poll_interval(FEED), 3600.0)
+
+    def test_interval_is_clamped(self):
+        busy, quiet = "https://busy.example.com/feed", "https://quiet.example.com/feed"
+        self.tracker.record_success(busy, 0.1, self.published(0, 0.05, 0.1))
+        self.tracker.record_success(quiet, 0.1, self.published(0, 48, 96))
+        self.assertEqual(self.tracker.poll_interval(busy), 300.0)
+        self.assertEqual(self.tracker.poll_interval(quiet), 6 * 3600.0)
+
+    def test_feed_gone_quiet_is_polled_less_often(self):
+        self.tracker.record_success(FEED, 0.1, self.published(0, 1, 2))
+        self.assertEqual(self.tracker.poll_interval(FEED), 1800.0)
+        self.clock.now += 8 * 3600 # No new posts for eight hours
+        self.assertEqual(self.tracker.poll_interval(FEED), 7200.0)
+
+    def test_future_dated_entries_are_ignored(self):
+        self.tracker.record_success(FEED, 0.1, self.published(-1, -2, 0, 2))
+        self.assertEqual(self.tracker.poll_interval(FEED), 3600.0)
+
+    def test_non_adaptive_tracker_uses_the_default(self):
+        tracker = FeedHealthTracker(adaptive=False, clock=self.clock)
+        tracker.record_success(FEED, 0.1, self.published(0, 2, 4, 6))
+        self.assertEqual(tracker.poll_interval(FEED), 900.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.harness import FixtureFeedServer, load_fixtures
+from models.news_bot import IoTNewsBot
+
+
+class ConditionalRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix="news-test-")
+        os.chdir(self.workdir) # The bot keeps its store and feed cache under .cache/
+        self.env = mock.patch.dict(os.environ, {"NEWS_SUMMARIES": "0"})
+        self.env.start()
+        self.payload = load_fixtures()["iotinsider.xml"]
+        self.server = FixtureFeedServer({"feed.xml": self.payload}).start()
+        self.bot = IoTNewsBot()
+        self.bot.feed_urls = self.server.urls
+
+    def tearDown(self):
+        self.bot.event_loop.stop()
+        self.server.stop()
+        self.env.stop()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_second_poll_is_conditional(self):
+        self.bot.fetch_news()
+        self.bot.fetch_news()
+        (_, first), (_, second) = self.server.request_log
+        self.assertIsNone(first)
+        self.assertIsNotNone(second)
+
+    def test_validators_refreshed_when_parse_stops_at_seen_entry(self):
+        self.bot.fetch_news()
+        # Same entries under a new ETag (e.g. a regenerated feed): parsing stops at the first, stored entry
+        self.server.feeds["feed.xml"] = self.payload + b"\n<!-- regenerated -->\n"
+        self.bot.fetch_news()
+        self.bot.fetch_news()
+        (_, first), (_, second), (_, third) = self.server.request_log
+        self.assertIsNotNone(second)
+        self.assertNotEqual(second, third) # Sent the new ETag, not the one from the first poll
+        counters = self.bot.metrics.snapshot().counters
+        feed = (("feed", self.server.urls[0]),)
+        self.assertEqual(counters[("feed_no_new_entries_total", feed)], 1)
+        self.assertEqual(counters[("feed_not_modified_total", feed)], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
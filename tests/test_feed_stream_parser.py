@@ -0,0 +1,96 @@
+import unittest
+
+from benchmarks.harness import FixtureFeedServer
+from models.feed_fetcher import FeedFetcher
+from models.feed_stream_parser import StreamingFeedParser
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>Feed A</title>
+<item><title>First</title><link>https://a.example/1</link><description>Short 1</description>
+<content:encoded><![CDATA[<p>Full <b>one</b></p>]]></content:encoded>
+<pubDate>Mon, 01 Jun 2026 10:00:00 +0200</pubDate><category>LoRaWAN</category><dc:creator>Ann</dc:creator></item>
+<item><title>Second</title><link>https://a.example/2</link><description>Short 2</description></item>
+<item><title>Third</title><link>https://a.example/3</link><description>Short 3</description></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed B</title>
+<entry><title>Inline</title><link rel="related" href="https://b.example/other"/>
+<link href="https://b.example/1"/><updated>2026-06-01T08:00:00Z</updated>
+<category term="Matter"/><author><name>Bo</name></author>
+<summary>Summary 1</summary>
+<content type="xhtml">
+  <div xmlns="http://www.w3.org/1999/xhtml"><p>Inline <em>xhtml</em> body</p><p>Second</p></div>
+</content></entry>
+<entry><title>Out of line</title><link href="https://b.example/2"/>
+<summary type="html">&lt;p&gt;Summary 2&lt;/p&gt;</summary><content src="https://b.example/2.html"/></entry>
+</feed>"""
+
+
+def parse(payload: bytes, chunk_size: int = 7, **kwargs) -> StreamingFeedParser:
+    parser = StreamingFeedParser(**kwargs)
+    for start in range(0, len(payload), chunk_size):
+        parser.feed(payload[start:start + chunk_size])
+        if parser.done:
+            return parser
+    parser.close()
+    return parser
+
+
+class StreamingFeedParserTest(unittest.TestCase):
+    def test_rss_entries(self):
+        result = parse(RSS).result()
+        self.assertEqual(result.feed.title, "Feed A")
+        first = result.entries[0]
+        self.assertEqual((first.title, first.link, first.summary), ("First", "https://a.example/1", "Short 1"))
+        self.assertEqual(first.content[0]["value"], "<p>Full <b>one</b></p>")
+        self.assertEqual(tuple(first.published_parsed[:4]), (2026, 6, 1, 8)) # Normalized to UTC
+        self.assertEqual([tag.term for tag in first.tags], ["LoRaWAN"])
+        self.assertEqual([author.name for author in first.authors], ["Ann"])
+        self.assertEqual([entry.link for entry in result.entries], [f"https://a.example/{n}" for n in (1, 2, 3)])
+        self.assertFalse(result.reached_seen)
+
+    def test_atom_entries(self):
+        first, second = parse(ATOM).result().entries
+        self.assertEqual(first.link, "https://b.example/1")
+        self.assertEqual(first.content[0]["value"], "<p>Inline <em>xhtml</em> body</p><p>Second</p>")
+        self.assertEqual(first.summary, "Summary 1")
+        self.assertEqual(tuple(first.published_parsed[:4]), (2026, 6, 1, 8))
+        self.assertEqual([tag.term for tag in first.tags], ["Matter"])
+        self.assertEqual([author.name for author in first.authors], ["Bo"])
+        # No inline content: the ingest code falls back to the summary
+        self.assertNotIn("content", second)
+        self.assertEqual(second.summary, "<p>Summary 2</p>")
+
+    def test_stops_at_max_entries(self):
+        parser = parse(RSS, max_entries=2)
+        self.assertTrue(parser.done)
+        self.assertEqual(len(parser.entries), 2)
+        self.assertFalse(parser.reached_seen)
+
+    def test_stops_at_first_seen_entry(self):
+        parser = parse(RSS, is_seen=lambda link: link == "https://a.example/2")
+        self.assertTrue(parser.done)
+        self.assertEqual([entry.title for entry in parser.entries], ["First"])
+        self.assertTrue(parser.result().reached_seen)
+
+
+class FallbackTest(unittest.TestCase):
+    def test_malformed_feed_falls_back_to_feedparser(self):
+        # An HTML entity is not defined in XML: the strict parser fails, feedparser copes
+        malformed = RSS.replace(b"Short 2", b"Short&nbsp;2")
+        server = FixtureFeedServer({"bad.xml": malformed, "good.xml": RSS}).start()
+        try:
+            bad, good = FeedFetcher(chunk_size=64).fetch_all(server.urls)
+        finally:
+            server.stop()
+        self.assertTrue(good.streamed)
+        self.assertFalse(bad.streamed)
+        self.assertIsNone(bad.error)
+        self.assertEqual([entry.title for entry in bad.feed.entries], ["First", "Second", "Third"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from benchmarks.bench_clean_html import reference_clean_html
+from models.html_cleaner import clean_html
+
+# Markup fragments that stress the script/style and <br> handling when combined at random
+_FRAGMENTS = ['<script>', '</script>', '<script type="x">', '<style>', '</style>', '<br>', '<br/>', '<BR />',
+              '<p>', '</p>', '<a href="x">', '</a>', '<', '>', '\n', '\n\n', ' ', '  ', 'a', 'b', '&amp;',
+              '<scr', 'ipt>', '</scr', '<sty', 'le>', '<b', 'r>']
+
+
+class CleanHtmlTest(unittest.TestCase):
+    def assertSameAsReference(self, markup: str) -> None:
+        self.assertEqual(clean_html(markup), reference_clean_html(markup), repr(markup))
+
+    def test_drops_script_and_style_blocks(self):
+        self.assertEqual(clean_html('<p>a</p><script>x()</script><style>p {}</style>b<br>c'), 'ab\nc')
+
+    def test_style_inside_script(self):
+        # Scripts are removed before styles, so the script swallows the style's opening tag
+        self.assertSameAsReference('<script>a<style>b</script>c</style>d')
+
+    def test_script_inside_style(self):
+        self.assertSameAsReference('<style>x<script>y</style>z</script>w')
+
+    def test_unclosed_blocks(self):
+        self.assertSameAsReference('<script>a<style>b</style>c')
+        self.assertSameAsReference('<style>a<script>b</script>c')
+
+    def test_removed_block_joins_markup(self):
+        # Removing a block can join the text around it into a new <br> or tag
+        self.assertSameAsReference('<br/><scr<b<script>le></script>r>b')
+        self.assertSameAsReference('<sty<script>x</script>le>a</style>b')
+
+    def test_random_markup_matches_reference(self):
+        rnd = random.Random(11)
+        for _ in range(20000):
+            self.assertSameAsReference(''.join(rnd.choice(_FRAGMENTS) for _ in range(rnd.randint(1, 14))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from models.llm_admission import AdmissionController, AdmissionRejected, TokenBucket, retryable_status
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("models.llm_admission.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_takes_up_to_capacity_then_refills_at_rate(self):
+        bucket = TokenBucket(rate=2.0, capacity=3)
+        self.assertEqual([bucket.try_take() for _ in range(4)], [True, True, True, False])
+        self.assertAlmostEqual(bucket.time_until_token(), 0.5)
+        self.clock.now += 0.25
+        self.assertAlmostEqual(bucket.time_until_token(), 0.25)
+        self.assertFalse(bucket.try_take())
+        self.clock.now += 0.25
+        self.assertTrue(bucket.try_take())
+
+    def test_never_holds_more_than_capacity(self):
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        self.clock.now += 60
+        self.assertEqual([bucket.try_take() for _ in range(3)], [True, True, False])
+        bucket.give_back()
+        bucket.give_back()
+        bucket.give_back()
+        self.assertEqual([bucket.try_take() for _ in range(3)], [True, True, False])
+
+    def test_rejects_non_positive_rate(self):
+        for rate in (0, -1.0):
+            with self.assertRaises(ValueError):
+                TokenBucket(rate=rate, capacity=1)
+
+
+class ConfigTest(unittest.TestCase):
+    def test_rejects_invalid_settings(self):
+        for kwargs in ({"requests_per_minute": 0}, {"requests_per_minute": -5},
+                       {"max_in_flight": 0}, {"burst": 0}, {"max_queued": -1}, {"max_retries": -1}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                AdmissionController(**kwargs)
+
+
+class FairnessTest(unittest.TestCase):
+    def test_sessions_are_admitted_round_robin(self):
+        async def run():
+            controller = AdmissionController(max_in_flight=1, requests_per_minute=6000, burst=10)
+            order = []
+            release = asyncio.Event()
+
+            async def request(session_id: str, label: str):
+                async with controller.slot(session_id):
+                    order.append(label)
+                    await release.wait()
+
+            holder = asyncio.create_task(request("busy", "busy-0"))
+            await asyncio.sleep(0)
+            tasks = [asyncio.create_task(request(session, label)) for session, label in
+                     [("busy", "busy-1"), ("busy", "busy-2"), ("busy", "busy-3"), ("a", "a-1"), ("b", "b-1")]]
+            await asyncio.sleep(0)
+            self.assertEqual(controller.queue_status("busy")[0], 1)
+            self.assertEqual(controller.queue_status("b")[0], 3)
+            release.set()
+            await asyncio.gather(holder, *tasks)
+            return order
+
+        self.assertEqual(asyncio.run(run()), ["busy-0", "busy-1", "a-1", "b-1", "busy-2", "busy-3"])
+
+    def test_rejects_when_queue_is_full(self):
+        async def run():
+            controller = AdmissionController(max_in_flight=1, max_queued=1)
+            release = asyncio.Event()
+
+            async def request():
+                async with controller.slot("s"):
+                    await release.wait()
+
+            tasks = [asyncio.create_task(request()) for _ in range(2)]
+            await asyncio.sleep(0)
+            with self.assertRaises(AdmissionRejected):
+                async with controller.slot("s"):
+                    pass
+            release.set()
+            await asyncio.gather(*tasks)
+            self.assertEqual(controller.in_flight, 0)
+
+        asyncio.run(run())
+
+    def test_cancelled_waiter_frees_its_place(self):
+        async def run():
+            controller = AdmissionController(max_in_flight=1)
+            release = asyncio.Event()
+
+            async def request():
+                async with controller.slot("s"):
+                    await release.wait()
+
+            holder = asyncio.create_task(request())
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(request())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            self.assertIsNone(controller.queue_status("s"))
+            release.set()
+            await holder
+            self.assertEqual(controller.in_flight, 0)
+
+        asyncio.run(run())
+
+
+class Http429(Exception):
+    code = 429
+
+
+class RetryTest(unittest.TestCase):
+    def test_retryable_status(self):
+        self.assertEqual(retryable_status(Http429()), 429)
+        self.assertEqual(retryable_status(RuntimeError("503 Service Unavailable")), 503)
+        grpc_code = mock.Mock(value=(8, "resource exhausted"))
+        self.assertEqual(retryable_status(mock.Mock(spec=["code"], code=lambda: grpc_code)), 429)
+        self.assertIsNone(retryable_status(ValueError("400 bad request")))
+
+    def test_backoff_is_jittered_below_capped_exponential(self):
+        controller = AdmissionController(backoff_base=1.0, backoff_cap=5.0)
+        for attempt, limit in [(0, 1.0), (1, 2.0), (2, 4.0), (3, 5.0), (10, 5.0)]:
+            delays = [controller.backoff(attempt) for _ in range(200)]
+            self.assertTrue(all(0 <= delay <= limit for delay in delays), attempt)
+        self.assertGreater(len({round(controller.backoff(3), 6) for _ in range(20)}), 1)
+
+    def test_retry_after_stops_at_max_retries(self):
+        async def run():
+            controller = AdmissionController(max_retries=2, backoff_base=0.001)
+            results = [await controller.retry_after(Http429(), attempt) for attempt in range(3)]
+            results.append(await controller.retry_after(ValueError("bad request"), 0))
+            return results
+
+        self.assertEqual(asyncio.run(run()), [429, 429, None, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
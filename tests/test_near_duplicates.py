@@ -0,0 +1,74 @@
+import unittest
+
+from models.near_duplicates import (MinHasher, NearDuplicateIndex, pack_signature, similarity,
+                                    unpack_signature)
+
+RELEASE = ("Acme Semiconductor today announced a new low power wireless microcontroller for battery "
+           "operated IoT sensors. The chip combines a Bluetooth LE radio with a Thread stack, runs for ten "
+           "years on a coin cell and ships to customers in the first quarter of next year, the company said.")
+
+
+class MinHasherTest(unittest.TestCase):
+    def setUp(self):
+        self.hasher = MinHasher()
+
+    def test_syndicated_copy_is_close_and_unrelated_text_is_not(self):
+        original = self.hasher.signature(RELEASE)
+        copy = self.hasher.signature("Via our partners: " + RELEASE + " Subscribe to our newsletter.")
+        unrelated = self.hasher.signature("City council approves new budget for road repairs and parks, "
+                                          "with a vote scheduled for the spring session next month.")
+        self.assertGreaterEqual(similarity(original, copy), 0.7)
+        self.assertLess(similarity(original, unrelated), 0.2)
+
+    def test_signatures_are_stable_and_round_trip(self):
+        signature = self.hasher.signature(RELEASE)
+        self.assertEqual(signature, MinHasher().signature(RELEASE))
+        self.assertEqual(len(signature), 64)
+        self.assertEqual(unpack_signature(pack_signature(signature)), signature)
+        self.assertEqual(len(self.hasher.signature("one")), 64) # Short texts fill every bin too
+
+
+class NearDuplicateIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = NearDuplicateIndex(num_perm=8, bands=2, threshold=0.7)
+
+    def test_threshold(self):
+        self.index.add("a", (1, 2, 3, 4, 5, 6, 7, 8))
+        self.assertEqual(self.index.find((1, 2, 3, 4, 5, 6, 0, 0)), "a") # 6/8 agree
+        self.assertIsNone(self.index.find((1, 2, 3, 4, 5, 0, 0, 0))) # 5/8 agree, same band
+
+    def test_candidates_need_a_matching_band(self):
+        self.index.add("a", (1, 2, 3, 4, 5, 6, 7, 8))
+        # 6 of 8 positions agree, but each band differs somewhere, so LSH never compares them
+        self.assertIsNone(self.index.find((1, 2, 3, 0, 5, 6, 7, 0)))
+
+    def test_picks_the_closest_and_skips_excluded(self):
+        self.index.add("a", (1, 2, 3, 4, 5, 6, 0, 0))
+        self.index.add("b", (1, 2, 3, 4, 5, 6, 7, 0))
+        self.assertEqual(self.index.find((1, 2, 3, 4, 5, 6, 7, 8)), "b")
+        self.assertEqual(self.index.find((1, 2, 3, 4, 5, 6, 7, 8), exclude="b"), "a")
+
+    def test_exclude_group_skips_the_same_source(self):
+        self.index.add("a", (1, 2, 3, 4, 5, 6, 7, 8), group="Feed A")
+        signature = (1, 2, 3, 4, 5, 6, 7, 8)
+        self.assertIsNone(self.index.find(signature, exclude_group="Feed A"))
+        self.assertEqual(self.index.find(signature, exclude_group="Feed B"), "a")
+
+    def test_remove_and_replace(self):
+        self.index.add("a", (1, 2, 3, 4, 5, 6, 7, 8))
+        self.index.add("a", (9, 9, 9, 9, 9, 9, 9, 9)) # Replaces the old signature and its buckets
+        self.assertEqual(len(self.index), 1)
+        self.assertIsNone(self.index.find((1, 2, 3, 4, 5, 6, 7, 8)))
+        self.index.remove("a")
+        self.index.remove("a")
+        self.assertNotIn("a", self.index)
+        self.assertIsNone(self.index.find((9, 9, 9, 9, 9, 9, 9, 9)))
+        self.assertEqual(self.index._buckets, [{}, {}])
+
+    def test_bands_must_divide_the_signature(self):
+        with self.assertRaises(ValueError):
+            NearDuplicateIndex(num_perm=64, bands=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from datetime import datetime, timezone
+
+from models.news_corpus import NewsCorpus
+from models.response_models import NewsItem
+
+
+def make_item(n: int, description: str = "Body") -> NewsItem:
+    return NewsItem(title=f"Story {n}", description=description, link=f"https://a.example/{n}",
+                    published_at=datetime(2026, 1, n + 1, tzinfo=timezone.utc), tags=[], authors=[], source="Feed A")
+
+
+class PublishTest(unittest.TestCase):
+    def setUp(self):
+        self.corpus = NewsCorpus()
+        self.first = self.corpus.publish([make_item(1), make_item(2)])
+
+    def test_unchanged_items_keep_the_version(self):
+        again = self.corpus.publish([make_item(1), make_item(2)])
+        self.assertEqual(again.version, self.first.version)
+        self.assertGreaterEqual(again.refreshed_at, self.first.refreshed_at)
+        self.assertIs(self.corpus.publish([make_item(1), make_item(2)], refreshed=False), again)
+
+    def test_changed_set_order_or_content_bumps_the_version(self):
+        versions = [self.first.version]
+        for items in ([make_item(2), make_item(1)], [make_item(2), make_item(1), make_item(3)],
+                      [make_item(2), make_item(1), make_item(3, description="Updated")]):
+            versions.append(self.corpus.publish(items).version)
+        self.assertEqual(versions, [1, 2, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
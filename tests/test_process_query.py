@@ -0,0 +1,71 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from benchmarks.harness import FakeGemini, FixtureFeedServer, install_fake_llm, load_fixtures
+from models.news_bot import IoTNewsBot
+
+
+class EventLoopTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp(prefix="news-test-")
+        os.chdir(self.workdir) # The bot keeps its store and feed cache under .cache/
+        self.env = mock.patch.dict(os.environ, {"NEWS_SUMMARIES": "0", "PROMPT_CONTEXT_CACHE": "local",
+                                                "QUERY_ROUTER": "0"})
+        self.env.start()
+        self.server = FixtureFeedServer({"feed.xml": load_fixtures()["iotinsider.xml"]}).start()
+        self.bot = IoTNewsBot()
+        self.bot.indexes_ready.wait()
+        self.bot.feed_urls = self.server.urls
+        self.bot.fetch_news()
+        install_fake_llm(self.bot, FakeGemini(first_token_latency=0.0, chunk_latency=0.0, chunks=2))
+
+    def tearDown(self):
+        self.bot.event_loop.stop()
+        self.server.stop()
+        self.env.stop()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_store_reads_do_not_block_the_shared_loop(self):
+        store = self.bot.article_store
+        slow_calls = []
+
+        def slow(method):
+            def wrapper(*args, **kwargs):
+                slow_calls.append(method.__name__)
+                time.sleep(0.3) # A slow disk or a large history
+                return method(*args, **kwargs)
+            return wrapper
+
+        async def run():
+            gaps = []
+
+            async def heartbeat():
+                last = time.monotonic()
+                while True:
+                    await asyncio.sleep(0.01)
+                    now = time.monotonic()
+                    gaps.append(now - last)
+                    last = now
+
+            beat = asyncio.create_task(heartbeat())
+            chunks = [chunk async for chunk in self.bot.process_query("LoRaWAN gateways")]
+            beat.cancel()
+            return chunks, max(gaps, default=float("inf"))
+
+        with mock.patch.object(store, "summaries", slow(store.summaries)), \
+                mock.patch.object(store, "get_many", slow(store.get_many)):
+            chunks, longest_gap = self.bot.event_loop.run(run())
+        self.assertTrue("".join(chunks))
+        self.assertIn("summaries", slow_calls) # Prompt prefix and query context both read the store
+        self.assertLess(longest_gap, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from models.query_router import MetadataIndex, QueryRouter
+from models.response_models import NewsItem
+
+NOW = datetime(2024, 6, 14, 12, 0, tzinfo=timezone.utc)
+
+
+def make_item(n, source, authors=(), tags=(), days_ago=0):
+    return NewsItem(title=f"Article {n}", description=f"Body {n}", link=f"https://example.com/{n}",
+                    published_at=NOW - timedelta(days=days_ago), tags=list(tags), authors=list(authors),
+                    source=source)
+
+
+class QueryRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.index = MetadataIndex()
+        self.index.add("a", make_item(1, "IoT Insider", authors=["Priya Nair"], tags=["LoRaWAN"], days_ago=1))
+        self.index.add("b", make_item(2, "IoT Insider", authors=["Sam Lee"], tags=["Matter"], days_ago=3))
+        self.index.add("c", make_item(3, "Student Circuit", authors=["Priya Nair"], tags=["LoRaWAN"], days_ago=20))
+        self.index.add("d", make_item(4, "Student Circuit", authors=["Sam"], tags=["Edge AI"], days_ago=2))
+        self.router = QueryRouter(self.index, clock=NOW.timestamp)
+
+    def test_routes_by_source(self):
+        structured = self.router.route("Latest from IoT Insider")
+        self.assertEqual((structured.source, structured.author, structured.tag), ("IoT Insider", None, None))
+        self.assertIsNone(structured.since)
+        # A listing question names the source without a cue word
+        self.assertEqual(self.router.route("student circuit news").source, "Student Circuit")
+
+    def test_routes_by_author(self):
+        structured = self.router.route("Articles by Priya Nair?")
+        self.assertEqual((structured.source, structured.author), (None, "Priya Nair"))
+        _, answer = self.router.answer("Articles by Priya Nair?")
+        self.assertIn("are the 2 latest articles by Priya Nair", answer)
+        self.assertLess(answer.index("Article 1"), answer.index("Article 3")) # Most recent first
+
+    def test_longest_known_name_wins(self):
+        self.assertEqual(self.router.route("posts by Sam Lee").author, "Sam Lee")
+        self.assertEqual(self.router.route("posts by Sam").author, "Sam")
+
+    def test_routes_by_tag_with_date_window(self):
+        structured = self.router.route("anything tagged LoRaWAN this week")
+        self.assertEqual((structured.tag, structured.period), ("LoRaWAN", "this week"))
+        self.assertEqual(structured.since, NOW - timedelta(days=7))
+        self.assertEqual(structured.kind, "tag+date")
+        _, answer = self.router.answer("anything tagged LoRaWAN this week")
+        self.assertIn("Here is the latest article tagged LoRaWAN this week", answer)
+        self.assertNotIn("Article 3", answer) # Published 20 days ago
+
+    def test_last_n_days_window(self):
+        structured = self.router.route("stories from Student Circuit in the last 5 days")
+        self.assertEqual(structured.since, NOW - timedelta(days=5))
+        self.assertEqual(structured.period, "in the last 5 days")
+        _, answer = self.router.answer("stories from Student Circuit in the last 5 days")
+        self.assertIn("Article 4", answer)
+        self.assertNotIn("Article 3", answer)
+
+    def test_empty_result_is_still_answered(self):
+        _, answer = self.router.answer("articles tagged Matter today")
+        self.assertEqual(answer, "I couldn't find any stored articles tagged Matter today.")
+
+    def test_free_form_questions_go_to_the_agent(self):
+        for query in ("Summarize the latest from IoT Insider",
+                      "Why does Priya Nair think LoRaWAN is winning?",
+                      "What's new in battery technology?",
+                      "latest from IoT Insider about battery life",
+                      "Tell me about LoRaWAN gateways"):
+            with self.subTest(query=query):
+                self.assertIsNone(self.router.route(query))
+                self.assertIsNone(self.router.answer(query))
+
+    def test_ambiguous_or_unknown_names_go_to_the_agent(self):
+        for query in ("Priya Nair", # A known author, but not asked for by author
+                      "Is Sam right about Edge AI?",
+                      "articles by Priya", # Only part of a known name
+                      "posts by Jane Doe", # Not a known author
+                      "Insider"):
+            with self.subTest(query=query):
+                self.assertIsNone(self.router.route(query))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+from models.response_cache import ResponseCache, normalize_query
+
+CONTEXT = "Title: Acme launches LoRaWAN module\n---"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("models.response_cache.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResponseCache(maxsize=2, ttl=60.0)
+
+    def test_normalized_query_and_context_make_the_key(self):
+        self.assertEqual(normalize_query("  What's  NEW in IoT?? "), "what's new in iot")
+        self.cache.put("What's new in IoT?", CONTEXT, "answer")
+        self.assertEqual(self.cache.get("what's   new in iot", CONTEXT), "answer")
+        self.assertIsNone(self.cache.get("What's new in IoT?", CONTEXT + " changed"))
+        self.assertEqual(self.cache.stats(), {"size": 1, "hits": 1, "misses": 1, "evictions": 0})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.put("a", CONTEXT, "A")
+        self.cache.put("b", CONTEXT, "B")
+        self.assertEqual(self.cache.get("a", CONTEXT), "A") # "b" is now the least recently used
+        self.cache.put("c", CONTEXT, "C")
+        self.assertIsNone(self.cache.get("b", CONTEXT))
+        self.assertEqual(self.cache.get("a", CONTEXT), "A")
+        self.assertEqual(self.cache.get("c", CONTEXT), "C")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_putting_an_existing_key_refreshes_it(self):
+        self.cache.put("a", CONTEXT, "A")
+        self.cache.put("b", CONTEXT, "B")
+        self.cache.put("a", CONTEXT, "A2")
+        self.cache.put("c", CONTEXT, "C")
+        self.assertEqual(self.cache.get("a", CONTEXT), "A2")
+        self.assertIsNone(self.cache.get("b", CONTEXT))
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.put("a", CONTEXT, "A")
+        self.clock.now += 59.9
+        self.assertEqual(self.cache.get("a", CONTEXT), "A")
+        self.clock.now += 0.1
+        self.assertIsNone(self.cache.get("a", CONTEXT))
+        self.assertEqual(self.cache.stats()["size"], 0) # Expired entries are dropped on lookup
+        # A hit does not extend the entry's lifetime
+        self.cache.put("b", CONTEXT, "B")
+        self.clock.now += 30
+        self.assertEqual(self.cache.get("b", CONTEXT), "B")
+        self.clock.now += 30
+        self.assertIsNone(self.cache.get("b", CONTEXT))
+
+    def test_clear_drops_every_entry_but_keeps_counters(self):
+        self.cache.put("a", CONTEXT, "A")
+        self.cache.put("b", CONTEXT, "B")
+        self.cache.get("a", CONTEXT)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("a", CONTEXT))
+        self.assertIsNone(self.cache.get("b", CONTEXT))
+        self.assertEqual(self.cache.stats(), {"size": 0, "hits": 1, "misses": 2, "evictions": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+from typing import List
+
+from models.response_cleaner import StreamingResponseCleaner, clean_response_text
+
+ANSWERS = [
+    "Key Point: NXP launched a new MCU.\n- **Key Point**: It targets Matter.\nSource: NXP news (https://x/a)\n",
+    "Key Point:- **Key Point**: chained heads on the first line",
+    "## Summary\n* one\n-two\n- Key Point: three\nQuote: >\"edge AI\" matters.\n",
+    "Source: A title\nthat wraps (https://x/b) and >\"a quote\nacross lines\" end",
+    "Source: Source: nested (https://x/c)\n-\n#not a header\n# \nSource: open (",
+]
+
+# Fragments that exercise the line-start, quote and source rules and their interactions
+_FRAGMENTS = ['# ', '## Head', '#', '* ', '*', '-', '- ', '-x', 'Key Point:', 'Key ', 'Point:', '- Key Point:',
+              '- **Key Point**:', '**', '>"', '"', 'quote', 'Source: ', 'Source', 'Title', ' (', '(', 'http://u',
+              ')', '\n', '\n\n', ' ', 'word']
+
+
+def stream(chunks: List[str]) -> str:
+    cleaner = StreamingResponseCleaner()
+    return "".join(cleaner.feed(chunk) for chunk in chunks) + cleaner.flush()
+
+
+class StreamingResponseCleanerTest(unittest.TestCase):
+    def test_every_split_point_matches_whole_answer(self):
+        for answer in ANSWERS:
+            expected = clean_response_text(answer)
+            for split in range(len(answer) + 1):
+                self.assertEqual(stream([answer[:split], answer[split:]]), expected, (answer, split))
+
+    def test_character_by_character_matches_whole_answer(self):
+        for answer in ANSWERS:
+            self.assertEqual(stream(list(answer)), clean_response_text(answer), answer)
+
+    def test_random_chunkings_match_whole_answer(self):
+        rnd = random.Random(7)
+        for _ in range(5000):
+            answer = "".join(rnd.choice(_FRAGMENTS) for _ in range(rnd.randint(1, 25)))
+            cuts = sorted(rnd.sample(range(1, len(answer) + 1), min(len(answer), rnd.randint(0, 6))))
+            chunks = [answer[start:end] for start, end in zip([0] + cuts, cuts + [len(answer)])]
+            self.assertEqual(stream(chunks), clean_response_text(answer), chunks)
+
+    def test_plain_text_is_released_immediately(self):
+        cleaner = StreamingResponseCleaner()
+        self.assertEqual(cleaner.feed("Hello"), "Hello")
+        self.assertEqual(cleaner.feed(" there\n- Ke"), " there\n")
+        self.assertEqual(cleaner.feed("y Point:x"), "- x")
+
+
+if __name__ == "__main__":
+    unittest.main()
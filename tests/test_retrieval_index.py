@@ -0,0 +1,76 @@
+import unittest
+
+from models.response_models import NewsItem
+from models.retrieval_index import BM25Index, tokenize
+
+
+def make_item(n, title, description, tags=()):
+    return NewsItem(title=title, description=description, link=f"https://example.com/{n}", published_at=None,
+                    tags=list(tags), authors=[], source="IoT Insider")
+
+
+class BM25IndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.add_many([
+            ("lora", make_item(1, "LoRaWAN gateway for smart farms",
+                               "A LoRaWAN gateway links soil sensors across the farm.", tags=["LoRaWAN"])),
+            ("matter", make_item(2, "Matter 1.3 brings energy reporting",
+                                 "Smart home devices can now report energy use over Matter.")),
+            ("chip", make_item(3, "New microcontroller for wearables",
+                               "The chip mentions LoRaWAN once in passing.")),
+            ("edge", make_item(4, "Edge AI camera module",
+                               "Runs vision models on the device without the cloud.")),
+        ])
+
+    def ids(self, query, k=5):
+        return [article.key for article, _ in self.index.search(query, k)]
+
+    def test_tokenize_drops_stopwords(self):
+        self.assertEqual(tokenize("What is the latest on LoRaWAN?"), ["lorawan"])
+
+    def test_matching_articles_rank_first(self):
+        results = self.index.search("LoRaWAN gateway")
+        self.assertEqual([article.key for article, _ in results], ["lora", "chip"])
+        self.assertGreater(results[0][1], results[1][1])
+        self.assertEqual(self.ids("smart home energy")[0], "matter")
+        self.assertEqual(self.ids("edge AI")[0], "edge")
+
+    def test_title_and_tags_outweigh_the_body(self):
+        self.index.add("body", make_item(5, "Weekly roundup", "LoRaWAN"))
+        self.assertEqual(self.ids("lorawan")[0], "lora")
+
+    def test_no_match_and_empty_query(self):
+        self.assertEqual(self.index.search("quantum blockchain"), [])
+        self.assertEqual(self.index.search("what is the"), [])
+        self.assertEqual(BM25Index().search("lorawan"), [])
+
+    def test_k_limits_results(self):
+        self.assertEqual(len(self.index.search("lorawan matter edge chip", k=2)), 2)
+
+    def test_removed_document_drops_out(self):
+        self.index.remove("lora")
+        self.assertEqual(self.ids("LoRaWAN gateway"), ["chip"])
+        self.assertNotIn("lora", self.index.articles)
+        self.assertEqual(len(self.index), 3)
+        self.index.remove("lora") # Removing twice is harmless
+        self.assertEqual(len(self.index), 3)
+
+    def test_updated_document_is_reindexed(self):
+        self.index.add("lora", make_item(1, "Thread border router review", "A Thread border router for the home."))
+        self.assertEqual(self.ids("LoRaWAN gateway"), ["chip"])
+        self.assertEqual(self.ids("thread border router"), ["lora"])
+        self.assertEqual(self.index.articles["lora"].title, "Thread border router review")
+        self.assertEqual(len(self.index), 4)
+
+    def test_removing_every_document_leaves_an_empty_index(self):
+        for doc_id in list(self.index.articles):
+            self.index.remove(doc_id)
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.search("lorawan"), [])
+        self.assertEqual(self.index._total_len, 0)
+        self.assertFalse(self.index._postings)
+
+
+if __name__ == "__main__":
+    unittest.main()
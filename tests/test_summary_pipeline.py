@@ -0,0 +1,84 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from models.article_store import ArticleStore
+from models.background_loop import BackgroundLoop
+from models.llm_admission import AdmissionController
+from models.metrics import Metrics
+from models.response_models import ArticleSummary, NewsItem
+from models.sequential_agent import NewsProcessingPipeline
+
+
+def make_item(n: int) -> NewsItem:
+    return NewsItem(title=f"Story {n}", description=f"Body of story {n}", link=f"https://a.example/{n}",
+                    published_at=datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(days=n),
+                    tags=[], authors=[], source="Feed A")
+
+
+class FakeSummaryAgent:
+    def __init__(self):
+        self.metrics = Metrics()
+        self.admission = AdmissionController()
+        self.batches = []
+
+    async def summarize(self, items):
+        self.batches.append(len(items))
+        return {i: ArticleSummary(summary=f"Summary of {item.title}", entities=[]) for i, item in enumerate(items)}
+
+
+class BackgroundSummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ArticleStore(":memory:")
+        self.store.upsert([make_item(n) for n in range(10)])
+        self.agent = FakeSummaryAgent()
+        self.loop = BackgroundLoop(name="summary-test-loop")
+
+    def tearDown(self):
+        self.loop.stop()
+        self.store.close()
+
+    def wait_until(self, condition, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out")
+            time.sleep(0.01)
+
+    def test_backlog_is_summarized_in_capped_passes(self):
+        pipeline = NewsProcessingPipeline(self.agent, batch_size=3, max_per_pass=4, pass_pause=0.3)
+        pipeline.schedule_summaries(self.store, self.loop)
+        self.wait_until(lambda: sum(self.agent.batches) >= 4)
+        time.sleep(0.1)
+        self.assertEqual(self.agent.batches, [3, 1]) # First pass stops at its cap and pauses
+        self.wait_until(lambda: not pipeline._running)
+        self.assertEqual(self.agent.batches, [3, 1, 3, 1, 2])
+        self.assertEqual(self.store.unsummarized(10), [])
+
+    def test_waits_while_questions_are_queued(self):
+        pipeline = NewsProcessingPipeline(self.agent, batch_size=5, yield_interval=0.01)
+        queued = threading.Event()
+        queued.set()
+        with mock.patch.object(AdmissionController, "waiting", new_callable=mock.PropertyMock,
+                               side_effect=lambda: int(queued.is_set())):
+            pipeline.schedule_summaries(self.store, self.loop)
+            time.sleep(0.1)
+            self.assertEqual(self.agent.batches, [])
+            queued.clear()
+            self.wait_until(lambda: not pipeline._running)
+        self.assertEqual(self.agent.batches, [5, 5])
+
+    def test_failed_pass_is_counted_and_can_run_again(self):
+        pipeline = NewsProcessingPipeline(self.agent)
+        with mock.patch.object(self.store, "unsummarized", side_effect=RuntimeError("database is locked")), \
+                self.assertLogs("models.sequential_agent", "ERROR"):
+            pipeline.schedule_summaries(self.store, self.loop)
+            self.wait_until(lambda: self.agent.metrics.snapshot().counters.get(("summary_pass_failures_total", ())))
+        self.assertFalse(pipeline._running)
+        pipeline.schedule_summaries(self.store, self.loop)
+        self.wait_until(lambda: not pipeline._running and sum(self.agent.batches) == 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from datetime import datetime, timezone
+
+from models.response_models import NewsItem
+from models.ui_fragments import SIDEBAR_PREVIEW_CHARS, news_card_html, news_page_html, page_bounds
+
+
+def make_item(n: int, title: str = "Story", description: str = "Body") -> NewsItem:
+    return NewsItem(title=f"{title} {n}", description=description, link=f"https://a.example/{n}?a=1&b=2",
+                    published_at=datetime(2026, 1, 1, tzinfo=timezone.utc), tags=[], authors=[], source="Feed A")
+
+
+class NewsCardTest(unittest.TestCase):
+    def test_markup_in_feed_text_is_escaped(self):
+        card = news_card_html(make_item(1, title="Chips <b>&</b> boards", description="x < y & z"))
+        self.assertIn("Chips &lt;b&gt;&amp;&lt;/b&gt; boards", card)
+        self.assertIn("x &lt; y &amp; z...", card)
+        self.assertIn('href="https://a.example/1?a=1&amp;b=2"', card)
+
+    def test_preview_has_no_blank_lines_and_is_capped(self):
+        card = news_card_html(make_item(1, description="First paragraph.\n\n\nSecond   paragraph. " + "word " * 100))
+        self.assertNotIn("\n", card)
+        self.assertIn("First paragraph. Second paragraph. word", card)
+        preview = card.split('<div style="margin-top: 0.5rem;">', 1)[1].split("...</div>", 1)[0]
+        self.assertEqual(len(preview), SIDEBAR_PREVIEW_CHARS)
+
+    def test_page_is_one_block_without_blank_lines(self):
+        page = news_page_html([make_item(n, description="a\n\nb <c") for n in range(3)])
+        self.assertNotIn("\n\n", page)
+        self.assertEqual(page.count('<div class="news-item">'), 3)
+
+
+class PageBoundsTest(unittest.TestCase):
+    def test_clamps_to_existing_pages(self):
+        self.assertEqual(page_bounds(25, 0, 10), (0, 0, 10, 3))
+        self.assertEqual(page_bounds(25, 7, 10), (2, 20, 25, 3))
+        self.assertEqual(page_bounds(0, 3, 10), (0, 0, 0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()